@@ -9,11 +9,15 @@ from config import config
 db = SQLAlchemy()
 migrate = Migrate()
 
-def create_app(config_name='development'):
+def create_app(config_name='development', warm=True):
     app = Flask(__name__)
     
     # Config yükle
     app.config.from_object(config[config_name])
+
+    # Loglar kuyruğa atılır, JSON biçimlendirme ve yazma ayrı thread'de
+    from .utils.structured_logging import configure_logging
+    configure_logging(app)
     
     # Veritabanını başlat
     db.init_app(app)
@@ -29,8 +33,24 @@ def create_app(config_name='development'):
     from .web.routes import web_bp
     app.register_blueprint(web_bp)
     
+    # Satıcı profillerini başlangıçta bir kez yükle
+    from .core.vendor_profiles import get_registry
+    get_registry(app.config)
+    
     # Veritabanı tablolarını oluştur
     with app.app_context():
         db.create_all()
+
+    # preload_app ile master'da çalışır; worker'lar hazır modellerle fork edilir
+    # warm=False: modele ihtiyacı olmayan CLI komutları (cli.py)
+    if warm and app.config.get('WARMUP_ENABLED', False):
+        warm_up(app)
     
-    return app 
\ No newline at end of file
+    return app
+
+def warm_up(app):
+    """Paylaşılan işlemciyi oluştur, modelleri ve örnek belgeyi ısıt"""
+    from .core.warmup import run_warmup
+    from .web.routes import get_processor
+    with app.app_context():
+        return run_warmup(get_processor(), app.config) 
\ No newline at end of file
@@ -12,9 +12,9 @@ ner_model = None
 def initialize():
     global ocr_engine, ner_model
     if ocr_engine is None:
-        ocr_engine = OCRProcessor()
+        ocr_engine = OCRProcessor(current_app.config)
     if ner_model is None:
-        ner_model = NERModel()
+        ner_model = NERModel(current_app.config)
 
 @api_bp.route('/process', methods=['POST'])
 def process_invoice():
@@ -1,4 +1,16 @@
-from .document_processor import DocumentProcessor
-from .ocr_processor import OCRProcessor
+# İşlemciler ilk erişimde yüklenir: app.core alt modüllerini (ör. vendor_profiles)
+# içe aktarmak cv2, pytesseract ve spaCy'yi yüklemesin
+_LAZY = {
+    'DocumentProcessor': '.document_processor',
+    'OCRProcessor': '.ocr_processor',
+}
 
-__all__ = ['DocumentProcessor', 'OCRProcessor'] 
\ No newline at end of file
+
+def __getattr__(name):
+    if name in _LAZY:
+        from importlib import import_module
+        return getattr(import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ['DocumentProcessor', 'OCRProcessor']
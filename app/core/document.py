@@ -0,0 +1,132 @@
+import math
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple, Union
+from .word_boxes import REGIONS, WordBoxes
+
+# (left, top, width, height)
+BBox = Tuple[int, int, int, int]
+
+
+@dataclass
+class OCRLine:
+    """Tek satır ve normalize edilmiş varyantları (ilk erişimde bir kez hesaplanır)"""
+    index: int
+    text: str
+    start: int
+    end: int
+    region: Optional[str] = None
+    bbox: Optional[BBox] = None
+    confidence: Optional[float] = None
+
+    @cached_property
+    def stripped(self) -> str:
+        return self.text.strip()
+
+    @cached_property
+    def lower(self) -> str:
+        return self.text.lower()
+
+    @cached_property
+    def upper(self) -> str:
+        return self.stripped.upper()
+
+
+@dataclass
+class OCRDocument:
+    """OCR sonucu başına bir kez kurulan ve tüm çıkarıcılara verilen belge modeli"""
+    text: str
+    lines: List[OCRLine]
+    # Kelime kutuları sadece Tesseract verisinden kurulan belgelerde dolu
+    words: WordBoxes = field(default_factory=WordBoxes.empty)
+
+    @classmethod
+    def ensure(cls, value: Union['OCRDocument', str], text_blocks: Optional[Dict[str, str]] = None) -> 'OCRDocument':
+        """Metin verilirse belgeye çevir - eski str tabanlı çağrılar için"""
+        if isinstance(value, OCRDocument):
+            return value
+        if text_blocks:
+            return cls.from_text_blocks(text_blocks)
+        return cls.from_text(value or '')
+
+    @classmethod
+    def from_text(cls, text: str, regions: Optional[List[Optional[str]]] = None) -> 'OCRDocument':
+        """Düz metinden satır ofsetleriyle belge oluştur"""
+        lines = []
+        offset = 0
+        for index, line in enumerate(text.split('\n')):
+            region = regions[index] if regions and index < len(regions) else None
+            lines.append(OCRLine(index=index, text=line, start=offset, end=offset + len(line), region=region))
+            offset += len(line) + 1
+        return cls(text=text, lines=lines)
+
+    @classmethod
+    def from_text_blocks(cls, text_blocks: Dict[str, str]) -> 'OCRDocument':
+        """Bölgesel OCR çıktısından ('header', 'body', 'footer') belge oluştur"""
+        regions = []
+        for name, block in text_blocks.items():
+            regions.extend([name] * (block.count('\n') + 1))
+        return cls.from_text('\n'.join(text_blocks.values()), regions)
+
+    @classmethod
+    def from_tesseract(cls, data: Dict[str, list], page_height: int,
+                       region_split: Tuple[float, float] = (0.3, 0.7)) -> 'OCRDocument':
+        """pytesseract image_to_data (Output.DICT) çıktısından kelime kutularıyla belge oluştur"""
+        words = WordBoxes.from_tesseract(data, page_height, region_split)
+        stats = words.line_stats()
+
+        lines = []
+        for index, (left, top, right, bottom, start, end, region, conf) in enumerate(zip(
+                stats['left'].tolist(), stats['top'].tolist(), stats['right'].tolist(),
+                stats['bottom'].tolist(), stats['start'].tolist(), stats['end'].tolist(),
+                stats['region'].tolist(), stats['confidence'].tolist())):
+            lines.append(OCRLine(index=index, text=words.text[start:end], start=start, end=end,
+                                 region=REGIONS[region], bbox=(left, top, right - left, bottom - top),
+                                 confidence=None if math.isnan(conf) else conf))
+
+        return cls(text=words.text, lines=lines, words=words)
+
+    @cached_property
+    def lower(self) -> str:
+        return self.text.lower()
+
+    @cached_property
+    def upper(self) -> str:
+        return self.text.upper()
+
+    @cached_property
+    def lower_lines(self) -> List[str]:
+        """Satırların küçük harfli hali - tek split ile"""
+        return self.lower.split('\n')
+
+    @cached_property
+    def _line_starts(self) -> List[int]:
+        return [line.start for line in self.lines]
+
+    @property
+    def confidence(self) -> float:
+        """Kelime güven skorlarının ortalaması"""
+        return self.words.mean_confidence() or 0
+
+    def region_lines(self, region: str) -> List[OCRLine]:
+        return [line for line in self.lines if line.region == region]
+
+    def region_text(self, region: str) -> str:
+        return '\n'.join(line.text for line in self.region_lines(region))
+
+    def text_blocks(self) -> Dict[str, str]:
+        """Eski 'text_blocks' sözlüğü biçimi"""
+        return {region: self.region_text(region) for region in ('header', 'body', 'footer')}
+
+    def line_at(self, offset: int) -> Optional[OCRLine]:
+        """Karakter ofsetini içeren satır (alan kaynağı için)"""
+        if not self.lines:
+            return None
+        return self.lines[max(bisect_right(self._line_starts, offset) - 1, 0)]
+
+    def provenance(self, line: Optional[OCRLine]) -> Optional[Dict[str, object]]:
+        """Alanın geldiği satır ve kutu"""
+        if line is None:
+            return None
+        return {'line': line.index, 'bbox': line.bbox, 'region': line.region}
@@ -1,35 +1,122 @@
 import cv2
 import logging
 import os
+import time
 import numpy as np
+from collections import Counter
 from .ocr_processor import OCRProcessor
+from .quality_gate import QualityGate
+from .orientation import OrientationDetector
+from .language import LanguageDetector
+from .product_extractor import ProductExtractor
 from ..utils.file_helpers import save_analysis_results
+from ..utils.metrics import document_type, document_type_label, get_metrics
+from ..utils.structured_logging import log_dump
 from flask import current_app
 from .ner.model import NERModel  # NERProcessor yerine NERModel'i import et
 
 class DocumentProcessor:
+    # Kademeli işleme katmanları (ucuzdan pahalıya)
+    TIER_FAST = 'fast'
+    TIER_FULL = 'full'
+    TIER_NER = 'ner'
+
+    # Bulunmazsa bir üst katmana geçilen zorunlu alanlar
+    REQUIRED_FIELDS = ('vendor', 'date', 'total_amount')
+
     def __init__(self, config=None):
         self.config = config or {}
         self.logger = logging.getLogger(__name__)
+        self.min_confidence = self.config.get('OCR_CASCADE_MIN_CONFIDENCE', 60)
+        self.tier_counts = Counter()
+        self.document_types = frozenset(self.config.get('ALLOWED_EXTENSIONS', ('png', 'jpg', 'jpeg', 'pdf')))
+        self.metrics = get_metrics()
         
         # OCR ve NER işlemcilerini yükle
-        self.ocr_processor = OCRProcessor()
-        self.ner_processor = NERModel()  # NERProcessor yerine NERModel kullan
+        self.ocr_processor = OCRProcessor(self.config)
+        self.ner_processor = NERModel(self.config)  # NERProcessor yerine NERModel kullan
+        self.quality_gate = QualityGate(self.config)
+        self.orientation_detector = OrientationDetector(self.config)
+        self.language_detector = LanguageDetector(self.config)
+        self.product_extractor = ProductExtractor(self.config)
+
+    def process_document(self, filepath, vendor_hint=None):
+        """Belgeyi işle; aşama süreleri belge türü (uzantı) etiketiyle kaydedilir"""
+        with document_type(document_type_label(filepath, self.document_types)):
+            return self._process_document(filepath, vendor_hint)
 
-    def process_document(self, filepath):
-        """Belgeyi işle"""
+    def _process_document(self, filepath, vendor_hint=None):
+        span = self.metrics.span
         try:
+            # Ucuz kalite kontrolü - reddedilen belge tam yüklenmez
+            quality = None
+            if self.config.get('QUALITY_GATE_ENABLED', True):
+                with span('quality_gate') as stage:
+                    quality = self.quality_gate.assess(filepath)
+                    if quality['decision'] == QualityGate.REJECT:
+                        stage.fail('rejected')
+                if quality['decision'] == QualityGate.REJECT:
+                    current_app.logger.warning(
+                        f"Rejected {filepath} by quality gate: {quality['reasons']}")
+                    return {
+                        'success': False,
+                        'error': f"Image quality too low: {', '.join(quality['reasons'])}",
+                        'quality': quality
+                    }
+
             # Görüntüyü yükle
-            image = self._load_image(filepath)
+            with span('decode') as stage:
+                image = self._load_image(filepath)
+                if image is None:
+                    stage.fail()
             if image is None:
                 current_app.logger.error(f"Failed to load image: {filepath}")
                 return None
 
-            # OCR işlemi
-            ocr_result = self.ocr_processor.process_document(image)
+            # Döndürülmüş sayfaları tam OCR'dan önce tek seferde düzelt
+            with span('orientation'):
+                orientation = self.orientation_detector.detect(image, vendor_hint)
+                if orientation['angle']:
+                    image = self.orientation_detector.rotate(image, orientation['angle'])
+
+            # Belge için gereken en küçük dil seti
+            with span('language'):
+                language = self.language_detector.detect(image, vendor_hint)
+            languages = language['languages']
+
+            # Kademeli OCR - önce hızlı geçiş, eksik alan varsa ağır geçiş
+            tier_timings = {}
+            enhance = quality is not None and quality['decision'] == QualityGate.ENHANCE
+            ocr_result = None
+            tier = self.TIER_FAST
+
+            # İyileştirme gereken görüntülerde hızlı geçiş boşa gider
+            if not enhance:
+                start = time.perf_counter()
+                with span('ocr.fast') as stage:
+                    # Yoklama kararsızsa (birden çok dil) hızlı geçiş OCR_FAST_LANGUAGE ile çalışır
+                    fast_language = languages[0] if len(languages) == 1 else None
+                    ocr_result = self.ocr_processor.process_fast(image, fast_language, vendor_hint)
+                    if not ocr_result.get('success'):
+                        stage.fail()
+                tier_timings[self.TIER_FAST] = round((time.perf_counter() - start) * 1000, 2)
+
+            if self._needs_escalation(ocr_result):
+                tier = self.TIER_FULL
+                start = time.perf_counter()
+                with span('ocr.full') as stage:
+                    ocr_result = self.ocr_processor.process_document(image, enhance=enhance, languages=languages,
+                                                                     vendor_hint=vendor_hint)
+                    if not ocr_result.get('success'):
+                        stage.fail()
+                tier_timings[self.TIER_FULL] = round((time.perf_counter() - start) * 1000, 2)
             
-            # Debug için OCR sonuçlarını logla
-            current_app.logger.info(f"OCR Result for {filepath}: {ocr_result}")
+            # Tam OCR çıktısı sadece örneklenmiş DEBUG kaydında; INFO'da özet
+            logger = current_app.logger
+            if ocr_result:
+                logger.info("OCR result for %s: success=%s confidence=%s chars=%d", filepath,
+                            ocr_result.get('success'), ocr_result.get('confidence'), len(ocr_result.get('text') or ''))
+                log_dump(logger, ocr_result, "OCR result dump for %s", filepath)
             
             if not ocr_result:
                 current_app.logger.error(f"OCR processing failed for {filepath}")
@@ -39,21 +126,114 @@ class DocumentProcessor:
             if not ocr_result.get('text'):
                 current_app.logger.warning(f"No text extracted from {filepath}")
 
-            # NER işlemi
             text = ocr_result.get('text', '')
-            ner_result = self.ner_processor.process_text(text)
+            document = ocr_result.get('document')
+            invoice_data = dict(ocr_result.get('invoice_data') or {})
+
+            # NER sadece zorunlu alanlar hâlâ eksikse çalışır
+            entities = {}
+            if self._missing_fields(invoice_data):
+                tier = self.TIER_NER
+                start = time.perf_counter()
+                with span('ner') as stage:
+                    ner_result = self.ner_processor.process_text(document or text)
+                    if not ner_result or not ner_result.get('success'):
+                        stage.fail()
+                tier_timings[self.TIER_NER] = round((time.perf_counter() - start) * 1000, 2)
+                if ner_result and ner_result.get('success'):
+                    entities = ner_result.get('entities', {})
+                    self._fill_from_entities(invoice_data, entities, ner_result.get('provenance'))
+            invoice_data['entities'] = entities
+
+            # Satıcının sayfa yönünü sonraki belgeler için hatırla
+            vendor = vendor_hint or invoice_data.get('vendor')
+            self.orientation_detector.remember(vendor, orientation['angle'])
+            self.language_detector.remember(vendor, languages)
+
+            # Kalem tablosu - kelime kutuları varsa geometrik, yoksa satır kalıbı
+            with span('line_items'):
+                products = self.product_extractor.extract_table(document or text, vendor)
+
+            # Eşik ayarı için belgenin bittiği katmanı kaydet
+            self.tier_counts[tier] += 1
+            logger.info("Document %s finished at tier '%s' (timings_ms=%s, missing=%s)",
+                        filepath, tier, tier_timings, self._missing_fields(invoice_data))
 
             # Sonuçları birleştir
             return {
                 'success': True,
                 'text': text,
                 'confidence': ocr_result.get('confidence', 0),
-                'invoice_data': ner_result if ner_result else {}
+                'invoice_data': invoice_data,
+                'quality': quality,
+                'orientation': orientation,
+                'language': language,
+                'tier': tier,
+                'tier_timings': tier_timings,
+                'products': products['items'],
+                'products_method': products['method'],
+                'products_validation': products['validation'],
+                'document': document
             }
         except Exception as e:
             current_app.logger.error(f"Error processing document: {str(e)}")
             return None
 
+    def collect_metrics(self):
+        """/metrics için katman sayıları, önbellek isabetleri ve model yükleme süreleri"""
+        caches = [
+            ('orientation', self.orientation_detector.vendor_cache.hits,
+             self.orientation_detector.vendor_cache.misses),
+            ('language', self.language_detector.vendor_cache.hits, self.language_detector.vendor_cache.misses),
+        ]
+        normalizer = self.ocr_processor.normalizer
+        caches.append(('normalizer', normalizer.memo_hits, normalizer.memo_misses))
+        memo = self.ner_processor.memo
+        if memo is not None:
+            memo_stats = memo.stats()
+            caches.append(('ner_memo', memo_stats['hits'] + memo_stats['disk_hits'], memo_stats['misses']))
+        model_cache = self.ner_processor.model_cache
+        caches.append(('ner_model', model_cache.hits, model_cache.loads))
+
+        yield ('invoice_documents_total', 'counter', 'Documents finished per processing tier',
+               [({'tier': tier}, count) for tier, count in self.tier_counts.items()])
+        yield ('invoice_cache_requests_total', 'counter', 'Cache lookups by cache and result',
+               [({'cache': name, 'result': result}, count)
+                for name, hits, misses in caches for result, count in (('hit', hits), ('miss', misses))])
+        yield ('invoice_cache_hit_ratio', 'gauge', 'Cache hit ratio since process start',
+               [({'cache': name}, round(hits / (hits + misses), 4) if hits + misses else 0.0)
+                for name, hits, misses in caches])
+        yield ('invoice_ner_model_load_seconds', 'gauge', 'Time taken to load each spaCy pipeline',
+               [({'model': name}, elapsed_ms / 1000) for name, elapsed_ms in model_cache.load_times_ms.items()])
+        yield ('invoice_ner_models_loaded', 'gauge', 'spaCy pipelines currently in memory',
+               [({}, len(model_cache.loaded()))])
+
+    def _missing_fields(self, invoice_data):
+        """Boş kalan zorunlu alanları döndür"""
+        return [field for field in self.REQUIRED_FIELDS if not invoice_data.get(field)]
+
+    def _needs_escalation(self, ocr_result):
+        """Hızlı geçiş sonucu yetersizse ağır katmana geç"""
+        if not ocr_result or not ocr_result.get('success'):
+            return True
+        if ocr_result.get('confidence', 0) < self.min_confidence:
+            return True
+        return bool(self._missing_fields(ocr_result.get('invoice_data') or {}))
+
+    def _fill_from_entities(self, invoice_data, entities, provenance=None):
+        """Eksik alanları NER sonuçlarından doldur; özel kalıplardan gelen tutarın satırı da kaydedilir"""
+        if not invoice_data.get('vendor') and entities.get('organizations'):
+            invoice_data['vendor'] = entities['organizations'][0]
+        if not invoice_data.get('date') and entities.get('dates'):
+            invoice_data['date'] = entities['dates'][0]
+        if not invoice_data.get('total_amount') and entities.get('amounts'):
+            invoice_data['total_amount'] = self.ocr_processor._extract_amount(
+                entities['amounts'][0], invoice_data.get('vendor'))
+            # Özel kalıp tutarları listenin sonundadır; ilk tutar onlardansa satırı bilinir
+            custom = (provenance or {}).get('amounts') or []
+            if custom and len(custom) == len(entities['amounts']) and custom[0]:
+                invoice_data.setdefault('provenance', {})['total_amount'] = custom[0]
+
     def _load_image(self, filepath):
         """Görüntüyü yükle ve ön işle"""
         try:
@@ -107,7 +287,7 @@ class DocumentProcessor:
         """Sonuçları formatla"""
         try:
             # Debug için
-            self.logger.info(f"Formatting results: {results}")
+            log_dump(self.logger, results, "Formatting results")
             
             return {
                 'success': True,
@@ -1,7 +1,12 @@
 import re
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
 from decimal import Decimal
+from .document import OCRDocument, OCRLine
+from .product_extractor import TableExtractor
+from .vendor_profiles import VendorProfile
+
+DECIMAL_AMOUNT_PATTERN = re.compile(r'(\d+\.\d{2})')
 
 @dataclass
 class InvoiceProduct:
@@ -29,24 +34,53 @@ class Invoice:
     products: List[InvoiceProduct]
 
 class InvoiceParser:
-    def parse(self, text: str) -> Invoice:
-        lines = text.split('\n')
+    """Satıcı profilindeki sayfa düzenine göre tam fatura (ürünler dahil) ayrıştırıcı"""
+
+    def __init__(self, layout: Union[VendorProfile, Dict[str, Any]], config=None):
+        # Satıcı adı tablo tutarlarının sayı biçimi için kullanılır
+        self.vendor = layout.name if isinstance(layout, VendorProfile) else None
+        layout = layout.layout if isinstance(layout, VendorProfile) else layout
+        self.table_extractor = TableExtractor(config)
+        self.sender_lines = slice(*layout.get('sender_lines', [0, 8]))
+        self.recipient_lines = slice(*layout.get('recipient_lines', [8, 12]))
+        self.sender_keywords = layout.get('sender_keywords', [])
+        self.address_keywords = layout.get('address_keywords', [])
+        self.recipient_keywords = layout.get('recipient_keywords', [])
+        self.subtotal_keywords = layout.get('subtotal_keywords', [])
+        self.tax_keywords = layout.get('tax_keywords', [])
+        self.tax_exclude_keywords = layout.get('tax_exclude_keywords', [])
+        self.total_keywords = layout.get('total_keywords', [])
+        self.description_marker = layout.get('description_marker')
+
+        # Kalıplar profil yüklenirken bir kez derlenir
+        self.product_line_pattern = self._compile(layout.get('product_line_pattern'))
+        self.description_prefix_pattern = self._compile(layout.get('description_prefix_pattern'))
+        self.date_pattern = self._compile(layout.get('date_pattern'))
+        self.invoice_number_pattern = self._compile(layout.get('invoice_number_pattern'))
+
+    @staticmethod
+    def _compile(pattern: Optional[str]) -> Optional[re.Pattern]:
+        return re.compile(pattern) if pattern else None
+
+    def parse(self, document: Union[OCRDocument, str]) -> Invoice:
+        document = OCRDocument.ensure(document)
+        lines = document.lines
         
         # 1. Şirket bilgilerini çıkar
-        sender = self._extract_sender(lines[:8])  # İlk 8 satıra bak
-        recipient = self._extract_recipient(lines[8:12])  # Sonraki 4 satıra bak
+        sender = self._extract_sender(lines[self.sender_lines])
+        recipient = self._extract_recipient(lines[self.recipient_lines])
         
         # 2. Ürünleri çıkar
-        products = self._extract_products(lines)
+        products = self._extract_products(document)
         
         # 3. Tutarları çıkar
         amounts = self._extract_amounts(lines)
         
         # 4. Tarihi çıkar
-        date = self._extract_date(text)
+        date = self._search(self.date_pattern, document.text)
         
         # 5. Fatura numarasını çıkar
-        invoice_number = self._extract_invoice_number(text)
+        invoice_number = self._search(self.invoice_number_pattern, document.text)
         
         return Invoice(
             sender_company=sender['company'],
@@ -60,47 +94,54 @@ class InvoiceParser:
             products=products
         )
     
-    def _extract_sender(self, lines: List[str]) -> dict:
+    def _extract_sender(self, lines: List[OCRLine]) -> dict:
         """Gönderen şirket bilgilerini çıkar"""
         company = None
         address_parts = []
         
         for line in lines:
-            line = line.strip()
-            if not line:
+            if not line.stripped:
                 continue
                 
             # Şirket adını bul
-            if 'PERNIAGAAN' in line:
-                company = line
+            if any(keyword in line.stripped for keyword in self.sender_keywords):
+                company = line.stripped
                 continue
             
             # Adres satırlarını topla
-            if any(keyword in line.upper() for keyword in ['JALAN', 'BANDAR', 'TEL', 'FAX', 'GST NO']):
-                address_parts.append(line)
+            if any(keyword in line.upper for keyword in self.address_keywords):
+                address_parts.append(line.stripped)
         
         return {
             'company': company,
             'address': ', '.join(address_parts)
         }
     
-    def _extract_recipient(self, lines: List[str]) -> str:
+    def _extract_recipient(self, lines: List[OCRLine]) -> str:
         """Alıcı şirket adını çıkar"""
         for line in lines:
-            if 'ENGINEERING' in line.upper():
-                return line.strip()
+            if any(keyword in line.upper for keyword in self.recipient_keywords):
+                return line.stripped
         return None
     
-    def _extract_products(self, lines: List[str]) -> List[InvoiceProduct]:
-        """Ürün listesini çıkar"""
+    def _extract_products(self, document: OCRDocument) -> List[InvoiceProduct]:
+        """Ürün listesini çıkar - kelime kutuları varsa geometrik tablo, yoksa profilin satır kalıbı"""
+        table = self.table_extractor.extract(document, self.vendor) if len(document.words) else None
+        if table and table['items']:
+            return [InvoiceProduct(code=item.code or '', description=item.description or '',
+                                   quantity=item.quantity, unit_price=item.unit_price, total=item.total)
+                    for item in table['items']]
+
         products = []
         current_product = None
+        if not self.product_line_pattern:
+            return products
         
-        for line in lines:
-            line = line.strip()
+        for line in document.lines:
+            line = line.stripped
             
             # Ürün kodu ve fiyat satırı
-            if match := re.match(r'(\d+)\s+(\d+)\s+(\d+\.\d{2})', line):
+            if match := self.product_line_pattern.match(line):
                 if current_product:
                     products.append(current_product)
                 
@@ -114,8 +155,8 @@ class InvoiceParser:
                 )
             
             # Ürün açıklaması
-            elif current_product and 'SR' in line:
-                desc = re.sub(r'^SR[:\.]?\s*', '', line)
+            elif current_product and self.description_marker and self.description_marker in line:
+                desc = self.description_prefix_pattern.sub('', line) if self.description_prefix_pattern else line
                 current_product.description = desc.strip()
         
         if current_product:
@@ -123,7 +164,7 @@ class InvoiceParser:
         
         return products
     
-    def _extract_amounts(self, lines: List[str]) -> dict:
+    def _extract_amounts(self, lines: List[OCRLine]) -> dict:
         """Tutarları çıkar"""
         amounts = {
             'subtotal': Decimal('0'),
@@ -132,33 +173,28 @@ class InvoiceParser:
         }
         
         for line in lines:
-            line = line.strip().upper()
+            line = line.upper
             
             # Alt toplam
-            if '(EXCLUDED GST) SUB' in line:
-                if match := re.search(r'(\d+\.\d{2})', line):
+            if any(keyword in line for keyword in self.subtotal_keywords):
+                if match := DECIMAL_AMOUNT_PATTERN.search(line):
                     amounts['subtotal'] = Decimal(match.group(1))
             
             # Vergi
-            elif 'GST' in line and not 'GST NO' in line:
-                if match := re.search(r'(\d+\.\d{2})', line):
+            elif (any(keyword in line for keyword in self.tax_keywords) and
+                  not any(keyword in line for keyword in self.tax_exclude_keywords)):
+                if match := DECIMAL_AMOUNT_PATTERN.search(line):
                     amounts['tax'] = Decimal(match.group(1))
             
             # Toplam
-            elif 'TOTAL (RM)' in line or 'CASH' in line:
-                if match := re.search(r'(\d+\.\d{2})', line):
+            elif any(keyword in line for keyword in self.total_keywords):
+                if match := DECIMAL_AMOUNT_PATTERN.search(line):
                     amounts['total'] = Decimal(match.group(1))
         
         return amounts
     
-    def _extract_date(self, text: str) -> str:
-        """Fatura tarihini çıkar"""
-        if match := re.search(r'Date\s*:\s*(\d{2}/\d{2}/\d{4})', text):
+    def _search(self, pattern: Optional[re.Pattern], text: str) -> str:
+        """Kalıbın ilk grubunu döndür"""
+        if pattern and (match := pattern.search(text)):
             return match.group(1)
         return None
-    
-    def _extract_invoice_number(self, text: str) -> str:
-        """Fatura numarasını çıkar"""
-        if match := re.search(r'Receipt#\s*:\s*(\w+)', text):
-            return match.group(1)
-        return None 
\ No newline at end of file
@@ -0,0 +1,120 @@
+import logging
+import re
+import time
+from typing import Dict, Any, List, Optional, Sequence
+import cv2
+import numpy as np
+import pytesseract
+from .vendor_cache import VendorCache
+
+# Config dil kodları -> Tesseract dil paketleri
+TESSERACT_LANGUAGES = {'tr': 'tur', 'en': 'eng'}
+
+# Türkçeye özgü harfler (ç, ö, ü başka dillerde de geçtiği için daha düşük ağırlık)
+TURKISH_STRONG_CHARS = set('ğĞışŞİ')
+TURKISH_WEAK_CHARS = set('çÇöÖüÜ')
+
+LANGUAGE_KEYWORDS = {
+    'tr': re.compile(
+        r'\b(?:fatura|tarih|toplam|kdv|vergi|tutar|adet|birim|fiyat|vkn|tckn|'
+        r'sayın|ödeme|müşteri|açıklama|miktar|genel|iskonto|matrah)\b',
+        re.IGNORECASE),
+    'en': re.compile(
+        r'\b(?:invoice|date|total|amount|tax|qty|quantity|price|subtotal|'
+        r'balance|due|bill|receipt|description|customer|payment|vat)\b',
+        re.IGNORECASE),
+}
+
+
+def tesseract_lang(languages: Sequence[str]) -> str:
+    """Config dil kodlarını Tesseract -l parametresine çevir"""
+    return '+'.join(TESSERACT_LANGUAGES.get(lang, lang) for lang in languages)
+
+
+def language_scores(text: str) -> Dict[str, float]:
+    """Metindeki dil kanıtlarını puanla"""
+    scores = {lang: float(len(pattern.findall(text))) for lang, pattern in LANGUAGE_KEYWORDS.items()}
+    strong = sum(1 for ch in text if ch in TURKISH_STRONG_CHARS)
+    weak = sum(1 for ch in text if ch in TURKISH_WEAK_CHARS)
+    scores['tr'] += strong * 0.5 + weak * 0.2
+    return scores
+
+
+def detect_text_language(text: str, allowed: Sequence[str] = ('tr', 'en'),
+                         default: Optional[str] = None) -> str:
+    """Metnin dilini izin verilen diller arasından seç"""
+    scores = language_scores(text)
+    candidates = [lang for lang in allowed if lang in scores]
+    if not candidates:
+        return default or allowed[0]
+    best = max(candidates, key=lambda lang: scores[lang])
+    if scores[best] == 0:
+        return default or allowed[0]
+    return best
+
+
+class LanguageDetector:
+    """OCR dil setini küçük bir kırpıntı yoklaması veya satıcı geçmişiyle belirler"""
+
+    def __init__(self, config=None):
+        self.config = config or {}
+        self.logger = logging.getLogger(__name__)
+        self.allowed = list(self.config.get('OCR_LANGUAGES', ['tr', 'en']))
+        self.probe_width = self.config.get('LANGUAGE_PROBE_WIDTH', 1000)
+        self.probe_height_ratio = self.config.get('LANGUAGE_PROBE_HEIGHT_RATIO', 0.35)
+        # Kazanan dilin diğerinden en az bu kadar önde olması gerekir
+        self.min_margin = self.config.get('LANGUAGE_MIN_MARGIN', 2.0)
+
+        # Satıcı -> dil listesi
+        self.vendor_cache = VendorCache(self.config.get('LANGUAGE_CACHE_SIZE', 1000))
+
+    def detect(self, image: np.ndarray, vendor: Optional[str] = None) -> Dict[str, Any]:
+        """Belge için gereken en küçük dil setini seç"""
+        start = time.perf_counter()
+
+        if len(self.allowed) == 1:
+            return {'languages': list(self.allowed), 'source': 'config', 'elapsed_ms': 0.0}
+
+        cached = self.vendor_cache.get(vendor)
+        if cached is not None:
+            return {'languages': list(cached), 'source': 'vendor_history', 'elapsed_ms': 0.0}
+
+        languages = list(self.allowed)
+        try:
+            probe = self._crop_probe(image)
+            text = pytesseract.image_to_string(probe, lang=tesseract_lang(self.allowed),
+                                               config='--oem 3 --psm 6')
+            languages = self._choose(language_scores(text))
+        except Exception as e:
+            self.logger.warning(f"Language probe failed, using all languages: {str(e)}")
+
+        result = {
+            'languages': languages,
+            'source': 'probe',
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 2)
+        }
+        self.logger.info("Language probe: %s", result)
+        return result
+
+    def remember(self, vendor: Optional[str], languages: List[str]):
+        """Tek dile indirgenebilen satıcıların dilini hatırla"""
+        if len(languages) == 1:
+            self.vendor_cache.set(vendor, list(languages))
+
+    def _choose(self, scores: Dict[str, float]) -> List[str]:
+        """Açık bir kazanan varsa tek dil, yoksa izin verilen tüm diller"""
+        ranked = sorted(self.allowed, key=lambda lang: scores.get(lang, 0), reverse=True)
+        best = scores.get(ranked[0], 0)
+        runner_up = scores.get(ranked[1], 0) if len(ranked) > 1 else 0
+        if best > 0 and best - runner_up >= self.min_margin:
+            return [ranked[0]]
+        return list(self.allowed)
+
+    def _crop_probe(self, image: np.ndarray) -> np.ndarray:
+        """Sayfanın üst bandını küçültülmüş gri kırpıntı olarak al"""
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        crop = gray[:max(int(gray.shape[0] * self.probe_height_ratio), 1), :]
+        if crop.shape[1] > self.probe_width:
+            scale = self.probe_width / crop.shape[1]
+            crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return crop
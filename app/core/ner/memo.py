@@ -0,0 +1,187 @@
+import copy
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class NERMemo:
+    """Normalize edilmiş OCR metnine göre anahtarlanan, sınırlı LRU NER sonuç önbelleği
+
+    Bellekten çıkarılan kayıtlar spill_dir verilmişse JSON olarak diske yazılır
+    ve sonraki isteklerde oradan geri yüklenir. Disk kayıtları sürüm başına bir
+    dizinde tutulur: aynı dilin yeni sürümü ilk kez yazılırken eski sürümün dizini
+    silinir, dosya sayısı spill_max_files'ı aşınca en eskiler silinir.
+    """
+
+    def __init__(self, max_size: int = 1000, spill_dir: Optional[str] = None, spill_max_files: int = 10000):
+        self.logger = logging.getLogger(__name__)
+        self.max_size = max(1, max_size)
+        self.spill_dir = spill_dir
+        self.spill_max_files = max(1, spill_max_files)
+        # sürüm etiketi -> tam sürüm metni; disk dizinleri etiketle adlandırılır
+        self._versions = {}
+        self._spill_versions = set()
+        self._spill_count = None
+        self._spill_lock = threading.Lock()
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.spills = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Boşluk ve büyük/küçük harf farklarını yok say"""
+        return ' '.join(text.lower().split())
+
+    def key(self, text: str, version: str) -> str:
+        """Model/kalıp sürümü etiketi ve normalize metnin özetinden anahtar üret"""
+        tag = hashlib.sha256(version.encode('utf-8')).hexdigest()[:16]
+        self._versions[tag] = version
+        return f"{tag}_{hashlib.sha256(self.normalize(text).encode('utf-8')).hexdigest()}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(value)
+
+        value = self._read_spill(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self.put(key, value)
+        return copy.deepcopy(value)
+
+    def put(self, key: str, value: Dict[str, Any]):
+        evicted = []
+        with self._lock:
+            self._items[key] = copy.deepcopy(value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                evicted.append(self._items.popitem(last=False))
+        # Disk yazımı kilit dışında
+        for old_key, old_value in evicted:
+            self._write_spill(old_key, old_value)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """İsabet / ıska sayaçları"""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'size': len(self._items),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'spills': self.spills,
+            'hit_rate': round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0
+        }
+
+    def _spill_path(self, key: str) -> str:
+        tag, digest = key.split('_', 1)
+        return os.path.join(self.spill_dir, tag, digest[:2], f'{digest}.json')
+
+    def _write_spill(self, key: str, value: Dict[str, Any]):
+        if not self.spill_dir:
+            return
+        try:
+            tag = key.split('_', 1)[0]
+            with self._spill_lock:
+                if tag not in self._spill_versions:
+                    self._start_version(tag)
+                    self._spill_versions.add(tag)
+                if self._spill_count is None:
+                    self._spill_count = len(self._spill_files())
+
+            path = self._spill_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self.spills += 1
+
+            with self._spill_lock:
+                self._spill_count += 1
+                if self._spill_count > self.spill_max_files:
+                    self._prune()
+        except (OSError, TypeError) as e:
+            self.logger.warning(f"NER memo spill failed: {str(e)}")
+
+    def _start_version(self, tag: str):
+        """Sürüm dizinini aç; aynı dilin eski sürümlerinin ve eski düzenin dizinlerini sil
+
+        NERModel sürümleri '<dil>|<kaynak>|...' biçimindedir; ilk alan aynı olup
+        etiketi farklı olan dizinler artık okunamayacak kayıtlardır.
+        """
+        version = self._versions.get(tag, '')
+        directory = os.path.join(self.spill_dir, tag)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, 'version.txt'), 'w', encoding='utf-8') as f:
+            f.write(version)
+
+        lineage = version.split('|', 1)[0]
+        for name in os.listdir(self.spill_dir):
+            path = os.path.join(self.spill_dir, name)
+            if name == tag or not os.path.isdir(path):
+                continue
+            try:
+                with open(os.path.join(path, 'version.txt'), encoding='utf-8') as f:
+                    stale = f.read().split('|', 1)[0] == lineage
+            except OSError:
+                # Sürüm dizini olmayan iki harfli dizinler eski (sürümsüz) düzenden kalır
+                stale = len(name) == 2
+            if stale:
+                shutil.rmtree(path, ignore_errors=True)
+                self.logger.info(f"Removed stale NER memo spill directory {name}")
+
+    def _spill_files(self):
+        """Diskteki kayıtlar: (değiştirilme zamanı, yol)"""
+        files = []
+        for root, _, names in os.walk(self.spill_dir):
+            for name in names:
+                if name.endswith('.json'):
+                    path = os.path.join(root, name)
+                    try:
+                        files.append((os.path.getmtime(path), path))
+                    except OSError:
+                        pass
+        return files
+
+    def _prune(self):
+        """En eski kayıtları sil; dosya sayısı sınırın %90'ına iner (her yazımda taranmasın)"""
+        files = sorted(self._spill_files())
+        keep = int(self.spill_max_files * 0.9)
+        for _, path in files[:max(len(files) - keep, 0)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._spill_count = min(len(files), keep)
+
+    def _read_spill(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.spill_dir:
+            return None
+        try:
+            path = self._spill_path(key)
+            with open(path, encoding='utf-8') as f:
+                value = json.load(f)
+            # Okunan kayıt budamada en son silinsin
+            os.utime(path)
+            return value
+        except (OSError, ValueError):
+            return None
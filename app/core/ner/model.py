@@ -1,61 +1,275 @@
-import spacy
 import logging
-from typing import Dict, Any, List
+import os
+import threading
+import time
+from typing import Dict, Any, List, Tuple, Union
 import re
 from datetime import datetime
 from flask import current_app
+from app.core.document import OCRDocument
+from app.core.language import detect_text_language
+from app.utils.process_stats import peak_rss_mb
+from .model_cache import ModelCache
+from .memo import NERMemo
+from .patterns import PATTERNS, PATTERNS_VERSION, EXCLUDED_COMPONENTS
+
+# Süreç başına tek model önbelleği - tüm NERModel örnekleri paylaşır
+_model_cache = None
+_model_cache_lock = threading.Lock()
+
+# Web yolu ve toplu işler arasında paylaşılan NER sonuç önbelleği
+_memo = None
+_memo_lock = threading.Lock()
+
+# Dil başına gecikme ve bellek istatistikleri
+_language_stats = {}
+_language_stats_lock = threading.Lock()
+
+# Özel entity kalıpları - satır başına, satırın küçük/büyük harfli hali üzerinde çalışır
+TAX_ID_PATTERN = re.compile(r'(?:TAX\s+ID|VAT\s+NO|GSTIN)\s*:\s*([A-Z0-9-]+)')
+ADDRESS_PATTERN = re.compile(r'address\s*:\s*(.+)|.*no.*?/')
+AMOUNT_PATTERN = re.compile(r'(?:total|amount|balance)\s*:?\s*(?:tl|₺|usd|\$|eur|€)?\s*(\d+(?:[.,]\d{2})?)')
+
+def _original_offset(text: str, lower_offset: int) -> int:
+    """text.lower() içindeki ofsetin text'teki karşılığı ('İ' gibi harfler küçülünce uzar)"""
+    offset = 0
+    for index, char in enumerate(text):
+        if offset >= lower_offset:
+            return index
+        offset += len(char.lower())
+    return len(text)
+
+
+def spacy_version() -> str:
+    """spaCy sürümü; paket sadece ilk çağrıda içe aktarılır"""
+    import spacy
+    return spacy.__version__
+
 
 class NERModel:
-    def __init__(self):
+    # Dil kodu -> spaCy model adı
+    DEFAULT_MODELS = {'en': 'en_core_web_lg', 'tr': 'tr_core_news_lg'}
+
+    def __init__(self, config=None):
+        self.config = config or {}
         self.logger = logging.getLogger(__name__)
-        self._nlp = None
+        self.models = dict(self.config.get('NER_MODELS', self.DEFAULT_MODELS))
+        self.default_language = self.config.get('NER_DEFAULT_LANGUAGE', 'en')
+        # scripts/build_ner_pipeline.py çıktısı: <dizin>/<dil>
+        self.pipeline_dir = self.config.get('NER_PIPELINE_DIR', os.path.join('models', 'ner'))
         
         # Özel entity patterns
-        self.patterns = [
-            {"label": "VENDOR", "pattern": [{"TEXT": {"REGEX": "^[A-Z][A-Za-z\s]+(?:Ltd|Inc|LLC|Co\.|Company|A\.Ş\.|Limited)$"}}]},
-            {"label": "TAX_ID", "pattern": [{"TEXT": {"REGEX": "^[A-Z0-9-]{10,15}$"}}]},
-            {"label": "AMOUNT", "pattern": [{"TEXT": {"REGEX": "\d+[.,]\d{2}"}}]},
-            {"label": "ADDRESS", "pattern": [{"TEXT": {"REGEX": ".*NO.*?/.*"}}]},
-        ]
+        self.patterns = PATTERNS
+
+    @property
+    def model_cache(self) -> ModelCache:
+        """Süreç genelindeki model önbelleği"""
+        global _model_cache
+        if _model_cache is None:
+            with _model_cache_lock:
+                if _model_cache is None:
+                    _model_cache = ModelCache(
+                        self._load_language,
+                        max_models=self.config.get('NER_MAX_MODELS', len(self.models)),
+                        max_memory_mb=self.config.get('NER_MAX_MODEL_MEMORY_MB'),
+                        versioner=self._pipeline_version
+                    )
+        return _model_cache
+
+    @property
+    def memo(self) -> NERMemo:
+        """Süreç genelindeki NER sonuç önbelleği (kapalıysa None)"""
+        global _memo
+        if not self.config.get('NER_MEMO_ENABLED', True):
+            return None
+        if _memo is None:
+            with _memo_lock:
+                if _memo is None:
+                    _memo = NERMemo(
+                        max_size=self.config.get('NER_MEMO_SIZE', 1000),
+                        spill_dir=self.config.get('NER_MEMO_SPILL_DIR'),
+                        spill_max_files=self.config.get('NER_MEMO_SPILL_MAX_FILES', 10000)
+                    )
+        return _memo
+
+    def version(self, language: str) -> str:
+        """Önbellek anahtarı için model + kalıp sürümü - pipeline yüklenirken bir kez hesaplanır"""
+        if language not in self.models:
+            language = self.default_language
+        return self.model_cache.version(language) or self._pipeline_version(language)
+
+    def _pipeline_version(self, language: str) -> str:
+        """Dil, kaynak, derleme zamanı, spaCy ve kalıp sürümü"""
+        source = self.pipeline_source(language)
+        meta_path = os.path.join(source, 'meta.json')
+        # Yeniden derlenip yüklenen pipeline eski kayıtları geçersiz kılar
+        built = os.path.getmtime(meta_path) if os.path.isfile(meta_path) else ''
+        return f"{language}|{source}|{built}|{spacy_version()}|{PATTERNS_VERSION}"
 
     @property
     def nlp(self):
-        if self._nlp is None:
-            try:
-                self._nlp = spacy.load("en_core_web_lg")
-                
-                # Özel entity ruler ekle
-                ruler = self._nlp.add_pipe("entity_ruler", before="ner")
-                ruler.add_patterns(self.patterns)
-                
-            except:
-                spacy.cli.download("en_core_web_lg")
-                self._nlp = spacy.load("en_core_web_lg")
-        return self._nlp
-
-    def process_text(self, text: str) -> Dict[str, Any]:
+        """Varsayılan dilin pipeline'ı"""
+        return self.pipeline(self.default_language)
+
+    def pipeline(self, language: str):
+        """Dile ait pipeline'ı önbellekten al, yoksa tembel yükle"""
+        if language not in self.models:
+            language = self.default_language
+        return self.model_cache.get(language)
+
+    def pipeline_source(self, language: str) -> str:
+        """Derlenmiş hafif pipeline varsa onun yolu, yoksa paket adı"""
+        path = os.path.join(self.pipeline_dir, language)
+        if os.path.isfile(os.path.join(path, 'meta.json')):
+            return path
+        return self.models[language]
+
+    def detect_language(self, text: str) -> str:
+        """Metni yüklü modeller arasından uygun dile yönlendir"""
+        return detect_text_language(text, list(self.models.keys()), self.default_language)
+
+    def _load_language(self, language: str):
+        """Önbellek yükleyicisi: dilin derlenmiş pipeline'ı ya da paket modeli"""
+        return self._load_pipeline(self.pipeline_source(language))
+
+    def _load_pipeline(self, source: str):
+        """Pipeline'ı yükle - istek içinden asla model indirilmez"""
+        import spacy
         try:
-            doc = self.nlp(text)
-            entities = self._extract_entities(doc)
-            
-            # Özel entity işleme
-            custom_entities = self._process_custom_entities(text)
-            
-            # Sonuçları birleştir
-            for key, values in custom_entities.items():
-                if key in entities:
-                    entities[key].extend(values)
-                else:
-                    entities[key] = values
-            
-            return {
-                'entities': entities,
-                'success': True
-            }
+            nlp = spacy.load(source, exclude=EXCLUDED_COMPONENTS)
+        except OSError as e:
+            raise RuntimeError(
+                f"spaCy pipeline '{source}' is not available; install the model package "
+                f"or run scripts/build_ner_pipeline.py") from e
+
+        # Derlenmiş pipeline ruler'ı içerir, paket modeline çalışma anında eklenir
+        if 'entity_ruler' not in nlp.pipe_names:
+            self.logger.warning(f"Pipeline {source} has no baked-in entity ruler, adding it at load time")
+            ruler = nlp.add_pipe("entity_ruler", before="ner" if "ner" in nlp.pipe_names else None)
+            ruler.add_patterns(self.patterns)
+        elif nlp.meta.get('invoice_patterns_version') != PATTERNS_VERSION:
+            self.logger.warning(f"Pipeline {source} was built with outdated entity patterns, rebuild it")
+        return nlp
+
+    def process_text(self, text: Union[str, OCRDocument], language: str = None) -> Dict[str, Any]:
+        try:
+            document = OCRDocument.ensure(text)
+            text = document.text
+            language = language or self.detect_language(text)
+
+            # Aynı metin daha önce işlendiyse spaCy'yi atla
+            memo = self.memo
+            key = memo.key(text, self.version(language)) if memo else None
+            if key:
+                cached = memo.get(key)
+                if cached is not None:
+                    return cached
+
+            start = time.perf_counter()
+            doc = self.pipeline(language)(text)
+            result = self._build_result(doc, document, language)
+            self._record(language, (time.perf_counter() - start) * 1000)
+            if key:
+                memo.put(key, result)
+            return result
         except Exception as e:
             self.logger.error(f"NER Error: {str(e)}")
             return {'success': False, 'error': str(e)}
 
+    def process_texts(self, texts: List[Union[str, OCRDocument]], batch_size: int = None, n_process: int = None,
+                      languages: List[str] = None) -> List[Dict[str, Any]]:
+        """Toplu işler için nlp.pipe ile akışlı NER - sonuçlar giriş sırasıyla döner"""
+        documents = [OCRDocument.ensure(text) for text in texts]
+        texts = [document.text for document in documents]
+        batch_size = batch_size or self.config.get('BATCH_SIZE', 16)
+        n_process = n_process or self.config.get('NER_THREAD_COUNT', 1)
+        results = [None] * len(texts)
+
+        # Metinleri dile göre grupla, her grup kendi pipeline'ından akar
+        memo = self.memo
+        keys = [None] * len(texts)
+        versions = {}
+        groups = {}
+        for index, text in enumerate(texts):
+            language = languages[index] if languages else self.detect_language(text)
+            if memo:
+                if language not in versions:
+                    versions[language] = self.version(language)
+                keys[index] = memo.key(text, versions[language])
+                cached = memo.get(keys[index])
+                if cached is not None:
+                    results[index] = cached
+                    continue
+            groups.setdefault(language, []).append(index)
+
+        for language, indices in groups.items():
+            try:
+                start = time.perf_counter()
+                nlp = self.pipeline(language)
+                docs = nlp.pipe((texts[i] for i in indices), batch_size=batch_size, n_process=n_process)
+                for index, doc in zip(indices, docs):
+                    results[index] = self._build_result(doc, documents[index], language)
+                    if keys[index]:
+                        memo.put(keys[index], results[index])
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                for _ in indices:
+                    self._record(language, elapsed_ms / len(indices))
+            except Exception as e:
+                self.logger.error(f"Batch NER Error ({language}): {str(e)}")
+                for index in indices:
+                    if results[index] is None:
+                        results[index] = {'success': False, 'error': str(e)}
+
+        return results
+
+    def _build_result(self, doc, document: OCRDocument, language: str) -> Dict[str, Any]:
+        """spaCy entity'lerini özel entity'lerle birleştir"""
+        entities = self._extract_entities(doc)
+        
+        # Özel entity işleme
+        custom_entities, provenance = self._process_custom_entities(document)
+        
+        # Sonuçları birleştir
+        for key, values in custom_entities.items():
+            if key in entities:
+                entities[key].extend(values)
+            else:
+                entities[key] = values
+        
+        return {
+            'entities': entities,
+            'provenance': provenance,
+            'language': language,
+            'success': True
+        }
+
+    def _record(self, language: str, elapsed_ms: float):
+        """Dil başına gecikme ve en yüksek RSS değerini kaydet"""
+        with _language_stats_lock:
+            stats = _language_stats.setdefault(language, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            stats['count'] += 1
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            stats['peak_rss_mb'] = round(peak_rss_mb(), 1)
+
+    def stats(self) -> Dict[str, Any]:
+        """Dil başına gecikme / RSS raporu ve model önbelleği durumu"""
+        with _language_stats_lock:
+            languages = {
+                language: {
+                    'count': stats['count'],
+                    'mean_ms': round(stats['total_ms'] / stats['count'], 2),
+                    'max_ms': round(stats['max_ms'], 2),
+                    'peak_rss_mb': stats['peak_rss_mb']
+                }
+                for language, stats in _language_stats.items()
+            }
+        return {
+            'languages': languages,
+            'model_cache': self.model_cache.info(),
+            'memo': self.memo.stats() if self.memo else None
+        }
+
     def _extract_entities(self, doc) -> Dict[str, list]:
         entities = {
             'organizations': [],
@@ -66,14 +280,15 @@ class NERModel:
             'addresses': []
         }
         
+        # Türkçe modeller ORGANIZATION / LOCATION etiketlerini kullanır
         for ent in doc.ents:
-            if ent.label_ == 'ORG':
+            if ent.label_ in ['ORG', 'ORGANIZATION']:
                 entities['organizations'].append(ent.text)
             elif ent.label_ == 'DATE':
                 entities['dates'].append(ent.text)
             elif ent.label_ == 'MONEY':
                 entities['amounts'].append(ent.text)
-            elif ent.label_ in ['GPE', 'LOC']:
+            elif ent.label_ in ['GPE', 'LOC', 'LOCATION']:
                 entities['locations'].append(ent.text)
             elif ent.label_ == 'TAX_ID':
                 entities['tax_ids'].append(ent.text)
@@ -82,27 +297,35 @@ class NERModel:
         
         return {k: list(set(v)) for k, v in entities.items()}
 
-    def _process_custom_entities(self, text: str) -> Dict[str, List[str]]:
-        """Özel entity işleme"""
+    def _process_custom_entities(self, document: OCRDocument) -> Tuple[Dict[str, List[str]], Dict[str, list]]:
+        """Özel entity işleme - değerler ve geldikleri satırlar (aynı sırada)"""
         custom_entities = {
             'tax_ids': [],
             'addresses': [],
             'amounts': []
         }
+        provenance = {key: [] for key in custom_entities}
+
+        def add(key, value, line):
+            custom_entities[key].append(value)
+            provenance[key].append(document.provenance(line))
+
+        for line in document.lines:
+            # Vergi numarası
+            for match in TAX_ID_PATTERN.finditer(line.upper):
+                add('tax_ids', match.group(1), line)
+
+            lower = line.lower
+            # Adres - değer satırın sonuna kadar sürer, asıl yazımıyla alınır
+            match = ADDRESS_PATTERN.search(lower)
+            if match:
+                start = match.start(1) if match.group(1) is not None else 0
+                if len(lower) != len(line.text):
+                    start = _original_offset(line.text, start)
+                add('addresses', line.text[start:], line)
+
+            # Para miktarları
+            for match in AMOUNT_PATTERN.finditer(lower):
+                add('amounts', match.group(1), line)
         
-        # Vergi numarası
-        tax_pattern = r'(?i)(?:tax\s+id|vat\s+no|gstin)\s*:\s*([A-Z0-9-]+)'
-        if matches := re.finditer(tax_pattern, text):
-            custom_entities['tax_ids'].extend(m.group(1) for m in matches)
-        
-        # Adres
-        address_pattern = r'(?i)(?:address\s*:\s*([^\n]+)|.*NO.*?/.*)'
-        if matches := re.finditer(address_pattern, text):
-            custom_entities['addresses'].extend(m.group(1) if m.group(1) else m.group(0) for m in matches)
-        
-        # Para miktarları
-        amount_pattern = r'(?i)(?:total|amount|balance)\s*:?\s*(?:TL|₺|USD|\$|EUR|€)?\s*(\d+(?:[.,]\d{2})?)'
-        if matches := re.finditer(amount_pattern, text):
-            custom_entities['amounts'].extend(m.group(1) for m in matches)
-        
-        return custom_entities
\ No newline at end of file
+        return custom_entities, provenance
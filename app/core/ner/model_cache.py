@@ -0,0 +1,110 @@
+import gc
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+from app.utils.process_stats import rss_mb
+
+
+class ModelCache:
+    """spaCy pipeline'larını tembel yükleyen, süreç başına sınırlı LRU önbellek"""
+
+    def __init__(self, loader: Callable[[str], Any], max_models: int = 1,
+                 max_memory_mb: Optional[float] = None, versioner: Optional[Callable[[str], Any]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.loader = loader
+        # Yüklemede bir kez hesaplanan sürüm (ör. sonuç önbelleği anahtarı); yeniden yüklemede yenilenir
+        self.versioner = versioner
+        self.max_models = max(1, max_models)
+        self.max_memory_mb = max_memory_mb
+
+        # model adı -> (pipeline, tahmini bellek MB, sürüm)
+        self._models = OrderedDict()
+        # _lock sadece sözlük ve sayaçları korur; yükleme model başına kilitle yapılır
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+        self.load_times_ms = {}
+
+    def get(self, name: str):
+        """Pipeline'ı döndür, yüklü değilse yükle ve gerekirse eskisini çıkar"""
+        nlp = self._hit(name)
+        if nlp is not None:
+            return nlp
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+        # Aynı modeli iki thread birden yüklemesin; yüklü modellerin isabetleri
+        # ve başka modellerin yüklemeleri bu kilidi beklemez
+        with load_lock:
+            nlp = self._hit(name)
+            if nlp is not None:
+                return nlp
+
+            # Eşzamanlı başka bir yükleme varsa RSS farkı tahmini büyür
+            rss_before = rss_mb()
+            start = time.perf_counter()
+            nlp = self.loader(name)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            memory_mb = max(rss_mb() - rss_before, 0.0)
+            version = self.versioner(name) if self.versioner else None
+
+            with self._lock:
+                self._models[name] = (nlp, memory_mb, version)
+                self.loads += 1
+                self.load_times_ms[name] = round(elapsed_ms, 1)
+                evicted = self._evict()
+            self.logger.info(f"Loaded spaCy model {name} in {elapsed_ms:.0f} ms (~{memory_mb:.0f} MB)")
+            if evicted:
+                gc.collect()
+            return nlp
+
+    def _hit(self, name: str):
+        """Yüklü pipeline'ı LRU sırasını güncelleyerek döndür, yoksa None"""
+        with self._lock:
+            entry = self._models.get(name)
+            if entry is None:
+                return None
+            self._models.move_to_end(name)
+            self.hits += 1
+            return entry[0]
+
+    def version(self, name: str) -> Optional[Any]:
+        """Yüklü modelin yüklemedeki sürümü, yüklü değilse None (kilitsiz okuma, LRU sırası değişmez)"""
+        entry = self._models.get(name)
+        return entry[2] if entry is not None else None
+
+    def _evict(self) -> bool:
+        """Sayı veya bellek sınırı aşıldıysa en eski modelleri çıkar (sonuncusu hariç); _lock altında çağrılır"""
+        evicted = False
+        while len(self._models) > 1 and (
+                len(self._models) > self.max_models or
+                (self.max_memory_mb and self.memory_mb() > self.max_memory_mb)):
+            name, _ = self._models.popitem(last=False)
+            self.evictions += 1
+            evicted = True
+            self.logger.info(f"Evicted spaCy model {name}")
+        return evicted
+
+    def memory_mb(self) -> float:
+        """Yüklü modellerin tahmini toplam belleği"""
+        return sum(entry[1] for entry in list(self._models.values()))
+
+    def loaded(self):
+        return list(self._models)
+
+    def info(self) -> Dict[str, Any]:
+        """Önbellek durumu ve sayaçları"""
+        return {
+            'loaded': self.loaded(),
+            'memory_mb': round(self.memory_mb(), 1),
+            'max_models': self.max_models,
+            'max_memory_mb': self.max_memory_mb,
+            'hits': self.hits,
+            'loads': self.loads,
+            'evictions': self.evictions,
+            'load_times_ms': dict(self.load_times_ms)
+        }
@@ -0,0 +1,17 @@
+# Fatura alanları için entity ruler kalıpları
+# Kalıplar değiştiğinde PATTERNS_VERSION artırılmalı - derlenmiş pipeline'lar ve
+# NER önbelleği bu sürüme göre geçersiz kılınır
+PATTERNS_VERSION = '1'
+
+PATTERNS = [
+    {"label": "VENDOR", "pattern": [{"TEXT": {"REGEX": r"^[A-Z][A-Za-z\s]+(?:Ltd|Inc|LLC|Co\.|Company|A\.Ş\.|Limited)$"}}]},
+    {"label": "TAX_ID", "pattern": [{"TEXT": {"REGEX": r"^[A-Z0-9-]{10,15}$"}}]},
+    {"label": "AMOUNT", "pattern": [{"TEXT": {"REGEX": r"\d+[.,]\d{2}"}}]},
+    {"label": "ADDRESS", "pattern": [{"TEXT": {"REGEX": r".*NO.*?/.*"}}]},
+]
+
+# Sadece doc.ents okunduğu için NER dışındaki bileşenler yüklenmez
+EXCLUDED_COMPONENTS = [
+    'tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'trainable_lemmatizer',
+    'senter', 'morphologizer', 'textcat', 'textcat_multilabel'
+]
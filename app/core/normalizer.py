@@ -0,0 +1,232 @@
+import logging
+import re
+import threading
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Optional, Tuple, Union
+from .vendor_cache import VendorCache
+
+# Sayı biçimleri: ad -> (ondalık ayracı, binlik ayracı)
+NUMBER_FORMATS = {
+    'us': ('.', ','),     # 1,234.56
+    'eu': (',', '.'),     # 1.234,56 (TR, DE)
+    'space': (',', ' '),  # 1 234,56 (FR)
+    'swiss': ('.', "'"),  # 1'234.56
+}
+
+# Metindeki sayı parçası: boşluk sadece 3 haneli grupları ayırıp ondalıkla bitiyorsa sayının içindedir
+AMOUNT_TOKEN = r"-?\d{1,3}(?:[ \u00a0]\d{3})+,\d{1,2}(?![\d.,])|-?\d[\d.,']*\d|-?\d"
+AMOUNT_TOKEN_PATTERN = re.compile(AMOUNT_TOKEN)
+
+
+def _number_pattern(decimal: str, thousands: str) -> re.Pattern:
+    """Biçimin tam sayı parçası; komşu ayraç/rakam varsa eşleşmez (başka biçim demektir)"""
+    d, t = re.escape(decimal), re.escape(thousands)
+    return re.compile(rf"(?<![\d.,'])-?(?:\d{{1,3}}(?:{t}\d{{3}})+|\d+)(?:{d}\d+)?(?![\d.,'])")
+
+
+# Biçim başına katı kalıp - modül yüklenirken bir kez
+NUMBER_PATTERNS = {name: _number_pattern(*separators) for name, separators in NUMBER_FORMATS.items()}
+
+# Ay adlarının ilk üç harfi (İngilizce ve Türkçe)
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+    'oca': 1, 'şub': 2, 'sub': 2, 'nis': 4, 'haz': 6, 'tem': 7,
+    'ağu': 8, 'agu': 8, 'eyl': 9, 'eki': 10, 'kas': 11, 'ara': 12,
+}
+MONTH_NAME = r'[A-Za-zÇĞİÖŞÜçğıöşü]{3,9}\.?'
+
+# Tarih biçimleri: ad -> kalıp; gruplar (gün, ay, yıl) sırası DATE_ORDER'da
+DATE_PATTERNS = {
+    'ymd': re.compile(r'\b(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})\b'),
+    'dmy': re.compile(r'\b(\d{1,2})[-/.](\d{1,2})[-/.](\d{4}|\d{2})\b'),
+    'mdy': re.compile(r'\b(\d{1,2})[-/.](\d{1,2})[-/.](\d{4}|\d{2})\b'),
+    'd_mon_y': re.compile(rf'\b(\d{{1,2}})[\s./-]*({MONTH_NAME})[\s./,-]*(\d{{4}})\b'),
+    'mon_d_y': re.compile(rf'\b({MONTH_NAME})\s+(\d{{1,2}}),?\s+(\d{{4}})\b'),
+}
+# Grup indeksleri: (gün, ay, yıl)
+DATE_ORDER = {
+    'ymd': (2, 1, 0),
+    'dmy': (0, 1, 2),
+    'mdy': (1, 0, 2),
+    'd_mon_y': (0, 1, 2),
+    'mon_d_y': (1, 0, 2),
+}
+
+
+class Normalizer:
+    """Yerel ayara duyarlı tutar ve tarih ayrıştırıcı
+
+    Kalıplar modül yüklenirken derlenir. Bir satıcının belgesinde belirsiz olmayan
+    bir biçim görüldüğünde (ör. '1.234,56' -> eu, '25/12/2023' -> dmy) satıcıya
+    yazılır; sonraki belgelerde önce o biçim tek kalıpla denenir.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or {}
+        self.logger = logging.getLogger(__name__)
+        # Satıcı bilinmiyorsa belirsiz '03/04/2023' bu sırayla okunur ('dmy' veya 'mdy')
+        self.default_date_format = self.config.get('NORMALIZER_DEFAULT_DATE_FORMAT', 'dmy')
+
+        cache_size = self.config.get('NORMALIZER_CACHE_SIZE', 1000)
+        self.number_formats = VendorCache(cache_size)
+        self.date_formats = VendorCache(cache_size)
+
+        self.memo_hits = 0
+        self.memo_misses = 0
+
+    def parse_amount(self, value: Union[str, int, float, Decimal, None],
+                     vendor: Optional[str] = None) -> Optional[Decimal]:
+        """Metindeki ilk tutarı Decimal olarak döndür ('1.234,56 TL', '$1,234.56', '12,5')"""
+        if value is None:
+            return None
+        if isinstance(value, (int, float, Decimal)):
+            return Decimal(str(value))
+        value = value.replace('\u00a0', ' ')
+
+        # Satıcının bilinen biçimi: tek kalıp, tek dönüştürme
+        known = self.number_formats.peek(vendor) if vendor else None
+        if known:
+            match = NUMBER_PATTERNS[known].search(value)
+            if match:
+                self.memo_hits += 1
+                return self._to_decimal(match.group(), known)
+
+        match = AMOUNT_TOKEN_PATTERN.search(value)
+        if not match:
+            return None
+        token = match.group()
+
+        self.memo_misses += 1
+        number_format, certain = self._classify_number(token, known)
+        if certain and vendor:
+            self.number_formats.set(vendor, number_format)
+        return self._to_decimal(token, number_format)
+
+    def parse_float(self, value, vendor: Optional[str] = None, default: float = 0.0) -> float:
+        amount = self.parse_amount(value, vendor)
+        return float(amount) if amount is not None else default
+
+    def parse_date(self, value: Optional[str], vendor: Optional[str] = None) -> Optional[datetime]:
+        """Metindeki ilk geçerli tarih"""
+        found = self.find_date(value, vendor)
+        return found[0] if found else None
+
+    def find_date(self, value: Optional[str], vendor: Optional[str] = None) -> Optional[Tuple[datetime, int]]:
+        """Metindeki ilk geçerli tarih ve başladığı karakter ofseti"""
+        if not value:
+            return None
+
+        # Satıcının bilinen biçimi önce denenir
+        known = self.date_formats.peek(vendor) if vendor else None
+        if known:
+            found = self._search_date(value, known, allow_ambiguous=True)
+            if found:
+                self.memo_hits += 1
+                return found[0], found[1]
+
+        self.memo_misses += 1
+        best = None
+        for name in DATE_PATTERNS:
+            if name == known:
+                continue
+            found = self._search_date(value, name)
+            # Metinde en önce geçen tarih kazanır
+            if found and (best is None or found[1] < best[1]):
+                best = found
+        if best is None:
+            return None
+
+        date, start, name, certain = best
+        if certain and vendor:
+            self.date_formats.set(vendor, name)
+        return date, start
+
+    def stats(self):
+        return {
+            'number_formats': len(self.number_formats),
+            'date_formats': len(self.date_formats),
+            'memo_hits': self.memo_hits,
+            'memo_misses': self.memo_misses
+        }
+
+    def _classify_number(self, token: str, known: Optional[str]) -> Tuple[str, bool]:
+        """Sayı parçasının biçimi ve biçimin kesin olup olmadığı"""
+        digits = token.lstrip('-')
+        if "'" in digits:
+            return 'swiss', True
+        if ' ' in digits:
+            return 'space', True
+
+        last_dot, last_comma = digits.rfind('.'), digits.rfind(',')
+        if last_dot < 0 and last_comma < 0:
+            return known or 'eu', False
+        if last_dot >= 0 and last_comma >= 0:
+            # Son ayraç ondalık ayracıdır
+            return ('us', True) if last_dot > last_comma else ('eu', True)
+
+        separator = '.' if last_dot >= 0 else ','
+        if digits.count(separator) > 1:
+            # Aynı ayraç birden çok kez: binlik
+            return ('eu', True) if separator == '.' else ('us', True)
+        if len(digits) - digits.index(separator) - 1 != 3:
+            # '12,5' / '12.50' ondalıktır
+            return ('eu', True) if separator == ',' else ('us', True)
+
+        # '1.234' / '1,234' belirsiz: satıcı biçimi, yoksa binlik ayracı sayılır
+        if known in ('us', 'eu'):
+            return known, False
+        return ('eu' if separator == '.' else 'us'), False
+
+    def _to_decimal(self, token: str, number_format: str) -> Optional[Decimal]:
+        decimal, thousands = NUMBER_FORMATS[number_format]
+        token = token.replace(thousands, '')
+        if decimal != '.':
+            token = token.replace(decimal, '.')
+        try:
+            return Decimal(token)
+        except InvalidOperation:
+            return None
+
+    def _search_date(self, text: str, name: str,
+                     allow_ambiguous: bool = False) -> Optional[Tuple[datetime, int, str, bool]]:
+        """Biçimin metindeki ilk geçerli eşleşmesi: (tarih, ofset, biçim, kesin mi)"""
+        day_index, month_index, year_index = DATE_ORDER[name]
+        for match in DATE_PATTERNS[name].finditer(text):
+            groups = match.groups()
+            month = groups[month_index]
+            if not month.isdigit():
+                month = MONTHS.get(month.lower()[:3])
+                if month is None:
+                    continue
+            year = int(groups[year_index])
+            if year < 100:
+                year += 2000 if year < 70 else 1900
+            try:
+                date = datetime(year, int(month), int(groups[day_index]))
+            except ValueError:
+                continue
+            # dmy/mdy sadece gün > 12 ise kesin; belirsizse varsayılan dışındaki biçim elenir
+            certain = True
+            if name in ('dmy', 'mdy'):
+                certain = int(groups[day_index]) > 12
+                if not certain and not allow_ambiguous and name != self.default_date_format:
+                    continue
+            return date, match.start(), name, certain
+        return None
+
+
+# Süreç başına tek normalleştirici; satıcı biçim önbelleği istekler arasında paylaşılır
+_normalizer = None
+_normalizer_lock = threading.Lock()
+
+
+def get_normalizer(config=None) -> Normalizer:
+    """Süreç genelindeki normalleştirici"""
+    global _normalizer
+    if _normalizer is None:
+        with _normalizer_lock:
+            if _normalizer is None:
+                _normalizer = Normalizer(config)
+    return _normalizer
@@ -1,18 +1,21 @@
 import cv2
+import logging
 import pytesseract
 from PIL import Image
 import numpy as np
 from pdf2image import convert_from_path
 from app.utils.helpers import preprocess_image
 from concurrent.futures import ThreadPoolExecutor
+from app.core.language import tesseract_lang
 
 class OCREngine:
     def __init__(self, config):
         self.config = config or {}
+        self.logger = logging.getLogger(__name__)
         # Config'den tesseract yolunu al
         pytesseract.pytesseract.tesseract_cmd = self.config.get('TESSERACT_CMD', r'C:\Program Files\Tesseract-OCR\tesseract.exe')
 
-    def process_image(self, image_path):
+    def process_image(self, image_path, languages=None):
         """
         Extract text from image with optimizations
         """
@@ -36,8 +39,9 @@ class OCREngine:
                 processed_image = future_preprocess.result()
                 gray_image = future_grayscale.result()
 
-            # OCR yapılandırması - hızlı mod
-            custom_config = r'--oem 3 --psm 6 -l eng --dpi 300'
+            # OCR yapılandırması - hızlı mod, dil seti config'den
+            lang = tesseract_lang(languages or self.config.get('OCR_LANGUAGES', ['en']))
+            custom_config = f'--oem 3 --psm 6 -l {lang} --dpi 300'
             
             # OCR işlemi
             text = pytesseract.image_to_string(
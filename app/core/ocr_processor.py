@@ -1,17 +1,50 @@
 import logging
+import time
 import numpy as np
-from typing import Dict, Any, Tuple, List
+from typing import Callable, Dict, Any, Tuple, List, Union
 import traceback
 import pytesseract
 import cv2
-from datetime import datetime
 import re
 from flask import current_app
+from .language import tesseract_lang
+from .document import OCRDocument, OCRLine
+from .vendor_profiles import get_registry
+from .normalizer import AMOUNT_TOKEN, get_normalizer
+from ..utils.metrics import get_metrics
+
+# Alan çıkarma kalıpları - modül yüklenirken bir kez derlenir
+ADDRESS_PATTERN = re.compile(r'^.*NO.*/.+$', re.IGNORECASE | re.MULTILINE)
+CURRENCY_AMOUNT_PATTERN = re.compile(rf'({AMOUNT_TOKEN})\s*(TR|USD|EUR)')
+CURRENCY_CODES = {'TR': 'TRY', 'USD': 'USD', 'EUR': 'EUR'}
+VENDOR_SKIP_KEYWORDS = ('invoice', 'date', 'tel', 'fax', 'no.')
+# Başlık alanı -> fatura verisi anahtarı
+HEADER_TARGETS = {'total': 'total_amount', 'tax': 'tax_amount', 'invoice_no': 'invoice_number'}
+# Satıcı kuralları bunları bulamazsa genel sezgilere düşülür
+PROFILE_REQUIRED_FIELDS = ('vendor', 'date', 'total_amount')
+# Varsayılan sayfa bölgeleri: üst %30 başlık, orta %40 gövde, alt %30 alt bilgi (OCR_REGION_SPLIT)
+REGION_SPLIT = (0.3, 0.7)
+TESSERACT_DATA_KEYS = ('level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+                       'left', 'top', 'width', 'height', 'conf', 'text')
 
 class OCRProcessor:
-    def __init__(self):
+    def __init__(self, config=None):
+        self.config = config or {}
         self.logger = logging.getLogger(__name__)
-        self.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+        self.tesseract_cmd = self.config.get('TESSERACT_CMD', r'C:\Program Files\Tesseract-OCR\tesseract.exe')
+        
+        # Hızlı katman ayarları
+        self.fast_max_dimension = self.config.get('OCR_FAST_MAX_DIMENSION', 1200)
+        self.fast_language = self.config.get('OCR_FAST_LANGUAGE', 'en')
+        self.full_languages = self.config.get('OCR_LANGUAGES', ['tr', 'en'])
+
+        # Ön işleme ve Tesseract ayarları (scripts/tune_parameters.py ile ayarlanır)
+        self.clahe_clip_limit = self.config.get('OCR_CLAHE_CLIP_LIMIT', 2.0)
+        self.threshold_block_size = self.config.get('OCR_THRESHOLD_BLOCK_SIZE', 11)
+        self.threshold_c = self.config.get('OCR_THRESHOLD_C', 2)
+        self.fast_tesseract_config = f"--oem 3 --psm {self.config.get('OCR_FAST_PSM', 6)}"
+        self.full_tesseract_config = f"--oem 3 --psm {self.config.get('OCR_FULL_PSM', 3)}"
+        self.region_split = tuple(self.config.get('OCR_REGION_SPLIT', REGION_SPLIT))
         
         # Anahtar kelime ve başlıklar
         self.field_headers = {
@@ -21,91 +54,203 @@ class OCRProcessor:
             'tax': ['tax:', 'vat:', 'tax amount:', 'kdv:'],
             'invoice_no': ['invoice no:', 'invoice number:', 'bill no:', 'reference:']
         }
+        self._compile_header_matcher()
+
+        # Satıcı profilleri süreç başına bir kez yüklenir
+        self.vendor_registry = get_registry(self.config)
+        # Tutar/tarih biçimleri satıcı başına hatırlanır
+        self.normalizer = get_normalizer(self.config)
+        self.metrics = get_metrics()
 
-    def process_document(self, image: np.ndarray) -> Dict[str, Any]:
+    def process_document(self, image: np.ndarray, enhance: bool = False,
+                         languages: List[str] = None, vendor_hint: str = None) -> Dict[str, Any]:
         """Belgeyi işle"""
         try:
             if self.tesseract_cmd:
                 pytesseract.pytesseract.tesseract_cmd = self.tesseract_cmd
 
             # Görüntü ön işleme
-            processed_image = self._preprocess_image(image)
+            processed_image = self._preprocess_image(image, enhance)
             
             # Bölgesel OCR uygula
             regions = self._extract_regions(processed_image)
-            text_blocks = {}
+            data = {key: [] for key in TESSERACT_DATA_KEYS}
             
-            for region_name, region_img in regions.items():
-                # Her bölge için OCR
-                text = pytesseract.image_to_string(region_img, lang='eng+tur')
-                text_blocks[region_name] = text
+            lang = tesseract_lang(languages or self.full_languages)
+            offset = 0
+            with self.metrics.span('tesseract.full'):
+                for index, region_img in enumerate(regions.values()):
+                    # Her bölge için OCR - kutular tablo çıkarımı için sayfa koordinatına taşınır
+                    region_data = pytesseract.image_to_data(region_img, lang=lang,
+                                                            config=self.full_tesseract_config,
+                                                            output_type=pytesseract.Output.DICT)
+                    self._merge_region_data(data, region_data, offset, index)
+                    offset += region_img.shape[0]
 
-            # Tüm metni birleştir
-            full_text = '\n'.join(text_blocks.values())
+            # Tüm metni birleştir - belge modeli bir kez kurulur
+            document = OCRDocument.from_tesseract(data, processed_image.shape[0], self.region_split)
             
             # Fatura verilerini çıkar
-            invoice_data = self._extract_invoice_data(full_text, text_blocks)
+            invoice_data = self._extract_invoice_data(document, image=image, vendor_hint=vendor_hint)
             
             return {
                 'success': True,
-                'text': full_text,
-                'text_blocks': text_blocks,
-                'confidence': 0,
-                'invoice_data': invoice_data
+                'text': document.text,
+                'text_blocks': document.text_blocks(),
+                'confidence': document.confidence,
+                'invoice_data': invoice_data,
+                'document': document
             }
             
         except Exception as e:
             self.logger.error(f"OCR Error: {str(e)}")
             return {'success': False, 'error': str(e)}
 
-    def _preprocess_image(self, image: np.ndarray) -> np.ndarray:
-        """Görüntü ön işleme"""
+    def process_fast(self, image: np.ndarray, language: str = None, vendor_hint: str = None) -> Dict[str, Any]:
+        """Ucuz ilk geçiş: küçük görüntü, gürültü azaltma yok, tek dil, tek OCR çağrısı"""
         try:
-            # Gri tonlamaya çevir
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            if self.tesseract_cmd:
+                pytesseract.pytesseract.tesseract_cmd = self.tesseract_cmd
+
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+            height, width = gray.shape[:2]
+            if max(height, width) > self.fast_max_dimension:
+                scale = self.fast_max_dimension / max(height, width)
+                gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+            # Tek çağrıda metin, konum ve güven skorları
+            with self.metrics.span('tesseract.fast'):
+                data = pytesseract.image_to_data(
+                    gray,
+                    lang=tesseract_lang([language or self.fast_language]),
+                    config=self.fast_tesseract_config,
+                    output_type=pytesseract.Output.DICT
+                )
+            # Satırlar, kelime kutuları ve bölgeler (30/40/30) tek seferde
+            document = OCRDocument.from_tesseract(data, gray.shape[0], self.region_split)
+            invoice_data = self._extract_invoice_data(document, image=image, vendor_hint=vendor_hint)
+
+            return {
+                'success': True,
+                'text': document.text,
+                'text_blocks': document.text_blocks(),
+                'confidence': document.confidence,
+                'invoice_data': invoice_data,
+                'document': document
+            }
+
+        except Exception as e:
+            self.logger.error(f"Fast OCR Error: {str(e)}")
+            return {'success': False, 'error': str(e)}
+
+    def _preprocess_image(self, image: np.ndarray, enhance: bool = False,
+                          timings: Dict[str, float] = None) -> np.ndarray:
+        """Görüntü ön işleme; timings verilirse adım başına süre (ms) yazılır"""
+        try:
+            processed = image
+            for name, step in self._preprocess_steps(enhance):
+                start = time.perf_counter()
+                processed = step(processed)
+                elapsed = time.perf_counter() - start
+                self.metrics.observe_stage(f'preprocess.{name}', elapsed)
+                if timings is not None:
+                    timings[name] = round(elapsed * 1000, 3)
+            return processed
             
+        except Exception as e:
+            self.logger.error(f"Error in preprocessing: {str(e)}")
+            return image
+
+    def _preprocess_steps(self, enhance: bool = False) -> List[Tuple[str, Callable[[np.ndarray], np.ndarray]]]:
+        """Ön işleme adımları sırasıyla (ad, fonksiyon)"""
+        # İyileştirme istenen görüntüde kontrast en az 3.0
+        clip_limit = max(3.0, self.clahe_clip_limit) if enhance else self.clahe_clip_limit
+        steps = [
+            # Gri tonlamaya çevir
+            ('grayscale', lambda image: cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image),
+        ]
+        # Kalite kontrolünden iyileştirme istendiyse küçük görüntüyü büyüt
+        if enhance:
+            steps.append(('upscale', lambda gray: cv2.resize(gray, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
+                          if min(gray.shape[:2]) < 1200 else gray))
+        steps += [
             # Gürültü azaltma
-            denoised = cv2.fastNlMeansDenoising(gray)
-            
+            ('denoise', lambda gray: cv2.fastNlMeansDenoising(gray, h=15 if enhance else 3)),
             # Kontrast artırma
-            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-            enhanced = clahe.apply(denoised)
-            
+            ('contrast', cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(8, 8)).apply),
+        ]
+        # Bulanık görüntüler için keskinleştirme (unsharp mask)
+        if enhance:
+            steps.append(('sharpen', lambda enhanced: cv2.addWeighted(
+                enhanced, 1.5, cv2.GaussianBlur(enhanced, (0, 0), 3), -0.5, 0)))
+        steps += [
             # Eğrilik düzeltme
-            coords = np.column_stack(np.where(enhanced > 0))
-            angle = cv2.minAreaRect(coords)[-1]
-            if angle < -45:
-                angle = 90 + angle
-            center = (image.shape[1] // 2, image.shape[0] // 2)
-            M = cv2.getRotationMatrix2D(center, angle, 1.0)
-            rotated = cv2.warpAffine(enhanced, M, (image.shape[1], image.shape[0]),
-                                   flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
-            
+            ('deskew', self._deskew),
             # Adaptif eşikleme
-            thresh = cv2.adaptiveThreshold(rotated, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                                         cv2.THRESH_BINARY, 11, 2)
-            
-            return thresh
-            
-        except Exception as e:
-            self.logger.error(f"Error in preprocessing: {str(e)}")
-            return image
+            ('threshold', lambda rotated: cv2.adaptiveThreshold(rotated, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                                                cv2.THRESH_BINARY, self.threshold_block_size,
+                                                                self.threshold_c)),
+        ]
+        return steps
+
+    def _deskew(self, enhanced: np.ndarray) -> np.ndarray:
+        """Eğrilik düzeltme"""
+        coords = np.column_stack(np.where(enhanced > 0))
+        angle = cv2.minAreaRect(coords)[-1]
+        if angle < -45:
+            angle = 90 + angle
+        center = (enhanced.shape[1] // 2, enhanced.shape[0] // 2)
+        M = cv2.getRotationMatrix2D(center, angle, 1.0)
+        return cv2.warpAffine(enhanced, M, (enhanced.shape[1], enhanced.shape[0]),
+                              flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
 
     def _extract_regions(self, image: np.ndarray) -> Dict[str, np.ndarray]:
         """Görüntüyü bölgelere ayır"""
         height, width = image.shape[:2]
+        top, bottom = int(height * self.region_split[0]), int(height * self.region_split[1])
         
         regions = {
-            'header': image[0:int(height*0.3), :],              # Üst %30
-            'body': image[int(height*0.3):int(height*0.7), :],  # Orta %40
-            'footer': image[int(height*0.7):, :]               # Alt %30
+            'header': image[0:top, :],        # Üst (varsayılan %30)
+            'body': image[top:bottom, :],     # Orta (varsayılan %40)
+            'footer': image[bottom:, :]       # Alt (varsayılan %30)
         }
         
         return regions
 
-    def _extract_invoice_data(self, text: str, text_blocks: Dict[str, str]) -> Dict[str, Any]:
+    def _merge_region_data(self, data: Dict[str, list], region_data: Dict[str, list], offset: int, index: int):
+        """Bölge OCR çıktısını sayfa verisine ekle; blok numaraları bölgeler arasında çakışmaz"""
+        for key in TESSERACT_DATA_KEYS:
+            values = region_data.get(key, [])
+            if key == 'top':
+                values = [value + offset for value in values]
+            elif key == 'block_num':
+                values = [value + index * 1000 for value in values]
+            data[key].extend(values)
+
+    def _compile_header_matcher(self):
+        """Tüm alan başlıklarını tek bir birleşik regex'e derle"""
+        self._header_fields = {}
+        for field, headers in self.field_headers.items():
+            for header in headers:
+                self._header_fields.setdefault(header, field)
+
+        # Uzun başlıklar önce; 'invoice date:' eşleşmesi sonek olan 'date:' için de sayılır
+        ordered = sorted(self._header_fields, key=len, reverse=True)
+        self._header_pattern = re.compile('|'.join(re.escape(header) for header in ordered))
+        self._header_aliases = {
+            header: [other for other in ordered if header.endswith(other)]
+            for header in ordered
+        }
+
+        # Tüm başlıklarda ortak karakter varsa başlıksız satırlar regex'e girmeden elenir
+        common = set.intersection(*(set(header) for header in ordered)) if ordered else set()
+        self._header_marker = ':' if ':' in common else ''
+
+    def _extract_invoice_data(self, document: Union[OCRDocument, str],
+                              text_blocks: Dict[str, str] = None, image: np.ndarray = None,
+                              vendor_hint: str = None) -> Dict[str, Any]:
         """Metin içinden fatura verilerini çıkar"""
-        lines = text.split('\n')
+        document = OCRDocument.ensure(document, text_blocks)
         data = {
             'vendor': '',
             'date': '',
@@ -115,96 +260,125 @@ class OCRProcessor:
             'tax_id': '',
             'category': 'others',
             'address': '',
-            'currency': ''
+            'currency': '',
+            'vendor_profile': None
         }
+        # Alan -> kaynak satır ve kutu
+        provenance = {}
 
-        # Başlık tabanlı arama
-        for field, headers in self.field_headers.items():
-            value = self._find_value_after_header(text, headers)
-            if value:
-                if field == 'total':
-                    data['total_amount'] = self._extract_amount(value)
-                elif field == 'tax':
-                    data['tax_amount'] = self._extract_amount(value)
-                else:
-                    data[field] = value.strip()
+        # Tanınan satıcının derlenmiş kuralları önce çalışır
+        match = self.vendor_registry.identify(document, image=image, vendor_hint=vendor_hint)
+        profile = match['profile']
+        if profile:
+            fields, provenance = profile.extract(document)
+            data.update(fields)
+            data['vendor_profile'] = {'id': profile.id, 'method': match['method'],
+                                      'elapsed_ms': match['elapsed_ms']}
+
+        # Profil yoksa veya zorunlu alanları bulamadıysa genel sezgiler boş alanları doldurur
+        if not profile or any(not data.get(field) for field in PROFILE_REQUIRED_FIELDS):
+            self._extract_generic(document, data, provenance)
+
+        data['provenance'] = provenance
+        return data
+
+    def _extract_generic(self, document: OCRDocument, data: Dict[str, Any], provenance: Dict[str, Any]):
+        """Satıcıdan bağımsız başlık ve kalıp sezgileri - sadece boş alanlara yazar"""
+        text = document.text
+
+        # Başlık tabanlı arama - tüm alanlar tek geçişte
+        amounts = {}
+        for field, (value, line) in self._find_header_values(document).items():
+            if not value or data.get(HEADER_TARGETS.get(field, field)):
+                continue
+            if field in ('total', 'tax'):
+                # Tutarlar satıcı belli olduktan sonra onun biçimiyle okunur
+                amounts[HEADER_TARGETS[field]] = (value, line)
+            elif field == 'invoice_no':
+                data['invoice_number'] = value.strip()
+                provenance['invoice_number'] = document.provenance(line)
+            else:
+                data[field] = value.strip()
+                provenance[field] = document.provenance(line)
 
         # Header bölgesinden vendor ve invoice number
-        header_text = text_blocks.get('header', '')
         if not data['vendor']:
-            for line in header_text.split('\n')[:5]:
-                if line and not any(keyword in line.lower() for keyword in 
-                    ['invoice', 'date', 'tel', 'fax', 'no.']):
-                    data['vendor'] = line.strip()
+            for line in document.region_lines('header')[:5]:
+                if line.text and not any(keyword in line.lower for keyword in VENDOR_SKIP_KEYWORDS):
+                    data['vendor'] = line.stripped
+                    provenance['vendor'] = document.provenance(line)
                     break
+        vendor = data['vendor']
+
+        for target, (value, line) in amounts.items():
+            data[target] = self._extract_amount(value, vendor)
+            provenance[target] = document.provenance(line)
 
         # Tarih bul
-        if not data['date']:
-            date_pattern = r'\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b'
-            for line in lines:
-                if date_match := re.search(date_pattern, line):
-                    date_str = date_match.group()
-                    try:
-                        if '-' in date_str:
-                            date = datetime.strptime(date_str, '%d-%m-%Y')
-                        else:
-                            date = datetime.strptime(date_str, '%d/%m/%Y')
-                        data['date'] = date.strftime('%Y-%m-%d')
-                        break
-                    except ValueError:
-                        continue
+        if not data['date'] and (found := self.normalizer.find_date(text, vendor)):
+            date, offset = found
+            data['date'] = date.strftime('%Y-%m-%d')
+            provenance['date'] = document.provenance(document.line_at(offset))
 
         # Adres bul (NO ve / içeren satırlar)
-        address_pattern = r'.*NO.*/.+'
-        for line in lines:
-            if re.match(address_pattern, line, re.IGNORECASE):
-                data['address'] = line.strip()
-                break
+        if not data['address'] and (address_match := ADDRESS_PATTERN.search(text)):
+            data['address'] = address_match.group().strip()
+            provenance['address'] = document.provenance(document.line_at(address_match.start()))
 
         # Para birimi ve tutarı bul
         if not data['total_amount']:
-            amount_patterns = [
-                (r'(\d+(?:[.,]\d{2})?)\s*TR', 'TRY'),
-                (r'(\d+(?:[.,]\d{2})?)\s*USD', 'USD'),
-                (r'(\d+(?:[.,]\d{2})?)\s*EUR', 'EUR')
-            ]
-            
-            for line in lines:
-                for pattern, currency in amount_patterns:
-                    if amount_match := re.search(pattern, line):
-                        try:
-                            amount = float(amount_match.group(1).replace(',', '.'))
-                            data['total_amount'] = amount
-                            data['currency'] = currency
-                            break
-                        except ValueError:
-                            continue
-                if data['total_amount'] > 0:
+            for amount_match in CURRENCY_AMOUNT_PATTERN.finditer(text):
+                amount = self.normalizer.parse_amount(amount_match.group(1), vendor)
+                if amount is None:
+                    continue
+                amount = float(amount)
+                data['total_amount'] = amount
+                data['currency'] = CURRENCY_CODES[amount_match.group(2)]
+                provenance['total_amount'] = document.provenance(document.line_at(amount_match.start()))
+                if amount > 0:
                     break
 
-        return data
+    def _find_header_values(self, document: Union[OCRDocument, str]) -> Dict[str, Tuple[str, OCRLine]]:
+        """Tüm başlıkları tek geçişte bul, her alan için ilk eşleşen satırın değerini döndür"""
+        document = OCRDocument.ensure(document)
+        lines = document.lower_lines
+        values = {}
+        pending = len(self.field_headers)
+        marker = self._header_marker
 
-    def _find_value_after_header(self, text: str, headers: List[str]) -> str:
-        """Başlıktan sonraki değeri bul"""
-        lines = text.lower().split('\n')
         for i, line in enumerate(lines):
-            for header in headers:
-                if header in line:
+            if marker and marker not in line:
+                continue
+
+            # Satırdaki her başlığın son geçtiği konum (split(header)[-1] davranışı)
+            header_ends = {}
+            for match in self._header_pattern.finditer(line):
+                for header in self._header_aliases[match.group()]:
+                    header_ends[header] = match.end()
+            if not header_ends:
+                continue
+
+            # Alan başlıkları öncelik sırasıyla denenir
+            for field, headers in self.field_headers.items():
+                if field in values:
+                    continue
+                for header in headers:
+                    if header not in header_ends:
+                        continue
                     # Değer aynı satırda olabilir
-                    value = line.split(header)[-1].strip()
+                    value = line[header_ends[header]:].strip()
                     if value:
-                        return value
+                        values[field] = (value, document.lines[i])
+                        break
                     # Değer sonraki satırda olabilir
                     if i + 1 < len(lines):
-                        return lines[i + 1].strip()
-        return ''
+                        values[field] = (lines[i + 1].strip(), document.lines[i + 1])
+                        break
 
-    def _extract_amount(self, text: str) -> float:
-        """Metin içinden sayısal değeri çıkar"""
-        try:
-            amount = re.search(r'(\d+(?:[.,]\d{2})?)', text)
-            if amount:
-                return float(amount.group(1).replace(',', '.'))
-        except:
-            pass
-        return 0.0 
\ No newline at end of file
+            if len(values) == pending:
+                break
+        return values
+
+    def _extract_amount(self, text: str, vendor: str = None) -> float:
+        """Metin içinden sayısal değeri çıkar ('1.234,56' ve '1,234.56' dahil)"""
+        return self.normalizer.parse_float(text, vendor) 
\ No newline at end of file
@@ -0,0 +1,129 @@
+import logging
+import time
+from typing import Dict, Any, Optional
+import cv2
+import numpy as np
+import pytesseract
+from .vendor_cache import VendorCache
+
+
+class OrientationDetector:
+    """Tam OCR'dan önce sayfa yönünü (0/90/180/270) bulan ucuz yoklama"""
+
+    # Saat yönünde düzeltme açısı -> cv2 döndürme kodu
+    ROTATIONS = {
+        90: cv2.ROTATE_90_CLOCKWISE,
+        180: cv2.ROTATE_180,
+        270: cv2.ROTATE_90_COUNTERCLOCKWISE
+    }
+
+    def __init__(self, config=None):
+        self.config = config or {}
+        self.logger = logging.getLogger(__name__)
+        self.probe_size = self.config.get('ORIENTATION_PROBE_SIZE', 1000)
+        self.use_osd = self.config.get('ORIENTATION_USE_OSD', True)
+
+        # Satıcı -> açı önbelleği
+        self.vendor_cache = VendorCache(self.config.get('ORIENTATION_CACHE_SIZE', 1000))
+
+    def detect(self, image: np.ndarray, vendor: Optional[str] = None) -> Dict[str, Any]:
+        """Sayfanın dik durması için gereken saat yönü açısını bul"""
+        start = time.perf_counter()
+
+        probe = self._downscale(image)
+
+        # Satıcının bilinen yönü ön bilgidir: ucuz profil sezgiseli aynı açıyı
+        # vermezse kayıt silinir, tek bir hatalı tarama sonrakileri bozmaz
+        cached = self.vendor_cache.get(vendor)
+        if cached is not None:
+            if self._detect_heuristic(probe) == cached:
+                return {'angle': cached, 'source': 'vendor_cache',
+                        'elapsed_ms': round((time.perf_counter() - start) * 1000, 2)}
+            self.vendor_cache.discard(vendor)
+            self.logger.info("Cached orientation %s for vendor %s failed verification", cached, vendor)
+
+        angle, source = None, 'heuristic'
+        if self.use_osd:
+            angle = self._detect_osd(probe)
+            source = 'osd'
+        if angle is None:
+            angle = self._detect_heuristic(probe)
+            source = 'heuristic'
+
+        result = {
+            'angle': angle,
+            'source': source,
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 2)
+        }
+        self.logger.info("Orientation probe: %s", result)
+        return result
+
+    def rotate(self, image: np.ndarray, angle: int) -> np.ndarray:
+        """Görüntüyü tek seferde dik konuma döndür"""
+        if angle not in self.ROTATIONS:
+            return image
+        return cv2.rotate(image, self.ROTATIONS[angle])
+
+    def remember(self, vendor: Optional[str], angle: int):
+        """Satıcının tespit edilen sayfa yönünü önbelleğe yaz"""
+        self.vendor_cache.set(vendor, angle)
+
+    def _downscale(self, image: np.ndarray) -> np.ndarray:
+        """Yoklama için gri ve küçültülmüş kopya"""
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        height, width = gray.shape[:2]
+        if max(height, width) > self.probe_size:
+            scale = self.probe_size / max(height, width)
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return gray
+
+    def _detect_osd(self, gray: np.ndarray) -> Optional[int]:
+        """Tesseract OSD ile yön tespiti"""
+        try:
+            osd = pytesseract.image_to_osd(gray, output_type=pytesseract.Output.DICT)
+            return int(osd.get('rotate', 0)) % 360
+        except Exception as e:
+            # Az metinli sayfalarda veya osd.traineddata yoksa OSD hata verir
+            self.logger.debug(f"OSD failed, falling back to heuristic: {str(e)}")
+            return None
+
+    def _detect_heuristic(self, gray: np.ndarray) -> int:
+        """Metin satırı profili ile yön tespiti"""
+        _, binary = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+
+        # Yatay satırlar satır profilinde, dikey satırlar sütun profilinde belirgin olur
+        angle = 0
+        if self._profile_strength(binary.sum(axis=0)) > 1.2 * self._profile_strength(binary.sum(axis=1)):
+            binary = cv2.rotate(binary, cv2.ROTATE_90_CLOCKWISE)
+            angle = 90
+
+        # Latin metinde üst uzantılar alt uzantılardan fazladır; x-yüksekliği gövdesi
+        # satır bandının alt kısmına düşer
+        if self._is_upside_down(binary):
+            angle = (angle + 180) % 360
+        return angle
+
+    @staticmethod
+    def _profile_strength(profile: np.ndarray) -> float:
+        mean = profile.mean()
+        return float(profile.var() / (mean * mean)) if mean else 0.0
+
+    @staticmethod
+    def _is_upside_down(binary: np.ndarray) -> bool:
+        rows = binary.sum(axis=1)
+        text_rows = rows > max(rows.max() * 0.05, 1)
+
+        # Ardışık metin satırı bantlarını bul
+        edges = np.diff(np.concatenate(([0], text_rows.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+
+        top, bottom = 0, 0
+        for start, end in zip(starts, ends):
+            third = (end - start) // 3
+            if third < 1:
+                continue
+            top += rows[start:start + third].sum()
+            bottom += rows[end - third:end].sum()
+        # Dik metinde yoğunluk bandın alt üçte birindedir
+        return top > bottom * 1.1
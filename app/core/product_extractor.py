@@ -1,8 +1,58 @@
 import re
 import logging
+import time
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 from decimal import Decimal
+import numpy as np
+from .document import OCRDocument
+from .normalizer import AMOUNT_TOKEN_PATTERN, get_normalizer
+
+PRODUCT_LINE_PATTERN = re.compile(r'(\d+)\s+(\d+)\s+(\d+\.\d{2})')
+DESCRIPTION_PATTERN = re.compile(r'SR[:\.]?\s*(.*?)(?=\d|\n|$)', re.IGNORECASE)
+
+# Tablo sütun türleri
+COLUMN_CODE, COLUMN_DESCRIPTION, COLUMN_QUANTITY, COLUMN_UNIT_PRICE, COLUMN_TOTAL = range(5)
+COLUMN_NAMES = ('code', 'description', 'quantity', 'unit_price', 'total')
+NUMERIC_COLUMNS = (COLUMN_QUANTITY, COLUMN_UNIT_PRICE, COLUMN_TOTAL)
+
+# Başlık satırı kelimeleri (küçük harf, Türkçe karakterler sadeleştirilmiş)
+HEADER_KEYWORDS = {
+    'code': COLUMN_CODE, 'kod': COLUMN_CODE, 'kodu': COLUMN_CODE, 'sku': COLUMN_CODE, 'stok': COLUMN_CODE,
+    'description': COLUMN_DESCRIPTION, 'desc': COLUMN_DESCRIPTION, 'item': COLUMN_DESCRIPTION,
+    'items': COLUMN_DESCRIPTION, 'product': COLUMN_DESCRIPTION, 'particulars': COLUMN_DESCRIPTION,
+    'urun': COLUMN_DESCRIPTION, 'aciklama': COLUMN_DESCRIPTION, 'mal': COLUMN_DESCRIPTION,
+    'hizmet': COLUMN_DESCRIPTION, 'cinsi': COLUMN_DESCRIPTION,
+    'qty': COLUMN_QUANTITY, 'quantity': COLUMN_QUANTITY, 'qnty': COLUMN_QUANTITY,
+    'adet': COLUMN_QUANTITY, 'miktar': COLUMN_QUANTITY, 'miktari': COLUMN_QUANTITY,
+    'price': COLUMN_UNIT_PRICE, 'rate': COLUMN_UNIT_PRICE, 'unit': COLUMN_UNIT_PRICE,
+    'birim': COLUMN_UNIT_PRICE, 'fiyat': COLUMN_UNIT_PRICE, 'fiyati': COLUMN_UNIT_PRICE,
+    'total': COLUMN_TOTAL, 'amount': COLUMN_TOTAL, 'amt': COLUMN_TOTAL,
+    'tutar': COLUMN_TOTAL, 'tutari': COLUMN_TOTAL, 'toplam': COLUMN_TOTAL,
+}
+# Tablonun bittiği satırların ilk kelimesi
+TABLE_STOP_WORDS = frozenset({
+    'subtotal', 'sub', 'total', 'ara', 'toplam', 'genel', 'kdv', 'vat', 'gst', 'tax',
+    'discount', 'iskonto', 'grand', 'net', 'balance'
+})
+SUBTOTAL_LINE_PATTERN = re.compile(r'\b(?:sub\s*-?\s*total|ara\s+toplam|mal\s+hizmet\s+toplam)', re.IGNORECASE)
+TOTAL_LINE_PATTERN = re.compile(r'\b(?:total|toplam)\b', re.IGNORECASE)
+HEADER_TOKEN_PATTERN = re.compile(r'[^a-z0-9]+')
+ASCII_FOLD = str.maketrans('çğıöşüÇĞİÖŞÜ', 'cgiosuCGIOSU')
+
+# Birim kalıpları
+UNIT_PATTERNS = {
+    'piece': re.compile(r'\b(?:PC|PCS|PIECE|ADET)\b', re.IGNORECASE),
+    'meter': re.compile(r'\b(?:M|MTR|METER)\b', re.IGNORECASE),
+    'kilogram': re.compile(r'\b(?:KG|KILO|KILOGRAM)\b', re.IGNORECASE),
+    'liter': re.compile(r'\b(?:L|LT|LITER)\b', re.IGNORECASE),
+    'set': re.compile(r'\b(?:SET|TAKIM)\b', re.IGNORECASE),
+}
+
+
+def header_token(word: str) -> str:
+    return HEADER_TOKEN_PATTERN.sub('', word.translate(ASCII_FOLD).lower())
+
 
 @dataclass
 class ProductItem:
@@ -14,9 +64,250 @@ class ProductItem:
     total: Optional[Decimal] = None   # Toplam tutar
     unit: Optional[str] = None        # Birim (adet, kg, lt vb.)
 
+class TableExtractor:
+    """Kelime kutularından geometrik kalem tablosu çıkarıcı
+
+    Başlık satırı (miktar, birim fiyat, tutar) bulunur; tablo gövdesindeki kelimelerin
+    x dolulukları NumPy ile sütunlara ayrılır, her kelime searchsorted ile sütununa
+    atanır ve satırlar tek geçişte ProductItem'a çevrilir.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or {}
+        self.logger = logging.getLogger(__name__)
+        # Sütun ayırıcı sayılan en küçük boşluk (ortanca kelime yüksekliği katı)
+        self.min_column_gap = self.config.get('TABLE_MIN_COLUMN_GAP', 1.5)
+        # Yeni tablo satırı başlatan dikey merkez farkı (ortanca kelime yüksekliği katı)
+        self.row_gap = self.config.get('TABLE_ROW_GAP', 0.5)
+        self.subtotal_tolerance = self.config.get('TABLE_SUBTOTAL_TOLERANCE', 0.05)
+        self.normalizer = get_normalizer(self.config)
+
+    def extract(self, document: OCRDocument, vendor: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Tabloyu çıkar; başlık bulunamazsa None. Tutarlar satıcının sayı biçimiyle okunur"""
+        start = time.perf_counter()
+        words = document.words
+        if not len(words):
+            return None
+
+        boxes = words.boxes
+        # Kelimeler görsel satırlara, satır içinde soldan sağa dizilir
+        order, rows = self._cluster_rows(boxes)
+        boxes = boxes[order]
+        all_texts = words.words()
+        texts = [all_texts[i] for i in order.tolist()]
+        tokens = [header_token(text) for text in texts]
+        kinds = np.fromiter((HEADER_KEYWORDS.get(token, -1) for token in tokens), dtype=np.int8, count=len(tokens))
+        row_starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+
+        header_row = self._find_header(kinds, row_starts)
+        if header_row is None:
+            return None
+
+        # Tablo gövdesi: başlıktan sonraki ilk toplam/vergi satırına kadar
+        row_count = len(row_starts)
+        stop_row = next((row for row in range(header_row + 1, row_count)
+                         if tokens[row_starts[row]] in TABLE_STOP_WORDS), row_count)
+        header_mask = (rows == header_row) & (kinds >= 0)
+        body_mask = (rows > header_row) & (rows < stop_row)
+        if not body_mask.any():
+            return None
+
+        left = boxes['left'].astype(np.int64)
+        right = left + boxes['width']
+        boundaries = self._column_boundaries(left[body_mask], right[body_mask],
+                                             np.median(boxes['height'][body_mask]),
+                                             left[header_mask], right[header_mask], kinds[header_mask])
+        column_kinds = self._label_columns(boundaries, left[header_mask], right[header_mask], kinds[header_mask])
+
+        body = np.flatnonzero(body_mask)
+        columns = np.searchsorted(boundaries, (left[body] + right[body]) / 2)
+        items = self._build_items(body, columns, column_kinds, rows, texts, vendor)
+        row_ends = np.r_[row_starts[1:], len(texts)]
+        footer = [' '.join(texts[row_starts[row]:row_ends[row]]) for row in range(stop_row, row_count)]
+        validation = self._validate(items, footer, vendor)
+
+        return {
+            'items': items,
+            'header_row': header_row,
+            'stop_row': stop_row,
+            'columns': {COLUMN_NAMES[kind]: int(column) for column, kind in column_kinds.items()},
+            'validation': validation,
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 2)
+        }
+
+    def _cluster_rows(self, boxes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Kelimeleri dikey konumlarına göre görsel satırlara topla
+
+        Tesseract psm 3 sütunları ayrı bloklara koyduğundan (block, par, line) grubu
+        tablo satırı değildir. Kelimeler merkez y'ye göre sıralanır; ardışık merkezler
+        arasındaki fark ortanca kelime yüksekliğinin TABLE_ROW_GAP katını aşınca yeni
+        satır başlar. Dönüş: (satır, sonra sol kenara göre sıralı indeksler, sıralı satır no'ları)
+        """
+        heights = boxes['height'].astype(np.float64)
+        centers = boxes['top'] + heights / 2
+        by_center = np.argsort(centers, kind='stable')
+        breaks = np.diff(centers[by_center]) > self.row_gap * max(float(np.median(heights)), 1.0)
+        rows = np.empty(len(centers), dtype=np.int64)
+        rows[by_center] = np.r_[0, np.cumsum(breaks)]
+        order = np.lexsort((boxes['left'], rows))
+        return order, rows[order]
+
+    def _find_header(self, kinds: np.ndarray, row_starts: np.ndarray) -> Optional[int]:
+        """En az iki sayısal sütun (veya bir sayısal + açıklama) adı geçen ilk satır"""
+        bits = np.where(kinds >= 0, np.left_shift(1, kinds.clip(min=0)), 0).astype(np.int64)
+        masks = np.bitwise_or.reduceat(bits, row_starts)
+        numeric = sum(((masks >> kind) & 1) for kind in NUMERIC_COLUMNS)
+        described = (masks >> COLUMN_DESCRIPTION) & 1
+        candidates = np.flatnonzero((numeric >= 2) | ((numeric >= 1) & (described == 1)))
+        return int(candidates[0]) if len(candidates) else None
+
+    def _column_boundaries(self, left: np.ndarray, right: np.ndarray, word_height: float,
+                           header_left: np.ndarray, header_right: np.ndarray,
+                           header_kinds: np.ndarray) -> np.ndarray:
+        """Sütun sınırları: gövde x doluluğundaki geniş boşluklar + birleşmiş sütunlar için
+        başlık kelimeleri arasındaki orta noktalar"""
+        origin = int(left.min())
+        width = int(right.max()) - origin + 1
+        coverage = np.zeros(width + 1, dtype=np.int32)
+        np.add.at(coverage, left - origin, 1)
+        np.add.at(coverage, right - origin, -1)
+        empty = np.cumsum(coverage[:-1]) == 0
+
+        # Boş aralıkların başlangıç ve bitişleri
+        edges = np.diff(np.r_[0, empty.astype(np.int8), 0])
+        gap_starts = np.flatnonzero(edges == 1)
+        gap_ends = np.flatnonzero(edges == -1)
+        wide = (gap_ends - gap_starts) >= max(self.min_column_gap * word_height, 1)
+        separators = origin + (gap_starts[wide] + gap_ends[wide]) / 2
+
+        # Aynı boşluğa düşmeyen komşu başlık sütunlarını orta noktadan ayır
+        anchors = []
+        for kind in np.unique(header_kinds).tolist():
+            mask = header_kinds == kind
+            anchors.append(((header_left[mask].min() + header_right[mask].max()) / 2, kind))
+        anchors.sort()
+        midpoints = []
+        for (center_a, _), (center_b, _) in zip(anchors, anchors[1:]):
+            if not ((separators > center_a) & (separators < center_b)).any():
+                midpoints.append((center_a + center_b) / 2)
+        return np.sort(np.r_[separators, midpoints])
+
+    def _label_columns(self, boundaries: np.ndarray, header_left: np.ndarray, header_right: np.ndarray,
+                       header_kinds: np.ndarray) -> Dict[int, int]:
+        """Sütun no -> tür; başlıksız sütunlar ilk sayısal sütunun solundaysa açıklama"""
+        centers = (header_left + header_right) / 2
+        header_columns = np.searchsorted(boundaries, centers)
+        labels = {}
+        for column, kind in zip(header_columns.tolist(), header_kinds.tolist()):
+            # 'Birim Fiyat' gibi çok kelimeli başlıklar aynı sütuna düşer
+            labels.setdefault(column, kind)
+
+        numeric = [column for column, kind in labels.items() if kind in NUMERIC_COLUMNS]
+        first_numeric = min(numeric) if numeric else len(boundaries) + 1
+        for column in range(first_numeric):
+            labels.setdefault(column, COLUMN_DESCRIPTION)
+        return labels
+
+    def _build_items(self, body: np.ndarray, columns: np.ndarray, column_kinds: Dict[int, int],
+                     rows: np.ndarray, texts: List[str], vendor: Optional[str] = None) -> List['ProductItem']:
+        """Hücreleri (satır, sütun) gruplarına ayırıp ürün satırlarına çevir"""
+        body_rows = rows[body]
+        keys = body_rows * (int(columns.max()) + 1) + columns
+        # Kelimeler satır içinde soldan sağa sıralı olduğundan gruplar bitişiktir
+        cell_starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        cell_ends = np.r_[cell_starts[1:], len(keys)]
+
+        cells = {}
+        for cell_start, cell_end in zip(cell_starts.tolist(), cell_ends.tolist()):
+            kind = column_kinds.get(int(columns[cell_start]))
+            if kind is None:
+                continue
+            row = cells.setdefault(int(body_rows[cell_start]), {})
+            text = ' '.join(texts[i] for i in body[cell_start:cell_end].tolist())
+            row[kind] = f"{row[kind]} {text}" if kind in row else text
+
+        items = []
+        pending_description = []
+        for index in sorted(cells):
+            row = cells[index]
+            quantity = self.normalizer.parse_amount(row.get(COLUMN_QUANTITY), vendor)
+            unit_price = self.normalizer.parse_amount(row.get(COLUMN_UNIT_PRICE), vendor)
+            total = self.normalizer.parse_amount(row.get(COLUMN_TOTAL), vendor)
+            description = row.get(COLUMN_DESCRIPTION, '').strip()
+
+            # Sayı içermeyen satır açıklamanın devamıdır
+            if quantity is None and unit_price is None and total is None:
+                if not description:
+                    continue
+                if items:
+                    items[-1].description = f"{items[-1].description or ''} {description}".strip()
+                else:
+                    pending_description.append(description)
+                continue
+
+            if total is None and quantity is not None and unit_price is not None:
+                total = quantity * unit_price
+            if unit_price is None and total is not None and quantity:
+                unit_price = (total / quantity).quantize(Decimal('0.01'))
+            if pending_description:
+                description = ' '.join(pending_description + [description]).strip()
+                pending_description = []
+
+            items.append(ProductItem(
+                code=row.get(COLUMN_CODE, '').strip() or None,
+                description=description or None,
+                quantity=float(quantity) if quantity is not None else None,
+                unit_price=unit_price,
+                total=total,
+                unit=self._detect_unit(f"{row.get(COLUMN_QUANTITY, '')} {description}")
+            ))
+        return items
+
+    def _validate(self, items: List['ProductItem'], footer: List[str],
+                  vendor: Optional[str] = None) -> Dict[str, Any]:
+        """Satır tutarlarının toplamını tablodan sonraki (görsel) satırlardaki ara toplamla karşılaştır"""
+        items_total = sum((item.total for item in items if item.total is not None), Decimal('0'))
+        subtotal, source = None, None
+        for pattern, name in ((SUBTOTAL_LINE_PATTERN, 'subtotal'), (TOTAL_LINE_PATTERN, 'total')):
+            for line in footer:
+                if pattern.search(line):
+                    numbers = AMOUNT_TOKEN_PATTERN.findall(line)
+                    subtotal = self.normalizer.parse_amount(numbers[-1], vendor) if numbers else None
+                    if subtotal is not None:
+                        source = name
+                        break
+            if subtotal is not None:
+                break
+
+        result = {'items_total': float(items_total), 'subtotal': None, 'source': None,
+                  'difference': None, 'matches': None}
+        if subtotal is not None:
+            difference = items_total - subtotal
+            result.update({
+                'subtotal': float(subtotal),
+                'source': source,
+                'difference': float(difference),
+                'matches': abs(difference) <= Decimal(str(self.subtotal_tolerance))
+            })
+            if not result['matches']:
+                self.logger.warning(
+                    f"Line items total {items_total} does not match {source} {subtotal} "
+                    f"({len(items)} rows)")
+        return result
+
+    def _detect_unit(self, text: str) -> Optional[str]:
+        for unit_name, pattern in UNIT_PATTERNS.items():
+            if pattern.search(text):
+                return unit_name
+        return None
+
+
 class ProductExtractor:
-    def __init__(self):
+    def __init__(self, config=None):
+        self.config = config or {}
         self.logger = logging.getLogger(__name__)
+        self.table_extractor = TableExtractor(self.config)
+        self.normalizer = get_normalizer(self.config)
         
         # Ürün satırı kalıpları - faturaya özel
         self.product_patterns = [
@@ -35,21 +326,35 @@ class ProductExtractor:
             'set': r'(?:SET|TAKIM)',
         }
 
-    def extract_products(self, text: str) -> List[ProductItem]:
+    def extract_table(self, document: Union[OCRDocument, str], vendor: Optional[str] = None) -> Dict[str, Any]:
+        """Önce kelime kutularıyla geometrik tablo, bulunamazsa satır kalıbı"""
+        document = OCRDocument.ensure(document)
+        table = None
+        try:
+            table = self.table_extractor.extract(document, vendor)
+        except Exception as e:
+            self.logger.error(f"Table extraction failed: {str(e)}")
+        if table and table['items']:
+            table['method'] = 'table'
+            return table
+        return {'items': self._extract_by_pattern(document), 'method': 'pattern', 'validation': None}
+
+    def extract_products(self, document: Union[OCRDocument, str], vendor: Optional[str] = None) -> List[ProductItem]:
         """Metinden ürün detaylarını çıkar"""
+        return self.extract_table(document, vendor)['items']
+
+    def _extract_by_pattern(self, document: OCRDocument) -> List[ProductItem]:
+        """Kod + miktar + fiyat satırı ve 'SR' açıklama satırı kalıbı"""
         products = []
-        lines = text.split('\n')
         
         current_product = None
         
-        for line in lines:
-            line = line.strip()
-            
-            if not line:
+        for line in document.lines:
+            if not line.stripped:
                 continue
             
             # Kod + Miktar + Fiyat satırı
-            if match := re.match(r'(\d+)\s+(\d+)\s+(\d+\.\d{2})', line):
+            if match := PRODUCT_LINE_PATTERN.match(line.stripped):
                 if current_product:
                     products.append(current_product)
                     
@@ -61,8 +366,8 @@ class ProductExtractor:
                 current_product.total = Decimal(str(current_product.quantity)) * current_product.unit_price
                 
             # Açıklama satırı
-            elif 'SR' in line.upper() and current_product:
-                desc_match = re.search(r'SR[:\.]?\s*(.*?)(?=\d|\n|$)', line, re.IGNORECASE)
+            elif 'SR' in line.upper and current_product:
+                desc_match = DESCRIPTION_PATTERN.search(line.stripped)
                 if desc_match:
                     current_product.description = desc_match.group(1).strip()
         
@@ -140,20 +445,8 @@ class ProductExtractor:
 
     def _normalize_quantity(self, qty_str: str) -> float:
         """Miktar değerini normalize et"""
-        try:
-            # Virgülü noktaya çevir
-            qty_str = qty_str.replace(',', '.')
-            return float(qty_str)
-        except ValueError:
-            return 0.0
+        return self.normalizer.parse_float(qty_str)
 
     def _normalize_price(self, price_str: str) -> Decimal:
-        """Fiyat değerini normalize et"""
-        try:
-            # Gereksiz karakterleri temizle
-            price_str = re.sub(r'[^\d.,]', '', price_str)
-            # Virgülü noktaya çevir
-            price_str = price_str.replace(',', '.')
-            return Decimal(price_str)
-        except:
-            return Decimal('0') 
\ No newline at end of file
+        """Fiyat değerini normalize et ('1.234,56' ve '1,234.56' dahil)"""
+        return self.normalizer.parse_amount(price_str) or Decimal('0') 
\ No newline at end of file
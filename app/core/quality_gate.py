@@ -0,0 +1,150 @@
+import logging
+import time
+import cv2
+import numpy as np
+from PIL import Image
+from typing import Dict, Any
+
+
+class QualityGate:
+    """Pahalı OCR zincirinden önce küçük önizleme üzerinde çalışan kalite kontrolü"""
+
+    ACCEPT = 'accept'
+    WARN = 'warn'
+    ENHANCE = 'enhance'
+    REJECT = 'reject'
+
+    def __init__(self, config=None):
+        self.config = config or {}
+        self.logger = logging.getLogger(__name__)
+
+        # Önizleme boyutu - tüm eşikler bu boyuta göre ayarlı
+        self.thumbnail_size = self.config.get('QUALITY_THUMBNAIL_SIZE', 640)
+
+        # Bulanıklık (Laplacian varyansı)
+        self.min_blur_variance = self.config.get('QUALITY_MIN_BLUR_VARIANCE', 15.0)
+        self.enhance_blur_variance = self.config.get('QUALITY_ENHANCE_BLUR_VARIANCE', 80.0)
+
+        # Parlaklık ve kontrast (gri histogram)
+        self.min_brightness = self.config.get('QUALITY_MIN_BRIGHTNESS', 35.0)
+        self.max_brightness = self.config.get('QUALITY_MAX_BRIGHTNESS', 250.0)
+        self.min_contrast = self.config.get('QUALITY_MIN_CONTRAST', 12.0)
+        self.enhance_contrast = self.config.get('QUALITY_ENHANCE_CONTRAST', 30.0)
+
+        # Efektif çözünürlük (sayfanın kısa kenarı A4 kabul edilir)
+        self.page_width_inches = self.config.get('QUALITY_PAGE_WIDTH_INCHES', 8.27)
+        self.min_dpi = self.config.get('QUALITY_MIN_DPI', 60.0)
+        self.enhance_dpi = self.config.get('QUALITY_ENHANCE_DPI', 150.0)
+
+        # Mürekkep oranı (koyu piksel yüzdesi)
+        self.min_ink_coverage = self.config.get('QUALITY_MIN_INK_COVERAGE', 0.002)
+        self.max_ink_coverage = self.config.get('QUALITY_MAX_INK_COVERAGE', 0.6)
+        self.warn_ink_coverage = self.config.get('QUALITY_WARN_INK_COVERAGE', 0.35)
+
+    def assess(self, filepath: str) -> Dict[str, Any]:
+        """Dosyanın önizlemesini çıkar ve kalite kararını ver"""
+        start = time.perf_counter()
+        try:
+            thumbnail, original_size = self._load_thumbnail(filepath)
+            metrics = self._compute_metrics(thumbnail, original_size)
+            decision, reasons = self._decide(metrics)
+        except Exception as e:
+            # Önizleme okunamazsa belgeyi engelleme, kararı ana akışa bırak
+            self.logger.warning(f"Quality assessment failed for {filepath}: {str(e)}")
+            metrics, decision, reasons = {}, self.ACCEPT, ['assessment_failed']
+
+        report = {
+            'decision': decision,
+            'reasons': reasons,
+            'metrics': metrics,
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 2)
+        }
+        self.logger.info("Quality gate %s for %s: %s", decision, filepath, report)
+        return report
+
+    def _load_thumbnail(self, filepath: str):
+        """Görüntüyü tam çözmeden gri önizleme olarak yükle"""
+        with Image.open(filepath) as img:
+            original_size = img.size
+            # JPEG için DCT ölçekleme ile ucuz çözme
+            img.draft('L', (self.thumbnail_size, self.thumbnail_size))
+            gray = np.asarray(img.convert('L'))
+
+        height, width = gray.shape[:2]
+        if max(height, width) > self.thumbnail_size:
+            scale = self.thumbnail_size / max(height, width)
+            gray = cv2.resize(gray, (int(width * scale), int(height * scale)),
+                              interpolation=cv2.INTER_AREA)
+        return gray, original_size
+
+    def _compute_metrics(self, gray: np.ndarray, original_size) -> Dict[str, float]:
+        """Bulanıklık, histogram, DPI ve mürekkep ölçümlerini hesapla"""
+        # Bulanıklık
+        blur_variance = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+        # Histogram tabanlı parlaklık ve kontrast
+        hist = cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+        total = hist.sum()
+        levels = np.arange(256)
+        brightness = float((hist * levels).sum() / total)
+        contrast = float(np.sqrt((hist * (levels - brightness) ** 2).sum() / total))
+        cumulative = np.cumsum(hist) / total
+        low = int(np.searchsorted(cumulative, 0.05))
+        high = int(np.searchsorted(cumulative, 0.95))
+
+        # Efektif DPI
+        width, height = original_size
+        effective_dpi = min(width, height) / self.page_width_inches
+
+        # Mürekkep oranı (Otsu eşiği altındaki pikseller)
+        _, ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        ink_coverage = float(cv2.countNonZero(ink)) / ink.size
+
+        return {
+            'blur_variance': round(blur_variance, 2),
+            'brightness': round(brightness, 2),
+            'contrast': round(contrast, 2),
+            'dynamic_range': high - low,
+            'effective_dpi': round(effective_dpi, 1),
+            'ink_coverage': round(ink_coverage, 4),
+            'width': width,
+            'height': height
+        }
+
+    def _decide(self, metrics: Dict[str, float]):
+        """Ölçümlere göre reddet / iyileştir / uyar / kabul et"""
+        reject = []
+        if metrics['effective_dpi'] < self.min_dpi:
+            reject.append('resolution_too_low')
+        if metrics['brightness'] < self.min_brightness:
+            reject.append('too_dark')
+        if metrics['contrast'] < self.min_contrast:
+            reject.append('no_contrast')
+        if metrics['ink_coverage'] < self.min_ink_coverage:
+            reject.append('blank_page')
+        if metrics['ink_coverage'] > self.max_ink_coverage:
+            reject.append('too_much_ink')
+        if metrics['blur_variance'] < self.min_blur_variance:
+            reject.append('too_blurry')
+        if reject:
+            return self.REJECT, reject
+
+        enhance = []
+        if metrics['blur_variance'] < self.enhance_blur_variance:
+            enhance.append('blurry')
+        if metrics['contrast'] < self.enhance_contrast:
+            enhance.append('low_contrast')
+        if metrics['effective_dpi'] < self.enhance_dpi:
+            enhance.append('low_resolution')
+        if enhance:
+            return self.ENHANCE, enhance
+
+        warn = []
+        if metrics['brightness'] > self.max_brightness:
+            warn.append('overexposed')
+        if metrics['ink_coverage'] > self.warn_ink_coverage:
+            warn.append('heavy_ink')
+        if warn:
+            return self.WARN, warn
+
+        return self.ACCEPT, []
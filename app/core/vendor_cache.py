@@ -0,0 +1,57 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class VendorCache:
+    """Satıcı adına göre anahtarlanan, sınırlı boyutlu ve thread-safe LRU önbellek"""
+
+    def __init__(self, max_size: int = 1000):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(vendor: Optional[str]) -> str:
+        """Satıcı adını büyük/küçük harf ve boşluktan bağımsız hale getir"""
+        return ' '.join(vendor.lower().split()) if vendor else ''
+
+    def get(self, vendor: Optional[str]) -> Optional[Any]:
+        key = self.key(vendor)
+        if not key:
+            return None
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return value
+
+    def peek(self, vendor: Optional[str]) -> Optional[Any]:
+        """Kilitsiz okuma - LRU sırası güncellenmez (sık çağrılan sıcak yollar için)"""
+        return self._items.get(self.key(vendor)) if vendor else None
+
+    def set(self, vendor: Optional[str], value: Any):
+        key = self.key(vendor)
+        if not key:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def discard(self, vendor: Optional[str]):
+        """Satıcının kaydını sil (yanlış çıkan önbellek değeri)"""
+        key = self.key(vendor)
+        if not key:
+            return
+        with self._lock:
+            self._items.pop(key, None)
+
+    def __len__(self):
+        return len(self._items)
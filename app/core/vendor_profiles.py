@@ -0,0 +1,327 @@
+import glob
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+
+# create_app profilleri yükler; cv2/numpy sadece eşleştirme çalışınca yüklenir
+if TYPE_CHECKING:
+    import numpy as np
+    from .document import OCRDocument
+
+# Vergi numarası adayları: ayraçlı veya ayraçsız 8-16 haneli diziler
+TAX_ID_CANDIDATE_PATTERN = re.compile(r'(?<![\w])\d[\d\-\. ]{6,18}\d(?![\w])')
+TAX_ID_SEPARATORS = re.compile(r'[\-\. ]')
+NAME_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+ASCII_FOLD = str.maketrans('çğıöşüÇĞİÖŞÜâîûÂÎÛ', 'cgiosuCGIOSUaiuAIU')
+
+# Ad eşleştirmede ayırt edici olmayan şirket türü ekleri
+NAME_STOPWORDS = frozenset({
+    'ltd', 'sti', 'as', 'a', 's', 'san', 've', 'tic', 'ltdsti', 'limited', 'sirketi',
+    'inc', 'co', 'corp', 'company', 'llc', 'gmbh', 'sdn', 'bhd', 'the', 'and', 'of'
+})
+
+# 64 bitlik dHash, 16 bitlik 4 banda bölünür; <= 7 bit farkta en az bir bant en fazla
+# 1 bit farklıdır, bu yüzden sorguda her bandın 1 bit komşuları da yoklanır
+FINGERPRINT_BANDS = 4
+FINGERPRINT_BAND_BITS = 16
+
+FIELD_TYPES = ('text', 'amount', 'date')
+
+
+def normalize_tax_id(value: str) -> str:
+    return TAX_ID_SEPARATORS.sub('', value).upper()
+
+
+def name_tokens(text: str) -> List[str]:
+    """Türkçe karakterleri sadeleştirilmiş, ekleri atılmış ad kelimeleri"""
+    tokens = NAME_TOKEN_PATTERN.findall(text.translate(ASCII_FOLD).lower())
+    return [token for token in tokens if token not in NAME_STOPWORDS]
+
+
+def letterhead_hash(image: 'np.ndarray', band: float = 0.2) -> int:
+    """Sayfanın üst bandından 64 bitlik fark hash'i (dHash)"""
+    import cv2
+    import numpy as np
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    top = gray[:max(int(gray.shape[0] * band), 1), :]
+    small = cv2.resize(top, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def fingerprint_bands(value: int) -> List[Tuple[int, int]]:
+    mask = (1 << FINGERPRINT_BAND_BITS) - 1
+    return [(band, (value >> (band * FINGERPRINT_BAND_BITS)) & mask) for band in range(FINGERPRINT_BANDS)]
+
+
+def fingerprint_probes(value: int) -> List[Tuple[int, int]]:
+    """Her bant ve bandın 1 bit komşuları (4 x 17 sözlük araması)"""
+    probes = []
+    for band, bits in fingerprint_bands(value):
+        probes.append((band, bits))
+        probes.extend((band, bits ^ (1 << bit)) for bit in range(FINGERPRINT_BAND_BITS))
+    return probes
+
+
+@dataclass
+class FieldRule:
+    """Satıcıya özel tek alan kuralı (ilk grup değer olarak alınır)"""
+    name: str
+    pattern: re.Pattern
+    type: str = 'text'
+    format: Optional[str] = None
+    decimal: str = '.'
+
+    def convert(self, value: str):
+        value = value.strip()
+        if self.type == 'amount':
+            thousands = ',' if self.decimal == '.' else '.'
+            try:
+                return float(value.replace(' ', '').replace(thousands, '').replace(self.decimal, '.'))
+            except ValueError:
+                return None
+        if self.type == 'date' and self.format:
+            try:
+                return datetime.strptime(value, self.format).strftime('%Y-%m-%d')
+            except ValueError:
+                return None
+        return value
+
+
+@dataclass
+class VendorProfile:
+    """Tek satıcının kimlik bilgileri ve derlenmiş alan kuralları"""
+    id: str
+    name: str
+    aliases: List[str] = field(default_factory=list)
+    tax_ids: List[str] = field(default_factory=list)
+    fingerprints: List[int] = field(default_factory=list)
+    currency: str = ''
+    category: str = ''
+    rules: List[FieldRule] = field(default_factory=list)
+    # InvoiceParser için sayfa düzeni (satır aralıkları, anahtar kelimeler)
+    layout: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'VendorProfile':
+        decimal = data.get('decimal_separator', '.')
+        rules = []
+        for name, spec in (data.get('fields') or {}).items():
+            spec = {'pattern': spec} if isinstance(spec, str) else spec
+            field_type = spec.get('type', 'text')
+            if field_type not in FIELD_TYPES:
+                raise ValueError(f"Unknown field type '{field_type}' for {name}")
+            flags = re.MULTILINE | (re.IGNORECASE if spec.get('ignore_case', True) else 0)
+            rules.append(FieldRule(name=name, pattern=re.compile(spec['pattern'], flags), type=field_type,
+                                   format=spec.get('format'), decimal=spec.get('decimal', decimal)))
+        return cls(
+            id=data['id'],
+            name=data['name'],
+            aliases=list(data.get('aliases', [])),
+            tax_ids=[normalize_tax_id(value) for value in data.get('tax_ids', [])],
+            fingerprints=[int(value, 16) for value in data.get('fingerprints', [])],
+            currency=data.get('currency', ''),
+            category=data.get('category', ''),
+            rules=rules,
+            layout=dict(data.get('layout', {}))
+        )
+
+    def extract(self, document: 'OCRDocument') -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Derlenmiş kuralları uygula; (alanlar, kaynak satırlar) döndür"""
+        data = {'vendor': self.name}
+        provenance = {}
+        if self.currency:
+            data['currency'] = self.currency
+        if self.category:
+            data['category'] = self.category
+
+        for rule in self.rules:
+            for match in rule.pattern.finditer(document.text):
+                value = rule.convert(match.group(1) if match.groups() else match.group())
+                if value:
+                    data[rule.name] = value
+                    provenance[rule.name] = document.provenance(document.line_at(match.start()))
+                    break
+        return data, provenance
+
+
+class VendorRegistry:
+    """Satıcı profillerini yükler ve vergi no, ad kelimeleri ve antet izi ile O(1) tanır"""
+
+    METHOD_HINT = 'hint'
+    METHOD_TAX_ID = 'tax_id'
+    METHOD_NAME = 'name'
+    METHOD_FINGERPRINT = 'fingerprint'
+
+    def __init__(self, config=None):
+        self.config = config or {}
+        self.logger = logging.getLogger(__name__)
+        self.profile_dir = self.config.get('VENDOR_PROFILE_DIR', os.path.join('config', 'vendor_profiles'))
+        self.name_scan_lines = self.config.get('VENDOR_NAME_SCAN_LINES', 8)
+        self.name_min_match = self.config.get('VENDOR_NAME_MIN_MATCH', 0.75)
+        self.max_fingerprint_distance = self.config.get('VENDOR_FINGERPRINT_MAX_DISTANCE', 6)
+
+        self.profiles = {}
+        self._by_tax_id = {}
+        # (profil, ad indeksi) -> kelimeler; kelime -> geçtiği ad sayısı
+        self._aliases = {}
+        self._token_counts = Counter()
+        # Önek filtresi: her ad sadece en nadir kelimeleriyle indekslenir
+        self._name_index = None
+        self._fingerprint_index = defaultdict(set)
+
+        self.counts = Counter()
+        self.elapsed_ms = Counter()
+
+    def load(self, profile_dir: Optional[str] = None) -> 'VendorRegistry':
+        """Dizindeki tüm JSON profillerini yükle (dosya başına bir profil veya liste)"""
+        profile_dir = profile_dir or self.profile_dir
+        start = time.perf_counter()
+        for path in sorted(glob.glob(os.path.join(profile_dir, '*.json'))):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    payload = json.load(f)
+                for item in payload if isinstance(payload, list) else [payload]:
+                    self.add(VendorProfile.from_dict(item))
+            except (OSError, ValueError, KeyError, re.error) as e:
+                self.logger.error(f"Skipping vendor profile {path}: {str(e)}")
+        self._build_name_index()
+        self.logger.info(
+            f"Loaded {len(self.profiles)} vendor profiles from {profile_dir} "
+            f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return self
+
+    def add(self, profile: VendorProfile):
+        """Profili tüm indekslere ekle"""
+        self.profiles[profile.id] = profile
+        for tax_id in profile.tax_ids:
+            self._by_tax_id[tax_id] = profile.id
+        for alias_index, alias in enumerate([profile.name] + profile.aliases):
+            tokens = frozenset(name_tokens(alias))
+            if tokens:
+                self._aliases[(profile.id, alias_index)] = tokens
+                self._token_counts.update(tokens)
+        # Kelime sıklıkları değişti - ad indeksi ilk sorguda yeniden kurulur
+        self._name_index = None
+        for fingerprint in profile.fingerprints:
+            for band in fingerprint_bands(fingerprint):
+                self._fingerprint_index[band].add(profile.id)
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    def identify(self, document: Union['OCRDocument', str, None] = None, image: Optional['np.ndarray'] = None,
+                 vendor_hint: Optional[str] = None, fingerprint: Optional[int] = None) -> Dict[str, Any]:
+        """Satıcıyı ucuzdan pahalıya indekslerle bul
+
+        Sıra: bildirilen satıcı adı, belgedeki vergi numarası, başlık satırlarındaki
+        ad kelimeleri, antet izi. Bulunamazsa profile None döner.
+        """
+        start = time.perf_counter()
+        profile, method = None, None
+        if self.profiles:
+            if vendor_hint:
+                profile, method = self._match_name(vendor_hint), self.METHOD_HINT
+            if profile is None and document is not None:
+                from .document import OCRDocument
+                document = OCRDocument.ensure(document)
+                profile, method = self._match_tax_id(document.text), self.METHOD_TAX_ID
+                if profile is None:
+                    header = '\n'.join(line.text for line in document.lines[:self.name_scan_lines])
+                    profile, method = self._match_name(header), self.METHOD_NAME
+            if profile is None and self._fingerprint_index and (fingerprint is not None or image is not None):
+                if fingerprint is None:
+                    fingerprint = letterhead_hash(image)
+                profile, method = self._match_fingerprint(fingerprint), self.METHOD_FINGERPRINT
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        method = method if profile is not None else None
+        self.counts[method or 'none'] += 1
+        self.elapsed_ms[method or 'none'] += elapsed_ms
+        return {'profile': profile, 'method': method, 'elapsed_ms': round(elapsed_ms, 3)}
+
+    def stats(self) -> Dict[str, Any]:
+        """Tanıma yöntemlerine göre sayılar ve ortalama süre"""
+        return {
+            'profiles': len(self.profiles),
+            'methods': {
+                method: {'count': count, 'mean_ms': round(self.elapsed_ms[method] / count, 3)}
+                for method, count in self.counts.items()
+            }
+        }
+
+    def _match_tax_id(self, text: str) -> Optional[VendorProfile]:
+        if not self._by_tax_id:
+            return None
+        for match in TAX_ID_CANDIDATE_PATTERN.finditer(text):
+            profile_id = self._by_tax_id.get(normalize_tax_id(match.group()))
+            if profile_id:
+                return self.profiles[profile_id]
+        return None
+
+    def _build_name_index(self):
+        """Adı en az name_min_match oranında eşleşen metin, adın en nadir
+        (n - gereken + 1) kelimesinden birini mutlaka içerir; sadece onlar indekslenir"""
+        index = defaultdict(set)
+        for key, tokens in self._aliases.items():
+            required = max(1, math.ceil(self.name_min_match * len(tokens) - 1e-9))
+            ordered = sorted(tokens, key=lambda token: (self._token_counts[token], token))
+            for token in ordered[:len(tokens) - required + 1]:
+                index[token].add(key)
+        self._name_index = index
+
+    def _match_name(self, text: str) -> Optional[VendorProfile]:
+        """Adın kelimelerinin en az name_min_match oranı metinde geçen en iyi profil"""
+        if self._name_index is None:
+            self._build_name_index()
+        tokens = set(name_tokens(text))
+        candidates = set()
+        for token in tokens:
+            candidates |= self._name_index.get(token, set())
+
+        best, best_score = None, (0.0, 0)
+        for key in candidates:
+            alias = self._aliases[key]
+            count = len(alias & tokens)
+            score = (count / len(alias), count)
+            if score[0] >= self.name_min_match and score > best_score:
+                best, best_score = key, score
+        return self.profiles[best[0]] if best else None
+
+    def _match_fingerprint(self, fingerprint: int) -> Optional[VendorProfile]:
+        candidates = set()
+        for probe in fingerprint_probes(fingerprint):
+            candidates |= self._fingerprint_index.get(probe, set())
+        best, best_distance = None, self.max_fingerprint_distance + 1
+        for profile_id in candidates:
+            distance = min(hamming(fingerprint, value) for value in self.profiles[profile_id].fingerprints)
+            if distance < best_distance:
+                best, best_distance = profile_id, distance
+        return self.profiles[best] if best else None
+
+
+# Profiller süreç başına bir kez yüklenir
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry(config=None) -> VendorRegistry:
+    """Süreç genelindeki satıcı profil kaydı"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = VendorRegistry(config).load()
+    return _registry
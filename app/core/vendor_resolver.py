@@ -0,0 +1,261 @@
+import logging
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+NON_ALNUM_PATTERN = re.compile(r'[^a-z0-9]+')
+ASCII_FOLD = str.maketrans('çğıöşüÇĞİÖŞÜâîûÂÎÛ', 'cgiosuCGIOSUaiuAIU')
+
+
+def normalize_vendor(name: str) -> str:
+    """Karşılaştırma anahtarı: Türkçe karakterler sadeleşir, noktalama tek boşluk olur"""
+    return NON_ALNUM_PATTERN.sub(' ', (name or '').translate(ASCII_FOLD).lower()).strip()
+
+
+def osa_distance(a: str, b: str, max_distance: int) -> int:
+    """Sınırlı Damerau-Levenshtein (bitişik yer değiştirme dahil)
+
+    Sadece köşegen etrafındaki max_distance genişliğindeki bant hesaplanır; satır
+    minimumu sınırı aşınca erken çıkar. Sınır aşılırsa max_distance + 1 döndürür.
+    """
+    if a == b:
+        return 0
+    len_a, len_b = len(a), len(b)
+    if abs(len_a - len_b) > max_distance:
+        return max_distance + 1
+
+    # Ortak önek ve sonek mesafeyi değiştirmez
+    while len_a and len_b and a[len_a - 1] == b[len_b - 1]:
+        len_a -= 1
+        len_b -= 1
+    start = 0
+    while start < len_a and start < len_b and a[start] == b[start]:
+        start += 1
+    a, b = a[start:len_a], b[start:len_b]
+    len_a, len_b = len(a), len(b)
+    if not len_a or not len_b:
+        return min(max(len_a, len_b), max_distance + 1)
+
+    limit = max_distance + 1
+    previous_previous = None
+    previous = [j if j <= max_distance else limit for j in range(len_b + 1)]
+    for i in range(1, len_a + 1):
+        current = [limit] * (len_b + 1)
+        current[0] = i if i <= max_distance else limit
+        row_min = current[0]
+        low = max(1, i - max_distance)
+        high = min(len_b, i + max_distance)
+        char_a = a[i - 1]
+        for j in range(low, high + 1):
+            value = previous[j - 1] + (char_a != b[j - 1])
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if (j > 1 and i > 1 and char_a == b[j - 2] and a[i - 2] == b[j - 1] and
+                    previous_previous[j - 2] + 1 < value):
+                value = previous_previous[j - 2] + 1
+            current[j] = value if value < limit else limit
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return limit
+        previous_previous, previous = previous, current
+    return previous[len_b]
+
+
+class VendorResolver:
+    """OCR ile bozulmuş satıcı adlarını bilinen kanonik adlara eşler
+
+    SymSpell tarzı silme indeksi: her ad anahtarının ilk prefix_length karakterinden
+    en fazla max_distance silme ile elde edilen varyantlar indekslenir. Sorguda aynı
+    varyantlar üretilip adaylar toplanır ve sadece onlar için sınırlı düzenleme
+    mesafesi hesaplanır; maliyet satıcı sayısından bağımsızdır.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or {}
+        self.logger = logging.getLogger(__name__)
+        self.max_distance = self.config.get('VENDOR_RESOLVER_MAX_DISTANCE', 2)
+        self.prefix_length = self.config.get('VENDOR_RESOLVER_PREFIX_LENGTH', 7)
+        # Kısa adlarda izin verilen düzenleme sayısı: uzunluk / chars_per_edit
+        self.chars_per_edit = self.config.get('VENDOR_RESOLVER_CHARS_PER_EDIT', 5)
+
+        # satıcı no -> kanonik ad, anahtar, fatura sayısı
+        self._names = []
+        self._keys = []
+        self._counts = []
+        # normalize anahtar (öğrenilen varyantlar dahil) -> satıcı no
+        self._exact = {}
+        # silme varyantı -> satıcı no (tek satıcıysa int, değilse liste - bellek için)
+        self._deletes = {}
+        self._lock = threading.Lock()
+
+        self.lookups = 0
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def load(self, vendors: Iterable[Tuple[str, int]]) -> 'VendorResolver':
+        """(ad, fatura sayısı) çiftlerinden kur
+
+        En sık yazım kanonik olur; ona yakın diğer yazımlar varyant olarak bağlanır.
+        """
+        start = time.perf_counter()
+        for name, count in sorted(vendors, key=lambda item: -(item[1] or 0)):
+            if name:
+                self.resolve(name, learn=True, count=count or 1)
+        self.logger.info(
+            f"Loaded {len(self._names)} canonical vendors ({len(self._exact)} spellings) "
+            f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return self
+
+    def add(self, name: str, count: int = 1) -> int:
+        """Yeni kanonik satıcı ekle (varsa sayacını artır)"""
+        key = normalize_vendor(name)
+        with self._lock:
+            vendor_id = self._exact.get(key)
+            if vendor_id is None:
+                vendor_id = len(self._names)
+                self._names.append(name.strip())
+                self._keys.append(key)
+                self._counts.append(0)
+                self._exact[key] = vendor_id
+                for variant in self._variants(key):
+                    existing = self._deletes.get(variant)
+                    if existing is None:
+                        self._deletes[variant] = vendor_id
+                    elif isinstance(existing, int):
+                        self._deletes[variant] = [existing, vendor_id]
+                    else:
+                        existing.append(vendor_id)
+            self._counts[vendor_id] += count
+        return vendor_id
+
+    def resolve(self, name: str, learn: bool = True, count: int = 1) -> Dict[str, Any]:
+        """Adı kanonik satıcıya eşle; eşleşme yoksa learn=True ise yeni satıcı olarak ekle"""
+        start = time.perf_counter()
+        key = normalize_vendor(name)
+        self.lookups += 1
+        if not key:
+            return {'vendor': (name or '').strip(), 'matched': False, 'distance': None, 'elapsed_ms': 0.0}
+
+        distance = 0
+        vendor_id = self._exact.get(key)
+        if vendor_id is not None:
+            self.exact_hits += 1
+        else:
+            vendor_id, distance = self._lookup(key)
+            if vendor_id is not None:
+                self.fuzzy_hits += 1
+                if learn:
+                    # Aynı bozuk yazım bir daha geldiğinde doğrudan bulunur
+                    with self._lock:
+                        self._exact[key] = vendor_id
+
+        matched = vendor_id is not None
+        if matched:
+            if learn:
+                with self._lock:
+                    self._counts[vendor_id] += count
+        elif learn:
+            vendor_id = self.add(name, count)
+
+        return {
+            'vendor': self._names[vendor_id] if vendor_id is not None else name.strip(),
+            'matched': matched,
+            'distance': distance if matched else None,
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 3)
+        }
+
+    def candidates(self, name: str) -> List[Tuple[str, int]]:
+        """Eşik içindeki tüm kanonik adlar ve mesafeleri (en yakın önce)"""
+        key = normalize_vendor(name)
+        allowed = self._allowed_distance(key)
+        found = []
+        for vendor_id in self._candidate_ids(key, allowed):
+            distance = osa_distance(key, self._keys[vendor_id], allowed)
+            if distance <= allowed:
+                found.append((self._names[vendor_id], distance))
+        return sorted(found, key=lambda item: item[1])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'vendors': len(self._names),
+            'spellings': len(self._exact),
+            'delete_entries': len(self._deletes),
+            'lookups': self.lookups,
+            'exact_hits': self.exact_hits,
+            'fuzzy_hits': self.fuzzy_hits
+        }
+
+    def _allowed_distance(self, key: str) -> int:
+        return min(self.max_distance, len(key) // self.chars_per_edit)
+
+    def _variants(self, key: str, depth: Optional[int] = None) -> Set[str]:
+        """Anahtar önekinden en fazla depth (varsayılan max_distance) silmeyle elde edilen dizgiler"""
+        prefix = key[:self.prefix_length]
+        variants = {prefix}
+        frontier = {prefix}
+        for _ in range(self.max_distance if depth is None else depth):
+            following = set()
+            for word in frontier:
+                if len(word) > 1:
+                    following.update(word[:i] + word[i + 1:] for i in range(len(word)))
+            following -= variants
+            variants |= following
+            frontier = following
+        return variants
+
+    def _candidate_ids(self, key: str, allowed: int) -> Set[int]:
+        # İndeks max_distance silmeyle kuruldu; sorguda izin verilen kadarı yeterli
+        ids = set()
+        for variant in self._variants(key, allowed):
+            found = self._deletes.get(variant)
+            if found is None:
+                continue
+            if isinstance(found, int):
+                ids.add(found)
+            else:
+                ids.update(found)
+        return ids
+
+    def _lookup(self, key: str) -> Tuple[Optional[int], Optional[int]]:
+        """En yakın kanonik satıcı; eşitlikte daha sık görülen"""
+        allowed = self._allowed_distance(key)
+        if allowed == 0:
+            return None, None
+
+        best_id, best_rank = None, None
+        for vendor_id in self._candidate_ids(key, allowed):
+            candidate = self._keys[vendor_id]
+            if abs(len(candidate) - len(key)) > allowed:
+                continue
+            distance = osa_distance(key, candidate, allowed)
+            if distance > allowed:
+                continue
+            rank = (distance, -self._counts[vendor_id], vendor_id)
+            if best_rank is None or rank < best_rank:
+                best_id, best_rank = vendor_id, rank
+        return (best_id, best_rank[0]) if best_id is not None else (None, None)
+
+
+# Süreç başına tek çözümleyici; ilk istekte veritabanından doldurulur
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_resolver(config=None, loader=None) -> VendorResolver:
+    """Süreç genelindeki satıcı çözümleyici; loader (ad, sayı) çiftleri döndürür"""
+    global _resolver
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                resolver = VendorResolver(config)
+                if loader is not None:
+                    resolver.load(loader())
+                _resolver = resolver
+    return _resolver
@@ -0,0 +1,120 @@
+import gc
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict
+from ..utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Isınmada OCR ve NER'den geçirilen örnek fatura
+SAMPLE_LINES = (
+    'ORNEK TICARET A.S.',
+    'FATURA / INVOICE',
+    'Fatura No: WARM-0001',
+    'Tarih: 01.01.2024',
+    'Urun                 Miktar   Fiyat     Tutar',
+    'Kalem A                   2   10,00     20,00',
+    'Kalem B                   1   30,50     30,50',
+    'KDV %20                                 10,10',
+    'TOPLAM                                  60,60 TL',
+)
+
+# Süreç durumu; preload_app ile master'da doldurulur, fork'ta worker'lara kopyalanır
+_state: Dict[str, Any] = {'status': 'pending', 'pid': None, 'elapsed_ms': None, 'steps': {}, 'errors': []}
+_state_lock = threading.Lock()
+
+
+def sample_image(width: int = 1240, height: int = 1754):
+    """150 DPI A4 boyutunda, düz metinli örnek fatura görüntüsü"""
+    import cv2
+    import numpy as np
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    for index, line in enumerate(SAMPLE_LINES):
+        cv2.putText(image, line, (80, 160 + index * 70), cv2.FONT_HERSHEY_SIMPLEX, 1.1, (0, 0, 0), 2,
+                    cv2.LINE_AA)
+    return image
+
+
+def readiness() -> Dict[str, Any]:
+    """/ready için ısınma durumunun kopyası"""
+    with _state_lock:
+        return dict(_state, steps=dict(_state['steps']), errors=list(_state['errors']))
+
+
+def run_warmup(processor, config=None) -> Dict[str, Any]:
+    """Modelleri yükle, örnek belgeyi uçtan uca işle ve yığını dondur
+
+    gunicorn preload_app ile fork öncesi master'da çağrılır: yüklenen
+    pipeline'lar ve Tesseract/OpenCV durumu worker'lara kopyalanmadan
+    (copy-on-write) paylaşılır, ilk fatura tembel yükleme beklemez. Süreç
+    başına bir kez çalışır.
+    """
+    config = config or {}
+    with _state_lock:
+        done = _state['status'] in ('warming', 'ready')
+        if not done:
+            _state.update(status='warming', pid=os.getpid(), steps={}, errors=[])
+    if done:
+        return readiness()
+
+    start = time.perf_counter()
+    steps, errors = {}, []
+    languages = config.get('WARMUP_NER_LANGUAGES') or [config.get('NER_DEFAULT_LANGUAGE', 'en')]
+    for name, step in (('ner', lambda: _warm_ner(processor, languages)),
+                       ('document', lambda: _warm_document(processor))):
+        step_start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            errors.append(f"{name}: {str(e)}")
+            logger.error("Warm-up step %s failed: %s", name, e)
+        steps[name] = round((time.perf_counter() - step_start) * 1000, 1)
+
+    # Isınma gözlemleri worker'ların metriklerine ve katman sayılarına karışmasın
+    processor.tier_counts.clear()
+    get_metrics().reset()
+
+    # Fork öncesi: kalıcı nesneler GC'den çıkarılır, worker'daki toplamalar
+    # bu sayfalara yazıp copy-on-write kopyası oluşturmaz
+    if config.get('WARMUP_GC_FREEZE', True):
+        step_start = time.perf_counter()
+        gc.collect()
+        gc.freeze()
+        steps['gc_freeze'] = round((time.perf_counter() - step_start) * 1000, 1)
+
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+    status = 'failed' if errors else 'ready'
+    with _state_lock:
+        _state.update(status=status, elapsed_ms=elapsed_ms, steps=steps, errors=errors,
+                      frozen_objects=gc.get_freeze_count())
+    logger.info("Warm-up %s in %.0f ms (steps_ms=%s, frozen_objects=%d)", status, elapsed_ms, steps,
+                gc.get_freeze_count())
+    return readiness()
+
+
+def _warm_ner(processor, languages):
+    ner = processor.ner_processor
+    text = '\n'.join(SAMPLE_LINES)
+    for language in languages:
+        result = ner.process_text(text, language)
+        if not result.get('success'):
+            raise RuntimeError(f"NER pipeline for '{language}' failed: {result.get('error')}")
+
+
+def _warm_document(processor):
+    import cv2
+    # process_document dosya yolu bekler; yükleme yolundaki decode dahil her aşama ısınır
+    fd, path = tempfile.mkstemp(suffix='.png', prefix='warmup-')
+    os.close(fd)
+    try:
+        cv2.imwrite(path, sample_image())
+        result = processor.process_document(path)
+    finally:
+        os.remove(path)
+    if result is None:
+        raise RuntimeError("sample document could not be processed")
+    if not result.get('success'):
+        logger.warning("Warm-up document was not processed successfully: %s", result.get('error'))
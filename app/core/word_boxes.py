@@ -0,0 +1,202 @@
+import struct
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+
+REGIONS = ('header', 'body', 'footer')
+
+# Kelime başına tek kayıt (41 bayt, hizalamasız); metin ayrı, tek parça string
+WORD_DTYPE = np.dtype([
+    ('left', '<i4'),
+    ('top', '<i4'),
+    ('width', '<i4'),
+    ('height', '<i4'),
+    ('conf', '<f4'),
+    ('block', '<i4'),
+    ('par', '<i4'),
+    ('line', '<i4'),      # belge içi satır sırası
+    ('start', '<i4'),     # metin içindeki karakter ofsetleri
+    ('end', '<i4'),
+    ('region', 'i1'),     # REGIONS indeksi
+])
+
+# magic, sürüm, kelime sayısı, metin bayt uzunluğu
+_HEADER = struct.Struct('<4sHII')
+_MAGIC = b'WBOX'
+_VERSION = 1
+
+
+class WordBoxes:
+    """OCR kelime kutularının NumPy yapılandırılmış dizi ile sıkıştırılmış hali
+
+    Kutular, güven skorları, blok/satır kimlikleri ve metin ofsetleri tek bir
+    dizide; kelime metinleri satırlar '\\n', kelimeler ' ' ile birleştirilmiş tek
+    bir string'de tutulur. Filtreler aynı metni paylaşan yeni görünümler döndürür.
+    """
+
+    def __init__(self, text: str, boxes: np.ndarray):
+        self.text = text
+        self.boxes = boxes
+
+    @classmethod
+    def empty(cls) -> 'WordBoxes':
+        return cls('', np.zeros(0, dtype=WORD_DTYPE))
+
+    @classmethod
+    def from_tesseract(cls, data: Dict[str, list], page_height: int,
+                       region_split: Tuple[float, float] = (0.3, 0.7)) -> 'WordBoxes':
+        """pytesseract image_to_data (Output.DICT) çıktısını diziye çevir
+
+        Boş kelimeler atılır; satırlar yukarıdan aşağıya, satır içindeki kelimeler
+        Tesseract sırasıyla dizilir.
+        """
+        texts = data['text']
+        keep = np.fromiter((i for i, word in enumerate(texts) if word.strip()), dtype=np.int64)
+        if not len(keep):
+            return cls.empty()
+
+        def column(name, dtype):
+            return np.asarray(data[name])[keep].astype(dtype)
+
+        block = column('block_num', np.int32)
+        par = column('par_num', np.int32)
+        tess_line = column('line_num', np.int32)
+        top = column('top', np.int32)
+
+        # (blok, paragraf, satır) gruplarını en üst kelimeye, eşitlikte ilk görünüşe göre sırala
+        keys = np.stack([block, par, tess_line], axis=1)
+        _, group = np.unique(keys, axis=0, return_inverse=True)
+        group = group.reshape(-1)
+        group_count = group.max() + 1
+        group_top = np.full(group_count, np.iinfo(np.int32).max, dtype=np.int32)
+        np.minimum.at(group_top, group, top)
+        group_first = np.full(group_count, len(keep), dtype=np.int64)
+        np.minimum.at(group_first, group, np.arange(len(keep)))
+        line_order = np.lexsort((group_first, group_top))
+        line_rank = np.empty(group_count, dtype=np.int32)
+        line_rank[line_order] = np.arange(group_count, dtype=np.int32)
+        line = line_rank[group]
+
+        order = np.argsort(line, kind='stable')
+        words = [texts[i] for i in keep[order]]
+
+        boxes = np.zeros(len(order), dtype=WORD_DTYPE)
+        boxes['left'] = column('left', np.int32)[order]
+        boxes['top'] = top[order]
+        boxes['width'] = column('width', np.int32)[order]
+        boxes['height'] = column('height', np.int32)[order]
+        boxes['conf'] = column('conf', np.float32)[order]
+        boxes['block'] = block[order]
+        boxes['par'] = par[order]
+        boxes['line'] = line[order]
+
+        # Her kelimeden önce tek ayırıcı karakter var (' ' veya '\n'), ilki hariç
+        lengths = np.fromiter((len(word) for word in words), dtype=np.int32, count=len(words))
+        boxes['start'] = np.cumsum(lengths) - lengths + np.arange(len(words), dtype=np.int32)
+        boxes['end'] = boxes['start'] + lengths
+
+        new_line = np.ones(len(words), dtype=bool)
+        new_line[1:] = boxes['line'][1:] != boxes['line'][:-1]
+        text = ''.join(('\n' if first else ' ') + word
+                       for first, word in zip(new_line.tolist(), words))[1:]
+
+        # Bölge satırın en üst noktasına göre belirlenir
+        line_top = group_top[line_order][boxes['line']]
+        boxes['region'] = np.searchsorted(
+            np.array([page_height * region_split[0], page_height * region_split[1]]),
+            line_top, side='right')
+        return cls(text, boxes)
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    @property
+    def nbytes(self) -> int:
+        """Dizi ve metnin yaklaşık bellek kullanımı"""
+        return self.boxes.nbytes + len(self.text.encode('utf-8'))
+
+    def word(self, index: int) -> str:
+        row = self.boxes[index]
+        return self.text[row['start']:row['end']]
+
+    def words(self) -> List[str]:
+        text = self.text
+        return [text[start:end] for start, end in zip(self.boxes['start'].tolist(), self.boxes['end'].tolist())]
+
+    def bboxes(self) -> np.ndarray:
+        """(n, 4) left, top, width, height"""
+        return np.stack([self.boxes['left'], self.boxes['top'],
+                         self.boxes['width'], self.boxes['height']], axis=1)
+
+    def filter(self, mask: np.ndarray) -> 'WordBoxes':
+        """Maske/indekslerle alt küme - metin kopyalanmaz"""
+        return WordBoxes(self.text, self.boxes[mask])
+
+    def by_region(self, region: Union[str, int]) -> 'WordBoxes':
+        code = REGIONS.index(region) if isinstance(region, str) else region
+        return self.filter(self.boxes['region'] == code)
+
+    def by_confidence(self, min_conf: float) -> 'WordBoxes':
+        return self.filter(self.boxes['conf'] >= min_conf)
+
+    def by_line(self, lines: Union[int, Sequence[int]]) -> 'WordBoxes':
+        if isinstance(lines, (int, np.integer)):
+            return self.filter(self.boxes['line'] == lines)
+        return self.filter(np.isin(self.boxes['line'], lines))
+
+    def mean_confidence(self) -> Optional[float]:
+        """Geçerli (>= 0) güven skorlarının ortalaması"""
+        conf = self.boxes['conf']
+        valid = conf[conf >= 0]
+        return float(valid.mean()) if len(valid) else None
+
+    def line_stats(self) -> Dict[str, np.ndarray]:
+        """Satır başına kutu sınırları, ortalama güven, bölge ve metin ofsetleri
+
+        Kelimeler satıra göre sıralı olduğu için reduceat ile tek geçişte hesaplanır.
+        """
+        boxes = self.boxes
+        if not len(boxes):
+            stats = {name: np.zeros(0, dtype=np.int32) for name in
+                     ('line', 'left', 'top', 'right', 'bottom', 'start', 'end', 'region')}
+            stats['confidence'] = np.zeros(0, dtype=np.float32)
+            return stats
+
+        starts = np.flatnonzero(np.r_[True, boxes['line'][1:] != boxes['line'][:-1]])
+        ends = np.r_[starts[1:], len(boxes)] - 1
+        conf = boxes['conf']
+        valid = (conf >= 0).astype(np.float32)
+        conf_sum = np.add.reduceat(np.where(conf >= 0, conf, 0), starts)
+        conf_count = np.add.reduceat(valid, starts)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            confidence = np.where(conf_count > 0, conf_sum / conf_count, np.nan)
+
+        return {
+            'line': boxes['line'][starts],
+            'left': np.minimum.reduceat(boxes['left'], starts),
+            'top': np.minimum.reduceat(boxes['top'], starts),
+            'right': np.maximum.reduceat(boxes['left'] + boxes['width'], starts),
+            'bottom': np.maximum.reduceat(boxes['top'] + boxes['height'], starts),
+            'start': boxes['start'][starts],
+            'end': boxes['end'][ends],
+            'region': boxes['region'][starts],
+            'confidence': confidence,
+        }
+
+    def to_bytes(self) -> bytes:
+        """Önbellek/DB için ikili biçim: başlık + ham dizi + UTF-8 metin"""
+        text = self.text.encode('utf-8')
+        boxes = np.ascontiguousarray(self.boxes, dtype=WORD_DTYPE)
+        return b''.join((_HEADER.pack(_MAGIC, _VERSION, len(boxes), len(text)), boxes.tobytes(), text))
+
+    @classmethod
+    def from_bytes(cls, buffer: Union[bytes, bytearray, memoryview]) -> 'WordBoxes':
+        """to_bytes çıktısını oku; dizi tampon üzerinde kopyasız görünüm olarak açılır"""
+        view = memoryview(buffer)
+        magic, version, count, text_size = _HEADER.unpack_from(view)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f'Unsupported word box payload: {magic!r} v{version}')
+        offset = _HEADER.size
+        boxes = np.frombuffer(view, dtype=WORD_DTYPE, count=count, offset=offset)
+        offset += count * WORD_DTYPE.itemsize
+        text = str(view[offset:offset + text_size], 'utf-8')
+        return cls(text, boxes)
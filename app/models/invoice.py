@@ -1,4 +1,5 @@
 from datetime import datetime
+from decimal import Decimal
 from app import db
 
 class Invoice(db.Model):
@@ -13,4 +14,85 @@ class Invoice(db.Model):
     tax_amount = db.Column(db.Float)
     raw_text = db.Column(db.Text)
     confidence = db.Column(db.Float)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow) 
\ No newline at end of file
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Kalemler tek tek yüklenmez; sorgu olarak döner (invoice.line_items.all())
+    line_items = db.relationship('InvoiceLineItem', backref='invoice', lazy='dynamic',
+                                 passive_deletes=True)
+
+
+class InvoiceLineItem(db.Model):
+    """Faturanın ürün/hizmet satırı - satır bazında harcama analizi için"""
+    __tablename__ = 'invoice_line_item'
+
+    id = db.Column(db.Integer, primary_key=True)
+    invoice_id = db.Column(db.Integer, db.ForeignKey('invoice.id', ondelete='CASCADE'),
+                           nullable=False, index=True)
+    line_no = db.Column(db.Integer, nullable=False)
+    product_code = db.Column(db.String(100), index=True)
+    description = db.Column(db.String(500))
+    quantity = db.Column(db.Float)
+    unit = db.Column(db.String(20))
+    unit_price = db.Column(db.Numeric(12, 2))
+    total = db.Column(db.Numeric(12, 2))
+
+    @classmethod
+    def rows_for(cls, invoice_id, items):
+        """ProductItem / InvoiceProduct listesini tablo satırlarına çevir"""
+        rows = []
+        for line_no, item in enumerate(items, start=1):
+            code = getattr(item, 'code', None)
+            description = getattr(item, 'description', None)
+            unit = getattr(item, 'unit', None)
+            rows.append({
+                'invoice_id': invoice_id,
+                'line_no': line_no,
+                'product_code': str(code)[:100] if code else None,
+                'description': description[:500] if description else None,
+                'quantity': float(item.quantity) if getattr(item, 'quantity', None) is not None else None,
+                'unit': str(unit)[:20] if unit else None,
+                'unit_price': cls._money(getattr(item, 'unit_price', None)),
+                'total': cls._money(getattr(item, 'total', None)),
+            })
+        return rows
+
+    @classmethod
+    def bulk_insert(cls, invoice_id, items):
+        """Satırları tek executemany ile ekle (satır başına ORM nesnesi oluşturulmaz)
+
+        Oturumun açık işlemine yazar; commit çağıranın sorumluluğundadır.
+        """
+        rows = cls.rows_for(invoice_id, items)
+        if rows:
+            db.session.execute(cls.__table__.insert(), rows)
+        return len(rows)
+
+    @classmethod
+    def delete_for(cls, invoice_id):
+        """Faturanın tüm satırlarını tek DELETE ile sil"""
+        return cls.query.filter_by(invoice_id=invoice_id).delete(synchronize_session=False)
+
+    @classmethod
+    def stream(cls, vendor=None, product_code=None, since=None, batch_size=1000):
+        """Analiz için satırları (satır, satıcı, tarih) olarak parça parça oku
+
+        yield_per ile sonuçlar batch_size'lık gruplar halinde çekilir; tüm tablo
+        belleğe alınmaz.
+        """
+        query = db.session.query(cls, Invoice.vendor, Invoice.date).join(Invoice, cls.invoice_id == Invoice.id)
+        if vendor:
+            query = query.filter(Invoice.vendor == vendor)
+        if product_code:
+            query = query.filter(cls.product_code == product_code)
+        if since:
+            query = query.filter(Invoice.date >= since)
+        return query.order_by(cls.invoice_id, cls.line_no).yield_per(batch_size)
+
+    @staticmethod
+    def _money(value):
+        if value is None:
+            return None
+        try:
+            return Decimal(str(value)).quantize(Decimal('0.01'))
+        except ArithmeticError:
+            return None
@@ -0,0 +1,262 @@
+import bisect
+import contextvars
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Saniye cinsinden histogram sınırları: milisaniyelik çıkarıcılardan dakikalık OCR'a kadar
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# İstek boyunca geçerli belge türü (dosya uzantısı); iç aşamalar etiketi buradan alır
+_document_type = contextvars.ContextVar('document_type', default='unknown')
+# capture_stages() bloğunda ölçülen aşamalar ayrıca bu listeye yazılır (profil kayıtları için)
+_captured_stages = contextvars.ContextVar('captured_stages', default=None)
+
+# Bir örnek: (etiketler, değer)
+Sample = Tuple[Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    metric_type = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.metric_type}']
+
+    def _labels(self, values: Tuple) -> Dict[str, str]:
+        return dict(zip(self.labelnames, values))
+
+
+class Counter(_Metric):
+    """Sadece artan sayaç; etiket değerleri sırayla verilir"""
+    metric_type = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labelvalues, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [f'{self.name}{_format_labels(self._labels(key))} {_format_value(value)}'
+                                for key, value in values]
+
+
+class Gauge(Counter):
+    """Artıp azalabilen anlık değer"""
+    metric_type = 'gauge'
+
+    def set(self, *labelvalues, value: float):
+        with self._lock:
+            self._values[labelvalues] = value
+
+    def dec(self, *labelvalues, amount: float = 1):
+        self.inc(*labelvalues, amount=-amount)
+
+
+class Histogram(_Metric):
+    """Sabit sınırlı histogram; gözlem bir bisect ve kilit altında iki toplama"""
+    metric_type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # etiket değerleri -> [kova sayıları (son kova +Inf), toplam, adet]
+        self._series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = [(key, list(series[0]), series[1], series[2]) for key, series in self._series.items()]
+        lines = self.header()
+        for key, counts, total, count in snapshot:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{_format_labels({**labels, "le": _format_value(bound)})} '
+                             f'{cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(labels)} {total!r}')
+            lines.append(f'{self.name}_count{_format_labels(labels)} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    """Süreç içi metrikler ve Prometheus metin biçimi
+
+    Toplayıcılar (collector) sadece /metrics okunurken çağrılır; önbellek
+    sayaçları gibi bileşenlerin zaten tuttuğu değerler istek yolunda hiç
+    kopyalanmaz. Her gunicorn worker'ı kendi kaydını tutar.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]] = []
+        self._lock = threading.Lock()
+
+        self.stage_duration = self.histogram(
+            'invoice_stage_duration_seconds', 'Duration of each document processing stage',
+            ('stage', 'outcome', 'document_type'))
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]):
+        """collector() -> (ad, tür, açıklama, [(etiketler, değer)]) dörtlüleri"""
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def observe_stage(self, stage: str, seconds: float, outcome: str = 'ok', document_type: str = None):
+        self.stage_duration.observe(seconds, stage, outcome, document_type or _document_type.get())
+        captured = _captured_stages.get()
+        if captured is not None:
+            captured.append({'stage': stage, 'elapsed_ms': round(seconds * 1000, 3), 'outcome': outcome})
+
+    def span(self, stage: str, document_type: str = None) -> '_Span':
+        """Aşama süresini ölçen bağlam; istisnada outcome='error'. Sonuç başarısızsa span.fail() çağrılır"""
+        return _Span(self, stage, document_type)
+
+    def reset(self):
+        """Tüm metrik değerlerini sıfırla (ör. fork öncesi ısınma gözlemleri worker'lara geçmesin)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            for name, metric_type, documentation, samples in collector():
+                lines.append(f'# HELP {name} {documentation}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                lines.extend(f'{name}{_format_labels(labels)} {_format_value(value)}' for labels, value in samples)
+        return '\n'.join(lines) + '\n'
+
+
+class _Span:
+    """Sınıf tabanlı bağlam yöneticisi - üreteçli contextmanager'dan daha ucuz (~2-3 µs)"""
+    __slots__ = ('registry', 'stage', 'document_type', 'outcome', 'start')
+
+    def __init__(self, registry: MetricsRegistry, stage: str, document_type: Optional[str]):
+        self.registry = registry
+        self.stage = stage
+        self.document_type = document_type
+        self.outcome = 'ok'
+
+    def __enter__(self) -> '_Span':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.outcome = 'error'
+        self.registry.observe_stage(self.stage, elapsed, self.outcome, self.document_type)
+        return False
+
+    def fail(self, outcome: str = 'error'):
+        self.outcome = outcome
+
+
+def document_type_label(filename: Optional[str], allowed_extensions) -> str:
+    """Dosya uzantısından etiket; izin verilmeyen uzantılar 'other' (etiket kümesi sınırlı kalır)"""
+    extension = os.path.splitext(filename or '')[1].lstrip('.').lower()
+    return extension if extension in allowed_extensions else 'other'
+
+
+@contextmanager
+def document_type(value: Optional[str]):
+    """Bu blokta ölçülen aşamalara belge türü etiketi ver"""
+    token = _document_type.set((value or 'unknown').lower())
+    try:
+        yield
+    finally:
+        _document_type.reset(token)
+
+
+@contextmanager
+def capture_stages():
+    """Bu blokta ölçülen aşamaları sırasıyla listede topla"""
+    stages = []
+    token = _captured_stages.set(stages)
+    try:
+        yield stages
+    finally:
+        _captured_stages.reset(token)
+
+
+# Süreç başına tek kayıt
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Süreç genelindeki metrik kaydı"""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = MetricsRegistry()
+    return _metrics
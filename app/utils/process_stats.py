@@ -0,0 +1,114 @@
+import os
+import sys
+
+
+def rss_mb(pid='self') -> float:
+    """Süreç RSS değeri MB cinsinden (Linux /proc üzerinden, diğerlerinde 0)"""
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def peak_rss_mb() -> float:
+    """Sürecin şimdiye kadarki en yüksek RSS değeri MB cinsinden (resource modülü olmayan Windows'ta 0)"""
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS byte, Linux kilobyte döndürür
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def cpu_seconds(pid='self') -> float:
+    """Sürecin toplam kullanıcı + sistem CPU süresi saniye cinsinden (Linux /proc)"""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            # Süreç adı boşluk içerebilir; alanlar son ')' sonrasından sayılır
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def child_pids(pid) -> list:
+    """Doğrudan alt süreçler (ör. gunicorn master -> worker'lar)"""
+    children = []
+    try:
+        for task in os.listdir(f'/proc/{pid}/task'):
+            with open(f'/proc/{pid}/task/{task}/children') as f:
+                children.extend(int(child) for child in f.read().split())
+    except (OSError, ValueError):
+        pass
+    return children
+
+
+def memory_mb(pid='self') -> dict:
+    """RSS, PSS ve USS (sürece özel sayfalar) MB cinsinden (Linux smaps_rollup, diğerlerinde 0)
+
+    Fork sonrası paylaşılan sayfalar RSS'e her worker'da tekrar sayılır; USS
+    worker'ın gerçekten kendine ait belleğidir, PSS paylaşılanı eşit böler.
+    """
+    fields = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        pass
+    uss = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    return {
+        'rss_mb': round(fields.get('Rss', 0) / 1024, 1),
+        'pss_mb': round(fields.get('Pss', 0) / 1024, 1),
+        'uss_mb': round(uss / 1024, 1),
+        'shared_mb': round((fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0)) / 1024, 1),
+    }
+
+
+def usable_cores() -> int:
+    """Sürecin kullanabileceği çekirdek sayısı (CPU affinity ve cgroup kotası dahil)"""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    # cgroup v2: "kota periyot" ya da "max periyot"
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()[:2]
+        if quota != 'max':
+            cores = min(cores, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cores
+
+
+def available_memory_mb() -> float:
+    """Sunucuya ayrılabilecek bellek: cgroup sınırı varsa o, yoksa MemAvailable (Linux, diğerlerinde 0)"""
+    limit = None
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        # cgroup v1'de sınırsız değer çok büyük bir sayıdır
+        if value.isdigit() and int(value) < 1 << 60:
+            limit = int(value) / (1024 * 1024)
+        break
+    available = 0.0
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    available = int(line.split()[1]) / 1024
+                    break
+    except (OSError, ValueError, IndexError):
+        pass
+    if limit is not None:
+        return min(limit, available) if available else limit
+    return available
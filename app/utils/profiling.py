@@ -0,0 +1,246 @@
+import cProfile
+import hashlib
+import hmac
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from .metrics import capture_stages
+
+MODE_CPROFILE = 'cprofile'
+MODE_SAMPLING = 'sampling'
+# Profil dosyası uzantısı: cProfile -> pstats, örnekleme -> katlanmış yığınlar (flamegraph/speedscope)
+PROFILE_EXTENSIONS = {MODE_CPROFILE: '.prof', MODE_SAMPLING: '.folded'}
+PROFILE_ID_PATTERN = re.compile(r'^[0-9]{8}_[0-9]{6}_[0-9a-f]{12}_[0-9a-f]{6}$')
+
+TRIGGER_HEADER = 'X-Profile'
+TOKEN_HEADER = 'X-Admin-Token'
+
+
+def file_hash(filepath: str) -> str:
+    """Belge içeriğinin SHA-256 özeti"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class StackSampler:
+    """Tek thread'in yığınını sabit aralıkla örnekleyen düşük maliyetli profil çıkarıcı
+
+    Hedef thread'e hiç dokunulmaz; ayrı bir thread sys._current_frames() ile yığını
+    okur ve 'modül:fonksiyon;...' biçiminde katlanmış yığın sayar.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class Profiler:
+    """process_document için istek başına profil kaydı
+
+    Yönetici başlığı (X-Profile: 1 ve X-Admin-Token) ya da PROFILING_SAMPLE_RATE
+    oranında rastgele seçilen istekler profillenir. Her kayıt profil dosyası ve
+    belge özeti, aşama süreleri ve sonuç özetini içeren JSON'dan oluşur; en yeni
+    PROFILING_MAX_PROFILES kayıt tutulur. Kapalıyken istek yolunda tek bir
+    bayrak kontrolü kalır.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or {}
+        self.logger = logging.getLogger(__name__)
+        self.enabled = self.config.get('PROFILING_ENABLED', False)
+        self.sample_rate = self.config.get('PROFILING_SAMPLE_RATE', 0.0)
+        self.mode = self.config.get('PROFILING_MODE', MODE_CPROFILE)
+        self.sample_interval = self.config.get('PROFILING_SAMPLE_INTERVAL', 0.005)
+        self.directory = self.config.get('PROFILING_DIR', os.path.join('cache', 'profiles'))
+        self.max_profiles = self.config.get('PROFILING_MAX_PROFILES', 50)
+        self.admin_token = self.config.get('PROFILING_ADMIN_TOKEN')
+        if self.mode not in PROFILE_EXTENSIONS:
+            raise ValueError(f"Unknown profiling mode: {self.mode}")
+
+        # cProfile aynı anda tek profil çıkarabilir; meşgulse istek profilsiz işlenir
+        self._busy = threading.Lock()
+
+    def is_admin(self, headers) -> bool:
+        """Geçerli yönetici belirteci gönderildi mi (belirteç ayarlı değilse hiçbir zaman)"""
+        token = headers.get(TOKEN_HEADER)
+        return bool(self.admin_token and token and hmac.compare_digest(token, self.admin_token))
+
+    def trigger(self, headers) -> Optional[str]:
+        """İstek profillenecekse tetikleyici ('admin' / 'sampled'), değilse None"""
+        if not self.enabled:
+            return None
+        if headers.get(TRIGGER_HEADER) and self.is_admin(headers):
+            return 'admin'
+        if self.sample_rate and random.random() < self.sample_rate:
+            return 'sampled'
+        return None
+
+    def profile(self, trigger: str, filepath: str, func: Callable, *args, **kwargs):
+        """func(*args, **kwargs) sonucunu döndür; profil ve aşama süreleri diske yazılır"""
+        if not self._busy.acquire(blocking=False):
+            self.logger.info(f"Profiler busy, skipping {trigger} profile for {filepath}")
+            return func(*args, **kwargs)
+        try:
+            start = time.perf_counter()
+            with capture_stages() as stages:
+                if self.mode == MODE_CPROFILE:
+                    profiler = cProfile.Profile()
+                    result = profiler.runcall(func, *args, **kwargs)
+                else:
+                    profiler = StackSampler(threading.get_ident(), self.sample_interval)
+                    profiler.start()
+                    try:
+                        result = func(*args, **kwargs)
+                    finally:
+                        profiler.stop()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            try:
+                self._save(profiler, trigger, filepath, elapsed_ms, stages, result)
+            except Exception as e:
+                self.logger.error(f"Failed to save profile for {filepath}: {str(e)}")
+            return result
+        finally:
+            self._busy.release()
+
+    def list_profiles(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """En yeni kayıtların özetleri"""
+        if not os.path.isdir(self.directory):
+            return []
+        names = sorted((name for name in os.listdir(self.directory) if name.endswith('.json')), reverse=True)
+        profiles = []
+        for name in names[:limit]:
+            try:
+                with open(os.path.join(self.directory, name), encoding='utf-8') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            profiles.append({key: meta.get(key) for key in
+                             ('id', 'created', 'trigger', 'mode', 'document_hash', 'filename', 'vendor',
+                              'elapsed_ms', 'success')})
+        return profiles
+
+    def load(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """Kaydın JSON meta verisi ve profil dosyasının yolu"""
+        if not PROFILE_ID_PATTERN.match(profile_id or ''):
+            return None
+        meta_path = os.path.join(self.directory, f'{profile_id}.json')
+        if not os.path.isfile(meta_path):
+            return None
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        meta['path'] = os.path.abspath(os.path.join(self.directory, meta['profile_file']))
+        return meta
+
+    def summary(self, profile_id: str, limit: int = 40) -> Optional[str]:
+        """cProfile kaydının kümülatif süreye göre metin özeti"""
+        meta = self.load(profile_id)
+        if meta is None or meta['mode'] != MODE_CPROFILE:
+            return None
+        stream = io.StringIO()
+        pstats.Stats(meta['path'], stream=stream).sort_stats('cumulative').print_stats(limit)
+        return stream.getvalue()
+
+    def _save(self, profiler, trigger: str, filepath: str, elapsed_ms: float,
+              stages: List[Dict[str, Any]], result: Optional[Dict[str, Any]]):
+        os.makedirs(self.directory, exist_ok=True)
+        document_hash = file_hash(filepath)
+        profile_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{document_hash[:12]}_{os.urandom(3).hex()}"
+        profile_file = profile_id + PROFILE_EXTENSIONS[self.mode]
+        profile_path = os.path.join(self.directory, profile_file)
+
+        if self.mode == MODE_CPROFILE:
+            profiler.dump_stats(profile_path)
+        else:
+            with open(profile_path, 'w', encoding='utf-8') as f:
+                f.write(profiler.folded())
+
+        result = result or {}
+        meta = {
+            'id': profile_id,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'trigger': trigger,
+            'mode': self.mode,
+            'profile_file': profile_file,
+            'document_hash': document_hash,
+            'filename': os.path.basename(filepath),
+            'vendor': (result.get('invoice_data') or {}).get('vendor'),
+            'success': bool(result.get('success')),
+            'tier': result.get('tier'),
+            'elapsed_ms': round(elapsed_ms, 2),
+            'stages': stages,
+            'tier_timings': result.get('tier_timings'),
+        }
+        if self.mode == MODE_SAMPLING:
+            meta['samples'] = profiler.samples
+            meta['sample_interval'] = self.sample_interval
+        with open(os.path.join(self.directory, f'{profile_id}.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False, default=str)
+
+        self.logger.info(f"Saved {trigger} profile {profile_id} for {filepath} ({elapsed_ms:.0f} ms)")
+        self._prune()
+
+    def _prune(self):
+        """En yeni max_profiles kayıt dışındakileri sil"""
+        names = sorted(name for name in os.listdir(self.directory) if name.endswith('.json'))
+        for name in names[:-self.max_profiles] if len(names) > self.max_profiles else []:
+            profile_id = name[:-5]
+            for extension in ('.json',) + tuple(PROFILE_EXTENSIONS.values()):
+                try:
+                    os.remove(os.path.join(self.directory, profile_id + extension))
+                except FileNotFoundError:
+                    pass
+
+
+# Süreç başına tek profil çıkarıcı
+_profiler = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler(config=None) -> Profiler:
+    """Süreç genelindeki profil çıkarıcı"""
+    global _profiler
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                _profiler = Profiler(config)
+    return _profiler
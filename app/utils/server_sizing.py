@@ -0,0 +1,48 @@
+import math
+from typing import Any, Dict
+from .process_stats import available_memory_mb, usable_cores
+
+
+def plan_server(config=None, cores: int = None, memory_mb: float = None) -> Dict[str, Any]:
+    """Çekirdek sayısı ve bellek bütçesinden gunicorn gthread worker / thread sayısı
+
+    Modeller preload_app + ısınma ile master'da bir kez yüklenir
+    (SERVER_SHARED_MEMORY_MB); her worker bunun üstüne kendine ait bellek
+    (SERVER_WORKER_MEMORY_MB, benchmarks/warmup.py'deki USS) ve eşzamanlı
+    istek başına görüntü tamponları (SERVER_THREAD_MEMORY_MB) kullanır.
+    Worker sayısı çekirdek sayısını ve bellek bütçesini aşmaz; thread'ler
+    Tesseract alt süreci beklenirken GIL'i bırakan istekleri örtüştürür.
+    """
+    config = config or {}
+    cores = cores or usable_cores()
+    budget_mb = config.get('SERVER_MEMORY_BUDGET_MB') or memory_mb or available_memory_mb()
+    shared_mb = config.get('SERVER_SHARED_MEMORY_MB', 800)
+    worker_mb = config.get('SERVER_WORKER_MEMORY_MB', 350)
+    thread_mb = config.get('SERVER_THREAD_MEMORY_MB', 80)
+    max_threads = config.get('SERVER_MAX_THREADS', 8)
+    target = max(1, math.ceil(cores * config.get('SERVER_CONCURRENCY_PER_CORE', 2)))
+
+    # Bellek sınırı: shared + workers * (worker + threads * thread) <= bütçe
+    usable_mb = max(budget_mb - shared_mb, 0)
+    workers = config.get('SERVER_WORKERS')
+    limited_by = 'config'
+    if not workers:
+        threads_guess = min(max_threads, math.ceil(target / cores))
+        by_memory = int(usable_mb // (worker_mb + threads_guess * thread_mb))
+        workers = max(1, min(cores, by_memory))
+        limited_by = 'memory' if by_memory < cores else 'cpu'
+
+    threads = config.get('SERVER_THREADS')
+    if not threads:
+        # Bellek yüzünden az worker kaldıysa hedef eşzamanlılık thread'lerle tamamlanır
+        by_memory = int((usable_mb / workers - worker_mb) // thread_mb) if thread_mb else max_threads
+        threads = max(1, min(max_threads, math.ceil(target / workers), by_memory))
+
+    return {
+        'workers': workers,
+        'threads': threads,
+        'cores': cores,
+        'memory_budget_mb': round(budget_mb),
+        'estimated_memory_mb': round(shared_mb + workers * (worker_mb + threads * thread_mb)),
+        'limited_by': limited_by,
+    }
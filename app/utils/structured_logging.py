@@ -0,0 +1,157 @@
+import atexit
+import hashlib
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+
+# LogRecord'un kendi alanları; bunların dışındakiler (extra=...) JSON'a alan olarak girer
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+# configure_logging ile ayarlanır
+_max_chars = 2000
+_debug_sample_rate = 1.0
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+def truncate(value: str, max_chars: int) -> str:
+    """Uzun metni kısalt; kesilen kısmın uzunluğu ve tam metnin özeti eklenir"""
+    if len(value) <= max_chars:
+        return value
+    digest = hashlib.sha1(value.encode('utf-8', 'replace')).hexdigest()[:12]
+    return f"{value[:max_chars]}...[+{len(value) - max_chars} chars, sha1={digest}]"
+
+
+def summarize_payload(payload: Any, max_chars: int = None, depth: int = 3) -> Any:
+    """Log için büyük sonuç yapısının özeti: uzun metinler kısaltılır, derin/uzun yapılar sayılır"""
+    max_chars = max_chars or _max_chars
+    if payload is None or isinstance(payload, (bool, int, float)):
+        return payload
+    if isinstance(payload, str):
+        return truncate(payload, max_chars)
+    if depth <= 0:
+        return f'<{type(payload).__name__}>'
+    if isinstance(payload, dict):
+        return {str(key): summarize_payload(value, max_chars, depth - 1) for key, value in payload.items()}
+    if isinstance(payload, (list, tuple)):
+        items = [summarize_payload(value, max_chars, depth - 1) for value in payload[:20]]
+        if len(payload) > 20:
+            items.append(f'...[+{len(payload) - 20} items]')
+        return items
+    return f'<{type(payload).__name__}>'
+
+
+def log_dump(logger: logging.Logger, payload: Any, msg: str, *args):
+    """Büyük yükü DEBUG seviyesinde örnekleyerek logla; atlanan çağrıda yük hiç işlenmez"""
+    if not logger.isEnabledFor(logging.DEBUG) or random.random() >= _debug_sample_rate:
+        return
+    logger.debug(msg, *args, extra={'payload': summarize_payload(payload)})
+
+
+class JsonFormatter(logging.Formatter):
+    """Tek satır JSON: zaman, seviye, logger, mesaj ve extra alanları"""
+
+    def __init__(self, max_chars: int = 2000):
+        super().__init__()
+        self.max_chars = max_chars
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': truncate(record.getMessage(), self.max_chars),
+            'pid': record.process,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = truncate(self.formatException(record.exc_info), self.max_chars * 4)
+        elif record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TruncatingQueueHandler(QueueHandler):
+    """İstek thread'inde sadece mesaj birleştirilip kuyruğa atılır; JSON ve yazma dinleyici thread'inde"""
+
+    def __init__(self, log_queue, max_chars: int = 2000):
+        super().__init__(log_queue)
+        self.max_chars = max_chars
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)
+        if len(record.msg) > self.max_chars:
+            record.msg = record.message = truncate(record.msg, self.max_chars)
+        return record
+
+
+def _start_listener(target: logging.Handler):
+    global _listener
+    _queue_handler.queue = queue.SimpleQueue()
+    _listener = QueueListener(_queue_handler.queue, target, respect_handler_level=True)
+    _listener.start()
+
+
+def _restart_after_fork():
+    # gunicorn preload_app: dinleyici thread'i fork'ta kopyalanmaz, kuyruk kilidi yarıda kalmış olabilir
+    if _listener is not None:
+        _start_listener(_listener.handlers[0])
+
+
+def shutdown_logging():
+    """Kuyrukta kalan kayıtları yaz ve dinleyiciyi durdur"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def configure_logging(app) -> Optional[QueueListener]:
+    """'app' logger'ına (app.logger ve app.* modülleri) kuyruklu JSON log kur
+
+    Kayıtlar istek thread'inde bir kuyruğa atılır; biçimlendirme ve yazma ayrı bir
+    dinleyici thread'inde yapılır. LOG_JSON kapalıysa Flask'ın varsayılanı kalır.
+    """
+    global _max_chars, _debug_sample_rate, _queue_handler
+    config = app.config
+    if not config.get('LOG_JSON', True):
+        return None
+
+    _max_chars = config.get('LOG_MAX_FIELD_CHARS', 2000)
+    _debug_sample_rate = config.get('LOG_DEBUG_SAMPLE_RATE', 1.0)
+
+    log_file = config.get('LOG_FILE')
+    if log_file:
+        os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+        target = logging.FileHandler(log_file, encoding='utf-8')
+    else:
+        target = logging.StreamHandler(sys.stderr)
+    target.setFormatter(JsonFormatter(_max_chars))
+
+    from flask.logging import default_handler
+    logger = logging.getLogger('app')
+    logger.removeHandler(default_handler)
+    # create_app birden çok kez çağrılırsa önceki kurulum değiştirilir
+    if _queue_handler is not None:
+        logger.removeHandler(_queue_handler)
+        shutdown_logging()
+    else:
+        atexit.register(shutdown_logging)
+        # Windows'ta fork yok
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=_restart_after_fork)
+
+    _queue_handler = TruncatingQueueHandler(queue.SimpleQueue(), _max_chars)
+    logger.addHandler(_queue_handler)
+    logger.setLevel(config.get('LOG_LEVEL', 'INFO'))
+    logger.propagate = False
+    _start_listener(target)
+    return _listener
@@ -1,10 +1,17 @@
-from flask import Blueprint, render_template, request, jsonify, current_app, url_for
+from flask import Blueprint, Response, abort, render_template, request, jsonify, current_app, send_file, url_for
 from werkzeug.utils import secure_filename
 import os
-from app.core.document_processor import DocumentProcessor
+from app.core.vendor_resolver import get_resolver
+from app.core.normalizer import get_normalizer
+from app.core.warmup import readiness
 from app.utils.file_helpers import allowed_file
+from app.utils.metrics import document_type, document_type_label, get_metrics
+from app.utils.process_stats import memory_mb
+from app.utils.profiling import get_profiler
+from app.utils.structured_logging import log_dump
 import logging
-from app.models.invoice import Invoice
+import threading
+from app.models.invoice import Invoice, InvoiceLineItem
 from app import db
 from datetime import datetime
 
@@ -16,6 +23,56 @@ web_bp = Blueprint('web', __name__,
 
 logger = logging.getLogger(__name__)
 
+metrics = get_metrics()
+# Worker'da aynı anda işlenen yüklemeler - kuyruk derinliğinin worker içi karşılığı
+uploads_in_flight = metrics.gauge('invoice_uploads_in_flight', 'Uploads currently being processed by this worker')
+
+def _process_metrics():
+    memory = memory_mb()
+    yield ('invoice_process_memory_bytes', 'gauge', 'Worker memory; uss is private, rss includes shared pages',
+           [({'kind': kind}, memory[f'{kind}_mb'] * 1024 * 1024) for kind in ('rss', 'pss', 'uss')])
+    warmup = readiness()
+    yield ('invoice_warmup_seconds', 'gauge', 'Duration of the pre-fork warm-up',
+           [({'status': warmup['status']}, (warmup['elapsed_ms'] or 0) / 1000)])
+
+metrics.register_collector(_process_metrics)
+
+# İşlemci worker başına bir kez oluşturulur, önbellekleri istekler arasında paylaşılır
+_processor = None
+_processor_lock = threading.Lock()
+
+def get_processor():
+    """Paylaşılan DocumentProcessor örneğini döndür"""
+    global _processor
+    if _processor is None:
+        with _processor_lock:
+            if _processor is None:
+                # OCR/NER kütüphaneleri ilk belgede yüklenir; CLI ve /ready bunları hiç yüklemez
+                from app.core.document_processor import DocumentProcessor
+                _processor = DocumentProcessor(current_app.config)
+                metrics.register_collector(_processor.collect_metrics)
+    return _processor
+
+def get_vendor_resolver():
+    """Veritabanındaki satıcı adlarıyla bir kez doldurulan paylaşılan çözümleyici"""
+    resolver = get_resolver(current_app.config, loader=_known_vendors)
+    metrics.register_collector(_resolver_metrics)
+    return resolver
+
+def _resolver_metrics():
+    stats = get_resolver().stats()
+    yield ('invoice_vendor_resolver_lookups_total', 'counter', 'Vendor name lookups by match type',
+           [({'match': 'exact'}, stats['exact_hits']), ({'match': 'fuzzy'}, stats['fuzzy_hits']),
+            ({'match': 'none'}, stats['lookups'] - stats['exact_hits'] - stats['fuzzy_hits'])])
+    yield ('invoice_vendor_resolver_vendors', 'gauge', 'Canonical vendors known to the resolver',
+           [({}, stats['vendors'])])
+
+def _known_vendors():
+    """Kayıtlı satıcı yazımları ve fatura sayıları"""
+    return db.session.query(Invoice.vendor, db.func.count(Invoice.id)) \
+        .filter(Invoice.vendor.isnot(None), Invoice.vendor != '') \
+        .group_by(Invoice.vendor).all()
+
 # Ana sayfa
 @web_bp.route('/')
 @web_bp.route('/index')
@@ -40,6 +97,19 @@ def index():
 # Fatura yükleme
 @web_bp.route('/upload', methods=['POST'])
 def upload_file():
+    file = request.files.get('file')
+    label = document_type_label(file.filename if file else None, current_app.config['ALLOWED_EXTENSIONS'])
+    uploads_in_flight.inc()
+    try:
+        with document_type(label), metrics.span('upload') as stage:
+            response = _upload_file()
+            if not (response.get_json(silent=True) or {}).get('success'):
+                stage.fail()
+            return response
+    finally:
+        uploads_in_flight.dec()
+
+def _upload_file():
     try:
         if 'file' not in request.files:
             return jsonify({'success': False, 'error': 'No file part'})
@@ -60,13 +130,35 @@ def upload_file():
             file_path = os.path.join(upload_dir, filename)
             
             try:
-                file.save(file_path)
-                processor = DocumentProcessor(current_app.config)
-                result = processor.process_document(file_path)
+                with metrics.span('upload.save'):
+                    file.save(file_path)
+                processor = get_processor()
+                vendor_hint = request.form.get('vendor')
+                # Yönetici başlığıyla ya da örneklemeyle seçilen istekler profillenir
+                profiler = get_profiler(current_app.config)
+                trigger = profiler.trigger(request.headers)
+                with metrics.span('upload.process') as stage:
+                    if trigger:
+                        result = profiler.profile(trigger, file_path, processor.process_document,
+                                                  file_path, vendor_hint=vendor_hint)
+                    else:
+                        result = processor.process_document(file_path, vendor_hint=vendor_hint)
+                    if not result or not result.get('success'):
+                        stage.fail()
                 
-                # OCR sonuçlarını logla
-                current_app.logger.info(f"OCR Result: {result}")
+                # Tam sonuç sadece örneklenmiş DEBUG kaydında (metin ve bloklar kısaltılır)
+                log_dump(current_app.logger, result, "Upload result for %s", filename)
                 
+                # Kalite kontrolünden dönen belge kaydedilmez
+                if result and result.get('quality') and result['quality']['decision'] == 'reject':
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
+                    return jsonify({
+                        'success': False,
+                        'error': result.get('error'),
+                        'quality': result['quality']
+                    })
+
                 if not result or not result.get('invoice_data'):
                     return jsonify({'success': False, 'error': 'OCR processing failed'})
 
@@ -78,29 +170,12 @@ def upload_file():
                         return default
                     return str(value).strip()
 
-                # Güvenli bir şekilde float değerlerini al
-                def safe_float(value, default=0.0):
-                    try:
-                        if value is None:
-                            return default
-                        if isinstance(value, str):
-                            value = value.replace(',', '.').replace('€', '').replace('RM', '').strip()
-                        return float(value)
-                    except (ValueError, TypeError):
-                        return default
+                # Tutar ve tarihler tek normalleştiriciden ('1.234,56', '1,234.56', '25/12/2023')
+                normalizer = get_normalizer(current_app.config)
+                safe_float = normalizer.parse_float
 
                 # OCR sonuçlarından tarihi parse et
-                date_str = invoice_data.get('date')
-                if date_str:
-                    try:
-                        date = datetime.strptime(date_str, '%Y-%m-%d')
-                    except ValueError:
-                        try:
-                            date = datetime.strptime(date_str, '%d/%m/%Y')
-                        except ValueError:
-                            date = datetime.now()
-                else:
-                    date = datetime.now()
+                date = normalizer.parse_date(invoice_data.get('date')) or datetime.now()
 
                 # Faturayı veritabanına kaydet
                 invoice = Invoice(
@@ -124,8 +199,22 @@ def upload_file():
                             invoice.vendor = line.strip()
                             break
 
-                db.session.add(invoice)
-                db.session.commit()
+                # OCR ile bozulmuş satıcı adını bilinen kanonik ada eşle
+                if invoice.vendor and current_app.config.get('VENDOR_RESOLVER_ENABLED', True):
+                    with metrics.span('upload.vendor_resolve'):
+                        resolution = get_vendor_resolver().resolve(invoice.vendor)
+                    if resolution['vendor'] != invoice.vendor:
+                        current_app.logger.info("Resolved vendor '%s' -> '%s' (distance=%s, %s ms)",
+                                                invoice.vendor, resolution['vendor'], resolution['distance'],
+                                                resolution['elapsed_ms'])
+                    invoice.vendor = resolution['vendor']
+
+                with metrics.span('upload.db_write'):
+                    db.session.add(invoice)
+                    # Kalemler fatura ile aynı işlemde, tek toplu INSERT ile yazılır
+                    db.session.flush()
+                    line_count = InvoiceLineItem.bulk_insert(invoice.id, result.get('products') or [])
+                    db.session.commit()
 
                 # Dosya URL'sini oluştur
                 file_url = url_for('static', filename=f'uploads/permanent/{filename}')
@@ -136,6 +225,7 @@ def upload_file():
                     'filename': filename,
                     'file_url': file_url,
                     'text': result.get('text', ''),
+                    'line_items': line_count,
                     'invoice_data': {
                         'date': invoice.date.strftime('%d/%m/%Y'),
                         'vendor': invoice.vendor,
@@ -161,6 +251,55 @@ def upload_file():
         current_app.logger.error(f"Upload error: {str(e)}")
         return jsonify({'success': False, 'error': str(e)})
 
+@web_bp.route('/metrics')
+def metrics_endpoint():
+    """Prometheus metin biçiminde aşama süreleri ve önbellek sayaçları (bu worker için)"""
+    if not current_app.config.get('METRICS_ENABLED', True):
+        abort(404)
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+@web_bp.route('/ready')
+def ready():
+    """Hazırlık sondası: ısınma bitene kadar 503; bu worker'ın bellek kullanımını da döndürür"""
+    state = readiness()
+    if current_app.config.get('WARMUP_ENABLED', False):
+        is_ready = state['status'] == 'ready'
+    else:
+        is_ready = state['status'] != 'warming'
+    state.update(ready=is_ready, worker_pid=os.getpid(), memory=memory_mb())
+    return jsonify(state), 200 if is_ready else 503
+
+def _require_profiler_admin():
+    """Profil uç noktaları sadece profil açıkken ve geçerli yönetici belirteciyle"""
+    profiler = get_profiler(current_app.config)
+    if not profiler.enabled:
+        abort(404)
+    if not profiler.is_admin(request.headers):
+        abort(403)
+    return profiler
+
+@web_bp.route('/admin/profiles')
+def list_profiles():
+    profiler = _require_profiler_admin()
+    return jsonify({'profiles': profiler.list_profiles(request.args.get('limit', 50, type=int))})
+
+@web_bp.route('/admin/profiles/<profile_id>')
+def download_profile(profile_id):
+    """Profil dosyası; ?format=json meta veri ve aşama süreleri, ?format=text pstats özeti"""
+    profiler = _require_profiler_admin()
+    meta = profiler.load(profile_id)
+    if meta is None:
+        abort(404)
+    output = request.args.get('format')
+    if output == 'json':
+        return jsonify({key: value for key, value in meta.items() if key != 'path'})
+    if output == 'text':
+        summary = profiler.summary(profile_id)
+        if summary is None:
+            abort(404)
+        return Response(summary, mimetype='text/plain')
+    return send_file(meta['path'], as_attachment=True, download_name=meta['profile_file'])
+
 @web_bp.route('/reset-db')
 def reset_db():
     try:
@@ -182,7 +321,8 @@ def delete_invoice(invoice_id):
         if os.path.exists(file_path):
             os.remove(file_path)
         
-        # Veritabanından sil
+        # Veritabanından sil - kalemler tek DELETE ile
+        InvoiceLineItem.delete_for(invoice.id)
         db.session.delete(invoice)
         db.session.commit()
         
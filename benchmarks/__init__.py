@@ -0,0 +1 @@
+# Performans ölçüm betikleri - depo kökünden `python -m benchmarks.<modül>` ile çalıştırılır
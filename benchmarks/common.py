@@ -0,0 +1,94 @@
+import json
+import os
+import statistics
+import time
+from typing import Callable, Dict, Iterable, List
+from app.utils.process_stats import rss_mb, peak_rss_mb  # noqa: F401 - betikler için yeniden dışa aktarılır
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp')
+
+
+def iter_images(folder: str) -> List[str]:
+    """Klasördeki görüntü dosyalarını sıralı döndür"""
+    return sorted(
+        os.path.join(folder, name) for name in os.listdir(folder)
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Basit en yakın sıra yüzdeliği"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    """Milisaniye örneklerinden özet istatistik"""
+    if not samples_ms:
+        return {'count': 0}
+    return {
+        'count': len(samples_ms),
+        'mean_ms': round(statistics.fmean(samples_ms), 3),
+        'p50_ms': round(percentile(samples_ms, 50), 3),
+        'p95_ms': round(percentile(samples_ms, 95), 3),
+        'p99_ms': round(percentile(samples_ms, 99), 3),
+        'min_ms': round(min(samples_ms), 3),
+        'max_ms': round(max(samples_ms), 3),
+    }
+
+
+def time_calls(func: Callable, items: Iterable, repeat: int = 1) -> List[float]:
+    """Her öğe için fonksiyon süresini milisaniye olarak ölç"""
+    samples = []
+    for _ in range(repeat):
+        for item in items:
+            start = time.perf_counter()
+            func(item)
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def save_json(path: str, data) -> None:
+    """Sonuçları karşılaştırma için JSON olarak yaz"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def print_table(rows: List[Dict], columns: List[str]) -> None:
+    """Sonuçları hizalı tablo olarak yazdır"""
+    widths = {col: max(len(col), *(len(str(row.get(col, ''))) for row in rows)) for col in columns}
+    print('  '.join(col.ljust(widths[col]) for col in columns))
+    for row in rows:
+        print('  '.join(str(row.get(col, '')).ljust(widths[col]) for col in columns))
+
+
+def compare_to_baseline(current: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float = 0.2,
+                        min_delta_ms: float = 0.5, metric: str = 'p50_ms') -> List[Dict]:
+    """Aşama özetlerini önceki çalıştırmayla karşılaştır
+
+    Bir aşama, metriği threshold oranından fazla ve en az min_delta_ms kadar
+    kötüleşmişse gerilemiş sayılır (çok kısa aşamalardaki ölçüm gürültüsü için).
+    """
+    rows = []
+    for stage, summary in current.items():
+        before = (baseline.get(stage) or {}).get(metric)
+        after = summary.get(metric)
+        if before is None or after is None:
+            rows.append({'stage': stage, 'baseline': before, 'current': after, 'change_pct': None,
+                         'regressed': False})
+            continue
+        change = (after - before) / before if before else 0.0
+        rows.append({
+            'stage': stage,
+            'baseline': before,
+            'current': after,
+            'change_pct': round(change * 100, 1),
+            'regressed': change > threshold and after - before >= min_delta_ms,
+        })
+    return rows
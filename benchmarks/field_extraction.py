@@ -0,0 +1,104 @@
+"""Başlık tabanlı alan çıkarma mikro ölçümü.
+
+Eski yaklaşım (alan başına metni yeniden bölüp satır x başlık taraması) ile
+OCRProcessor'daki tek geçişli birleşik regex eşleyici uzun, çok sayfalı OCR
+metni üzerinde karşılaştırılır.
+
+Kullanım:
+    python -m benchmarks.field_extraction --pages 1 10 50
+"""
+import argparse
+import random
+import re
+import time
+from app.core.ocr_processor import OCRProcessor
+from benchmarks.common import save_json, print_table
+
+LINE_TEMPLATES = [
+    '{code} {desc} {qty} {price}',
+    'SR: {desc}',
+    'Page {page} continued',
+    'Tel: 03-{code} Fax: 03-{code}',
+    '{desc} {desc}',
+]
+WORDS = ['widget', 'bolt', 'pipe', 'valve', 'cable', 'service', 'labour', 'fitting']
+
+
+def synthetic_text(pages, lines_per_page=60, seed=7):
+    """Çok sayfalı, başlıkları sayfa sonlarına dağılmış OCR benzeri metin"""
+    rng = random.Random(seed)
+    lines = ['ACME TRADING LTD', 'Invoice No: INV-{}'.format(rng.randint(1000, 9999))]
+    for page in range(pages):
+        for _ in range(lines_per_page):
+            lines.append(rng.choice(LINE_TEMPLATES).format(
+                code=rng.randint(1000, 9999), desc=rng.choice(WORDS), qty=rng.randint(1, 20),
+                price='{:.2f}'.format(rng.uniform(1, 500)), page=page + 1))
+    lines += ['Date: 12/03/2024', 'Tax: 18.00', 'Grand Total: 1234.50 USD']
+    return '\n'.join(lines)
+
+
+def legacy_extract(processor, text):
+    """Önceki sürümün alan başına tekrarlanan taraması"""
+    def find_value_after_header(headers):
+        lines = text.lower().split('\n')
+        for i, line in enumerate(lines):
+            for header in headers:
+                if header in line:
+                    value = line.split(header)[-1].strip()
+                    if value:
+                        return value
+                    if i + 1 < len(lines):
+                        return lines[i + 1].strip()
+        return ''
+
+    values = {field: find_value_after_header(headers) for field, headers in processor.field_headers.items()}
+    lines = text.split('\n')
+    for line in lines:
+        if re.search(r'\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b', line):
+            break
+    for line in lines:
+        if re.match(r'.*NO.*/.+', line, re.IGNORECASE):
+            break
+    return values
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Header/keyword field extraction micro-benchmark')
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', help='Write results as JSON')
+    args = parser.parse_args()
+
+    processor = OCRProcessor()
+    rows = []
+    for pages in args.pages:
+        text = synthetic_text(pages)
+        text_blocks = {'header': '\n'.join(text.split('\n')[:10])}
+        legacy_ms = best_of(lambda: legacy_extract(processor, text), args.repeat)
+        matcher_ms = best_of(lambda: processor._find_header_values(text), args.repeat)
+        full_ms = best_of(lambda: processor._extract_invoice_data(text, text_blocks), args.repeat)
+        rows.append({
+            'pages': pages,
+            'lines': text.count('\n') + 1,
+            'legacy_ms': round(legacy_ms, 3),
+            'single_pass_ms': round(matcher_ms, 3),
+            'extract_invoice_data_ms': round(full_ms, 3),
+            'speedup': round(legacy_ms / matcher_ms, 1) if matcher_ms else None
+        })
+
+    print_table(rows, ['pages', 'lines', 'legacy_ms', 'single_pass_ms', 'extract_invoice_data_ms', 'speedup'])
+    if args.output:
+        save_json(args.output, {'results': rows})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Fatura kalemlerinin kaydı: satır başına ORM add ve tek toplu INSERT.
+
+Geçici bir SQLite veritabanında her yöntem için süreyi ve veritabanına giden
+ifade (round trip) sayısını, ardından yield_per ile akış okumasının bellek
+kullanımını raporlar.
+
+Kullanım:
+    python -m benchmarks.line_items_persist --lines 500 --invoices 20
+    python -m benchmarks.line_items_persist --database postgresql://localhost/bench
+"""
+import argparse
+import random
+import time
+from decimal import Decimal
+from flask import Flask
+from sqlalchemy import event
+from app import db
+from app.core.product_extractor import ProductItem
+from app.models.invoice import Invoice, InvoiceLineItem
+from benchmarks.common import rss_mb, summarize, save_json, print_table
+
+
+def synthetic_items(count, rng):
+    items = []
+    for i in range(count):
+        quantity = rng.randint(1, 50)
+        unit_price = Decimal(rng.randint(10, 50000)) / 100
+        items.append(ProductItem(code=f'SKU-{rng.randint(1, 5000):05d}', description=f'Item {i}',
+                                 quantity=float(quantity), unit_price=unit_price,
+                                 total=unit_price * quantity, unit='piece'))
+    return items
+
+
+def persist_orm(invoice_id, items):
+    """Eski yol: satır başına bir ORM nesnesi"""
+    for row in InvoiceLineItem.rows_for(invoice_id, items):
+        db.session.add(InvoiceLineItem(**row))
+
+
+def measure(name, persist, invoices, items, statements):
+    samples, counts = [], []
+    for _ in range(invoices):
+        invoice = Invoice(vendor='BENCH', amount=0)
+        db.session.add(invoice)
+        db.session.flush()
+        statements.clear()
+        start = time.perf_counter()
+        persist(invoice.id, items)
+        db.session.commit()
+        samples.append((time.perf_counter() - start) * 1000)
+        # COMMIT hariç, kalemler için giden ifadeler
+        counts.append(len(statements))
+    return {'method': name, 'lines': len(items), 'statements': max(counts), **summarize(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Line item persistence: per-row ORM vs bulk insert')
+    parser.add_argument('--lines', type=int, default=500, help='Line items per invoice')
+    parser.add_argument('--invoices', type=int, default=20, help='Invoices per method')
+    parser.add_argument('--database', default='sqlite://', help='SQLAlchemy URL (default: in-memory SQLite)')
+    parser.add_argument('--batch-size', type=int, default=1000, help='yield_per batch size for the streaming read')
+    parser.add_argument('--output', help='Write results as JSON')
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = args.database
+    db.init_app(app)
+    rng = random.Random(7)
+    items = synthetic_items(args.lines, rng)
+
+    with app.app_context():
+        db.create_all()
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *rest: statements.append(statement))
+
+        rows = [measure('orm_add', persist_orm, args.invoices, items, statements),
+                measure('bulk_insert', InvoiceLineItem.bulk_insert, args.invoices, items, statements)]
+        print_table(rows, ['method', 'lines', 'statements', 'mean_ms', 'p50_ms', 'p95_ms'])
+
+        # Akış okuması: tüm satırlar belleğe alınmadan toplanır
+        before = rss_mb()
+        start = time.perf_counter()
+        spend, streamed = Decimal('0'), 0
+        for line_item, vendor, date in InvoiceLineItem.stream(batch_size=args.batch_size):
+            spend += line_item.total or 0
+            streamed += 1
+        stream = {'rows': streamed, 'spend': float(spend),
+                  'elapsed_ms': round((time.perf_counter() - start) * 1000, 1),
+                  'rss_delta_mb': round(rss_mb() - before, 1)}
+        print(f"stream: {stream}")
+
+        db.drop_all()
+
+    if args.output:
+        save_json(args.output, {'results': rows, 'stream': stream})
+
+
+if __name__ == '__main__':
+    main()
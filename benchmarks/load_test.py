@@ -0,0 +1,329 @@
+"""Yükleme uç noktası için yerel yük testi.
+
+/upload (veya --path ile verilen başka bir multipart uç noktası) sabit eşzamanlılıkla
+(kapalı döngü) ya da sabit geliş hızıyla (açık döngü, Poisson) çalıştırılır.
+Verim, p50/p95/p99 gecikme, hata oranı ve sunucu worker'larının CPU/RSS değerleri
+raporlanır. --sweep-workers/--sweep-threads verilirse her kombinasyon için gunicorn
+(gthread) başlatılır ve doyum noktası aranır.
+
+Açık döngüde gecikme planlanan gönderim anından ölçülür; sunucu geride kaldığında
+kuyrukta bekleme de gecikmeye dahildir.
+
+Uyarı: her istek gerçek bir fatura kaydı ve yüklenen dosya oluşturur; sadece yerel
+geliştirme sunucusuna karşı çalıştırın.
+
+Kullanım:
+    python -m benchmarks.load_test --url http://127.0.0.1:5000 --concurrency 8 --duration 60
+    python -m benchmarks.load_test --url http://127.0.0.1:5000 --rate 2 --duration 120 --server-pid 4242
+    python -m benchmarks.load_test --sweep-workers 1 2 4 --sweep-threads 1 2 4 --duration 45
+"""
+import argparse
+import http.client
+import io
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from app.utils.process_stats import child_pids, cpu_seconds, rss_mb
+from benchmarks.common import iter_images, percentile, print_table, save_json
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def multipart_body(filename: str, content: bytes, fields: Dict[str, str] = None) -> Tuple[bytes, str]:
+    """multipart/form-data gövdesi ve Content-Type başlığı"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in (fields or {}).items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+                 f'Content-Type: application/octet-stream\r\n\r\n'.encode())
+    parts.append(content)
+    parts.append(f'\r\n--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def load_payloads(folder: Optional[str], count: int, line_items: int, seed: int) -> List[Tuple[bytes, str]]:
+    """Örnek klasöründen ya da sentetik faturalardan hazır istek gövdeleri"""
+    payloads = []
+    if folder:
+        for path in iter_images(folder)[:count]:
+            with open(path, 'rb') as f:
+                payloads.append(multipart_body(os.path.basename(path), f.read()))
+    else:
+        from PIL import Image
+        from benchmarks.synthetic_invoices import InvoiceSpec, generate
+        spec = InvoiceSpec(line_items=line_items, noise=0.02, skew=0.5)
+        for index, invoice in enumerate(generate(count, spec, seed)):
+            buffer = io.BytesIO()
+            Image.fromarray(invoice.image[:, :, 0]).save(buffer, format='PNG')
+            payloads.append(multipart_body(f'loadtest_{index:04d}.png', buffer.getvalue()))
+    if not payloads:
+        raise SystemExit('No payloads: empty sample folder')
+    return payloads
+
+
+class Client:
+    """Thread başına kalıcı (keep-alive) bağlantı"""
+
+    def __init__(self, url: str, path: str, timeout: float):
+        parsed = urlparse(url)
+        self.host, self.port = parsed.hostname, parsed.port or 80
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def post(self, body: bytes, content_type: str) -> Tuple[bool, int, str]:
+        """(başarılı mı, HTTP durumu, hata)"""
+        for attempt in range(2):
+            connection = getattr(self._local, 'connection', None)
+            if connection is None:
+                connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+                self._local.connection = connection
+            try:
+                connection.request('POST', self.path, body=body, headers={'Content-Type': content_type})
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError) as e:
+                connection.close()
+                self._local.connection = None
+                # Sunucunun kapattığı boşta bağlantı bir kez yeniden denenir
+                if attempt == 0 and isinstance(e, (http.client.RemoteDisconnected, ConnectionResetError,
+                                                   BrokenPipeError)):
+                    continue
+                return False, 0, type(e).__name__
+            if response.status != 200:
+                return False, response.status, f'HTTP {response.status}'
+            try:
+                ok = bool(json.loads(data).get('success'))
+            except ValueError:
+                return False, response.status, 'invalid JSON'
+            return ok, response.status, '' if ok else 'success=false'
+        return False, 0, 'retry failed'
+
+
+class WorkerMonitor:
+    """Sunucu süreçlerinin (master + worker'lar) CPU ve RSS örneklemesi"""
+
+    def __init__(self, server_pid: Optional[int], interval: float = 1.0):
+        self.server_pid = server_pid
+        self.interval = interval
+        self.peak_rss: Dict[int, float] = {}
+        self._cpu_start: Dict[int, float] = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def pids(self) -> List[int]:
+        if not self.server_pid:
+            return []
+        # gunicorn: istekleri worker'lar karşılar; tek süreçli sunucuda master'ın kendisi
+        return child_pids(self.server_pid) or [self.server_pid]
+
+    def start(self):
+        if not self.server_pid:
+            return
+        self._started = time.perf_counter()
+        self._cpu_start = {pid: cpu_seconds(pid) for pid in self.pids()}
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            for pid in self.pids():
+                self.peak_rss[pid] = max(self.peak_rss.get(pid, 0.0), rss_mb(pid))
+
+    def stop(self) -> List[Dict[str, Any]]:
+        if not self._thread:
+            return []
+        self._stop.set()
+        self._thread.join()
+        wall = time.perf_counter() - self._started
+        rows = []
+        for pid in self.pids():
+            cpu = cpu_seconds(pid) - self._cpu_start.get(pid, 0.0)
+            rows.append({'pid': pid, 'cpu_pct': round(100.0 * cpu / wall, 1) if wall else 0.0,
+                         'rss_mb': round(rss_mb(pid), 1), 'peak_rss_mb': round(self.peak_rss.get(pid, 0.0), 1)})
+        return rows
+
+
+def run_load(client: Client, payloads: List[Tuple[bytes, str]], concurrency: int, duration: float,
+             rate: Optional[float], requests: Optional[int], seed: int) -> Dict[str, Any]:
+    """Kapalı döngü (rate yok) ya da açık döngü (rate istek/sn) yük"""
+    latencies, errors = [], {}
+    lock = threading.Lock()
+    payload_cycle = itertools.cycle(payloads)
+
+    def send(scheduled: float, body: bytes, content_type: str):
+        ok, _, error = client.post(body, content_type)
+        elapsed = (time.perf_counter() - scheduled) * 1000
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors[error] = errors.get(error, 0) + 1
+
+    start = time.perf_counter()
+    deadline = start + duration
+    sent = 0
+    if rate:
+        rng = random.Random(seed)
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            scheduled = start
+            while scheduled < deadline and (requests is None or sent < requests):
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(send, scheduled, *next(payload_cycle))
+                sent += 1
+                scheduled += rng.expovariate(rate)
+    else:
+        counter = itertools.count()
+
+        def loop():
+            while time.perf_counter() < deadline:
+                if requests is not None and next(counter) >= requests:
+                    return
+                with lock:
+                    body, content_type = next(payload_cycle)
+                send(time.perf_counter(), body, content_type)
+
+        threads = [threading.Thread(target=loop) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - start
+
+    completed = len(latencies)
+    failed = sum(errors.values())
+    total = completed + failed
+    return {
+        'mode': f'open@{rate}/s' if rate else 'closed',
+        'concurrency': concurrency,
+        'requests': total,
+        'elapsed_s': round(elapsed, 1),
+        'throughput_rps': round(completed / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p95_ms': round(percentile(latencies, 95), 1),
+        'p99_ms': round(percentile(latencies, 99), 1),
+        'error_pct': round(100.0 * failed / total, 2) if total else 0.0,
+        'errors': errors,
+    }
+
+
+def wait_for_server(host: str, port: int, timeout: float = 120.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.5)
+    return False
+
+
+def start_gunicorn(app: str, port: int, workers: int, threads: int, timeout: int, worker_class: str = 'gthread',
+                   preload: bool = False) -> subprocess.Popen:
+    command = [sys.executable, '-m', 'gunicorn', app, '--bind', f'127.0.0.1:{port}',
+               '--workers', str(workers), '--threads', str(threads), '--worker-class', worker_class,
+               '--timeout', str(timeout), '--log-level', 'warning']
+    if preload:
+        command.append('--preload')
+    return subprocess.Popen(command, cwd=REPO_ROOT)
+
+
+def find_saturation(rows: List[Dict[str, Any]], min_gain: float = 0.05) -> Optional[Dict[str, Any]]:
+    """Daha fazla worker x thread'in verimi min_gain oranından az artırdığı ilk nokta"""
+    ordered = sorted((row for row in rows if row['requests']),
+                     key=lambda row: (row['workers'] * row['threads'], row['workers']))
+    best = None
+    for row in ordered:
+        if best is None or row['throughput_rps'] > best['throughput_rps'] * (1 + min_gain):
+            best = row
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the invoice upload endpoint')
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help='Running server (ignored when sweeping)')
+    parser.add_argument('--path', default='/upload', help='Multipart endpoint (form field "file")')
+    parser.add_argument('--concurrency', type=int, help='Client threads (default: 2 x workers x threads, or 4)')
+    parser.add_argument('--rate', type=float, help='Open-loop arrival rate in requests/s (Poisson)')
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds per run')
+    parser.add_argument('--requests', type=int, help='Stop after this many requests')
+    parser.add_argument('--warmup', type=int, default=2, help='Unmeasured requests before each run')
+    parser.add_argument('--images', help='Folder of sample invoices (default: synthetic)')
+    parser.add_argument('--payloads', type=int, default=8, help='Distinct invoices to cycle through')
+    parser.add_argument('--line-items', type=int, default=15)
+    parser.add_argument('--timeout', type=float, default=180.0, help='Per-request timeout (s)')
+    parser.add_argument('--server-pid', type=int, help='PID of the running server for CPU/RSS (gunicorn master)')
+    parser.add_argument('--sweep-workers', type=int, nargs='+', help='gunicorn worker counts to sweep')
+    parser.add_argument('--sweep-threads', type=int, nargs='+', default=[1], help='gthread threads per worker')
+    parser.add_argument('--app', default='main:app', help='WSGI app for sweeps')
+    parser.add_argument('--port', type=int, default=5055, help='Port for sweep servers')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help='Write results as JSON')
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.images, args.payloads, args.line_items, args.seed)
+    columns = ['mode', 'concurrency', 'requests', 'throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms', 'error_pct']
+    results = []
+
+    def measure(url: str, server_pid: Optional[int], concurrency: int) -> Dict[str, Any]:
+        client = Client(url, args.path, args.timeout)
+        for body, content_type in payloads[:args.warmup]:
+            client.post(body, content_type)
+        monitor = WorkerMonitor(server_pid)
+        monitor.start()
+        result = run_load(client, payloads, concurrency, args.duration, args.rate, args.requests, args.seed)
+        result['workers_stats'] = monitor.stop()
+        return result
+
+    if args.sweep_workers:
+        for workers, threads in itertools.product(args.sweep_workers, args.sweep_threads):
+            server = start_gunicorn(args.app, args.port, workers, threads, int(args.timeout))
+            try:
+                if not wait_for_server('127.0.0.1', args.port):
+                    print(f"gunicorn {workers}x{threads} did not start")
+                    continue
+                concurrency = args.concurrency or 2 * workers * threads
+                result = measure(f'http://127.0.0.1:{args.port}', server.pid, concurrency)
+            finally:
+                server.terminate()
+                server.wait(timeout=60)
+            result.update({'workers': workers, 'threads': threads})
+            results.append(result)
+            print_table([result], ['workers', 'threads'] + columns)
+            print_table(result['workers_stats'], ['pid', 'cpu_pct', 'rss_mb', 'peak_rss_mb'])
+
+        print('\nSweep:')
+        print_table(results, ['workers', 'threads'] + columns)
+        saturation = find_saturation(results)
+        if saturation:
+            print(f"Saturation: {saturation['workers']} workers x {saturation['threads']} threads "
+                  f"({saturation['throughput_rps']} req/s, p95 {saturation['p95_ms']} ms)")
+    else:
+        saturation = None
+        result = measure(args.url, args.server_pid, args.concurrency or 4)
+        results.append(result)
+        print_table([result], columns)
+        if result['errors']:
+            print(f"errors: {result['errors']}")
+        if result['workers_stats']:
+            print_table(result['workers_stats'], ['pid', 'cpu_pct', 'rss_mb', 'peak_rss_mb'])
+
+    if args.output:
+        save_json(args.output, {'params': vars(args), 'results': results, 'saturation': saturation})
+
+
+if __name__ == '__main__':
+    main()
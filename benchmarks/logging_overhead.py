@@ -0,0 +1,145 @@
+"""İstek başına log maliyeti: eski senkron f-string dökümleri ve kuyruklu JSON log.
+
+Sentetik bir faturadan gerçek boyutta OCR sonucu ve yükleme sonucu kurulur;
+process_document ve upload_file'ın istek başına attığı log çağrıları eski
+(tam sözlük INFO'da, dosyaya aynı thread'de yazım) ve yeni (özet INFO +
+örneklenmiş DEBUG dökümü, QueueHandler) haliyle çalıştırılır. Çağıran
+thread'de geçen süre ve yazılan bayt raporlanır.
+
+Kullanım:
+    python -m benchmarks.logging_overhead --requests 2000
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+from app.core.document import OCRDocument
+from app.core.ocr_processor import OCRProcessor
+from app.core.product_extractor import ProductExtractor
+from app.utils.structured_logging import configure_logging, log_dump, shutdown_logging
+from benchmarks.common import print_table, save_json, summarize
+from benchmarks.synthetic_invoices import InvoiceSpec, generate
+
+FLASK_FORMAT = '[%(asctime)s] %(levelname)s in %(module)s: %(message)s'
+
+
+def build_results(line_items: int):
+    """process_document içindeki ocr_result ve upload_file'daki result ile aynı yapıda sözlükler"""
+    invoice = generate(1, InvoiceSpec(line_items=line_items))[0]
+    document = OCRDocument.from_tesseract(invoice.words, invoice.image.shape[0])
+    invoice_data = OCRProcessor({})._extract_invoice_data(document)
+    products = ProductExtractor({}).extract_table(document)
+    ocr_result = {
+        'success': True,
+        'text': document.text,
+        'text_blocks': document.text_blocks(),
+        'confidence': document.confidence,
+        'invoice_data': invoice_data,
+        'document': document
+    }
+    result = {
+        'success': True,
+        'text': document.text,
+        'confidence': document.confidence,
+        'invoice_data': dict(invoice_data, entities={}),
+        'quality': {'decision': 'accept', 'reasons': [], 'elapsed_ms': 3.1},
+        'orientation': {'angle': 0, 'source': 'cache', 'elapsed_ms': 0.1},
+        'language': {'languages': ['tr'], 'source': 'cache', 'elapsed_ms': 0.1},
+        'tier': 'full',
+        'tier_timings': {'fast': 310.2, 'full': 1840.5},
+        'products': products['items'],
+        'products_method': products['method'],
+        'products_validation': products['validation'],
+        'document': document
+    }
+    return ocr_result, result
+
+
+def legacy_calls(logger, filepath, ocr_result, result):
+    """Değişiklikten önceki log satırları"""
+    logger.info(f"OCR Result for {filepath}: { {k: v for k, v in (ocr_result or {}).items() if k != 'document'} }")
+    logger.info(f"Document {filepath} finished at tier 'full' "
+                f"(timings_ms={result['tier_timings']}, missing={[]})")
+    logger.info(f"OCR Result: {result}")
+
+
+def structured_calls(logger, filepath, ocr_result, result):
+    """Şimdiki log satırları"""
+    logger.info("OCR result for %s: success=%s confidence=%s chars=%d", filepath,
+                ocr_result.get('success'), ocr_result.get('confidence'), len(ocr_result.get('text') or ''))
+    log_dump(logger, ocr_result, "OCR result dump for %s", filepath)
+    logger.info("Document %s finished at tier '%s' (timings_ms=%s, missing=%s)",
+                filepath, 'full', result['tier_timings'], [])
+    log_dump(logger, result, "Upload result for %s", filepath)
+
+
+def measure(name, calls, logger, requests, ocr_result, result, log_path, finish=None):
+    samples = []
+    for index in range(requests):
+        filepath = f'app/static/uploads/permanent/20240101_000000_invoice_{index}.png'
+        start = time.perf_counter()
+        calls(logger, filepath, ocr_result, result)
+        samples.append((time.perf_counter() - start) * 1000)
+    drain_start = time.perf_counter()
+    if finish:
+        finish()
+    drain_ms = (time.perf_counter() - drain_start) * 1000
+    summary = summarize(samples)
+    return {
+        'variant': name,
+        'mean_us': round(summary['mean_ms'] * 1000, 1),
+        'p50_us': round(summary['p50_ms'] * 1000, 1),
+        'p99_us': round(summary['p99_ms'] * 1000, 1),
+        'bytes_per_request': os.path.getsize(log_path) // requests,
+        'background_drain_ms': round(drain_ms, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-request logging overhead: legacy vs queued JSON')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--line-items', type=int, default=25)
+    parser.add_argument('--output', help='Write results as JSON')
+    args = parser.parse_args()
+
+    ocr_result, result = build_results(args.line_items)
+    folder = tempfile.mkdtemp(prefix='log-bench-')
+    rows = []
+
+    # Eski: Flask varsayılanı gibi aynı thread'de biçimlendirip yazan handler
+    legacy_path = os.path.join(folder, 'legacy.log')
+    legacy_logger = logging.getLogger('bench.legacy')
+    legacy_logger.propagate = False
+    legacy_logger.setLevel(logging.INFO)
+    handler = logging.FileHandler(legacy_path, encoding='utf-8')
+    handler.setFormatter(logging.Formatter(FLASK_FORMAT))
+    legacy_logger.addHandler(handler)
+    rows.append(measure('legacy (sync, full dumps at INFO)', legacy_calls, legacy_logger, args.requests,
+                        ocr_result, result, legacy_path, handler.flush))
+    handler.close()
+
+    variants = [
+        ('queued JSON, INFO', 'INFO', 0.01),
+        ('queued JSON, DEBUG, 1% dumps', 'DEBUG', 0.01),
+        ('queued JSON, DEBUG, all dumps', 'DEBUG', 1.0),
+    ]
+    for name, level, rate in variants:
+        log_path = os.path.join(folder, f'{level}_{rate}.log')
+        app = SimpleNamespace(config={'LOG_JSON': True, 'LOG_LEVEL': level, 'LOG_FILE': log_path,
+                                      'LOG_MAX_FIELD_CHARS': 2000, 'LOG_DEBUG_SAMPLE_RATE': rate})
+        configure_logging(app)
+        logger = logging.getLogger('app.bench')
+        rows.append(measure(name, structured_calls, logger, args.requests, ocr_result, result, log_path,
+                            shutdown_logging))
+
+    print(f"OCR text: {len(ocr_result['text'])} chars, {len(result['products'])} line items")
+    print_table(rows, ['variant', 'mean_us', 'p50_us', 'p99_us', 'bytes_per_request', 'background_drain_ms'])
+    print(f"logs in {folder}")
+    if args.output:
+        save_json(args.output, {'params': vars(args), 'results': rows})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Belge başına döngü ile nlp.pipe tabanlı toplu NER karşılaştırması (belge/sn).
+
+Kullanım:
+    python -m benchmarks.ner_batch data/ocr_texts --batch-size 32 --n-process 2
+"""
+import argparse
+import os
+import time
+from app.core.ner.model import NERModel
+from benchmarks.common import save_json, print_table
+
+
+def load_texts(folder, copies):
+    texts = []
+    for name in sorted(os.listdir(folder)):
+        if name.endswith('.txt'):
+            with open(os.path.join(folder, name), encoding='utf-8') as f:
+                texts.append(f.read())
+    return texts * copies
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-document loop vs batched NER throughput')
+    parser.add_argument('folder', help='Folder of OCR text files (.txt)')
+    parser.add_argument('--copies', type=int, default=1, help='Repeat the corpus to get a larger batch')
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--n-process', type=int, default=1)
+    parser.add_argument('--output', help='Write results as JSON')
+    args = parser.parse_args()
+
+    texts = load_texts(args.folder, args.copies)
+    if not texts:
+        parser.error(f'No .txt files found in {args.folder}')
+
+    model = NERModel()
+    languages = [model.detect_language(text) for text in texts]
+    # Model yükleme süresini ölçüme katma
+    for language in set(languages):
+        model.pipeline(language)
+
+    start = time.perf_counter()
+    loop_results = [model.process_text(text, language) for text, language in zip(texts, languages)]
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_results = model.process_texts(texts, batch_size=args.batch_size,
+                                        n_process=args.n_process, languages=languages)
+    batch_seconds = time.perf_counter() - start
+
+    same = sum(1 for a, b in zip(loop_results, batch_results) if a.get('entities') == b.get('entities'))
+    rows = [
+        {'mode': 'loop', 'docs': len(texts), 'seconds': round(loop_seconds, 3),
+         'docs_per_sec': round(len(texts) / loop_seconds, 2)},
+        {'mode': f'pipe(batch={args.batch_size}, n_process={args.n_process})', 'docs': len(texts),
+         'seconds': round(batch_seconds, 3), 'docs_per_sec': round(len(texts) / batch_seconds, 2)},
+    ]
+    print_table(rows, ['mode', 'docs', 'seconds', 'docs_per_sec'])
+    print(f"\nIdentical entity output: {same}/{len(texts)}")
+
+    if args.output:
+        save_json(args.output, {'results': rows, 'identical': same})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Dil başına NER gecikmesi ve en yüksek RSS.
+
+Metin klasöründeki her .txt dosyası dili tespit edilerek ilgili spaCy
+modeline yönlendirilir. Model önbelleği sınırı --max-models ile verilir.
+
+Kullanım:
+    python -m benchmarks.ner_languages data/ocr_texts --max-models 1
+"""
+import argparse
+import os
+import time
+from app.core.ner.model import NERModel
+from benchmarks.common import summarize, save_json, print_table, rss_mb, peak_rss_mb
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-language NER latency and RSS')
+    parser.add_argument('folder', help='Folder of OCR text files (.txt)')
+    parser.add_argument('--max-models', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--output', help='Write results as JSON')
+    args = parser.parse_args()
+
+    texts = []
+    for name in sorted(os.listdir(args.folder)):
+        if name.endswith('.txt'):
+            with open(os.path.join(args.folder, name), encoding='utf-8') as f:
+                texts.append(f.read())
+    if not texts:
+        parser.error(f'No .txt files found in {args.folder}')
+
+    model = NERModel({'NER_MAX_MODELS': args.max_models})
+    rss_start = rss_mb()
+    samples = {}
+    for _ in range(args.repeat):
+        for text in texts:
+            language = model.detect_language(text)
+            start = time.perf_counter()
+            model.process_text(text, language)
+            samples.setdefault(language, []).append((time.perf_counter() - start) * 1000)
+
+    stats = model.stats()
+    rows = []
+    for language, values in sorted(samples.items()):
+        rows.append({
+            'language': language,
+            **summarize(values),
+            'peak_rss_mb': stats['languages'].get(language, {}).get('peak_rss_mb')
+        })
+    print_table(rows, ['language', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'max_ms', 'peak_rss_mb'])
+    print(f"\nRSS start {rss_start:.0f} MB, end {rss_mb():.0f} MB, peak {peak_rss_mb():.0f} MB")
+    print('Model cache:', stats['model_cache'])
+
+    if args.output:
+        save_json(args.output, {'results': rows, 'model_cache': stats['model_cache']})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Tam paket modeli ile derlenmiş hafif pipeline karşılaştırması.
+
+Her kaynak ayrı bir alt süreçte yüklenir, böylece RSS ölçümleri birbirini
+etkilemez. Yükleme süresi, belge başına gecikme ve RSS raporlanır.
+
+Kullanım:
+    python -m benchmarks.ner_pipeline data/ocr_texts --full en_core_web_lg --slim models/ner/en
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from benchmarks.common import summarize, save_json, print_table, rss_mb, peak_rss_mb
+
+
+def measure(source, folder, exclude_unused):
+    """Alt süreçte çalışır: pipeline'ı yükle ve metinleri işle"""
+    import spacy
+    from app.core.ner.patterns import EXCLUDED_COMPONENTS
+
+    texts = []
+    for name in sorted(os.listdir(folder)):
+        if name.endswith('.txt'):
+            with open(os.path.join(folder, name), encoding='utf-8') as f:
+                texts.append(f.read())
+
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    nlp = spacy.load(source, exclude=EXCLUDED_COMPONENTS if exclude_unused else [])
+    load_ms = (time.perf_counter() - start) * 1000
+
+    samples = []
+    for text in texts:
+        start = time.perf_counter()
+        nlp(text)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'source': source,
+        'components': nlp.pipe_names,
+        'load_ms': round(load_ms, 1),
+        'model_rss_mb': round(rss_mb() - rss_before, 1),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        **summarize(samples)
+    }
+
+
+def run_child(source, folder, exclude_unused):
+    cmd = [sys.executable, '-m', 'benchmarks.ner_pipeline', folder, '--child', source]
+    if exclude_unused:
+        cmd.append('--exclude-unused')
+    output = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare full vs slim NER pipeline')
+    parser.add_argument('folder', help='Folder of OCR text files (.txt)')
+    parser.add_argument('--full', default='en_core_web_lg', help='Installed package name')
+    parser.add_argument('--slim', default=os.path.join('models', 'ner', 'en'), help='Built pipeline path')
+    parser.add_argument('--output', help='Write results as JSON')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--exclude-unused', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.folder, args.exclude_unused)))
+        return
+
+    rows = [
+        {'variant': 'full', **run_child(args.full, args.folder, False)},
+        {'variant': 'slim', **run_child(args.slim, args.folder, True)},
+    ]
+    print_table(rows, ['variant', 'load_ms', 'model_rss_mb', 'peak_rss_mb', 'mean_ms', 'p95_ms'])
+    if args.output:
+        save_json(args.output, {'results': rows})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Tutar ve tarih ayrıştırma hızı: eski replace/strptime zinciri ve Normalizer.
+
+Karışık TR/EU/US biçimlerinde sentetik parçalar üretir; her yöntem için saniyede
+işlenen parça sayısını, doğru okunan oranı ve satıcı biçim önbelleği isabetini
+raporlar.
+
+Kullanım:
+    python -m benchmarks.normalizer_throughput --tokens 2000000 --vendors 200
+"""
+import argparse
+import random
+import re
+import time
+from datetime import datetime
+from decimal import Decimal
+from app.core.normalizer import Normalizer
+from benchmarks.common import save_json, print_table
+
+# Satıcının yerel biçimi: (tutar biçimi, tarih biçimi)
+LOCALES = {
+    'tr': ('{int_dot},{frac}', '%d.%m.%Y'),
+    'eu': ('{int_dot},{frac}', '%d/%m/%Y'),
+    'us': ('{int_comma}.{frac}', '%m/%d/%Y'),
+    'iso': ('{int_plain}.{frac}', '%Y-%m-%d'),
+}
+LEGACY_AMOUNT_PATTERN = re.compile(r'(\d+(?:[.,]\d{2})?)')
+
+
+def group(value, separator):
+    return f'{value:,}'.replace(',', separator)
+
+
+def synthetic_tokens(count, vendors, rng):
+    """(satıcı, tür, metin, beklenen) dörtlüleri"""
+    vendor_locales = {f'VENDOR {i}': rng.choice(list(LOCALES)) for i in range(vendors)}
+    names = list(vendor_locales)
+    tokens = []
+    for _ in range(count):
+        vendor = rng.choice(names)
+        amount_format, date_format = LOCALES[vendor_locales[vendor]]
+        if rng.random() < 0.7:
+            cents = rng.randint(1, 5_000_000)
+            whole, frac = divmod(cents, 100)
+            text = amount_format.format(int_dot=group(whole, '.'), int_comma=group(whole, ','),
+                                        int_plain=whole, frac=f'{frac:02d}')
+            tokens.append((vendor, 'amount', f'{text} TL', Decimal(cents) / 100))
+        else:
+            date = datetime(rng.randint(2015, 2025), rng.randint(1, 12), rng.randint(1, 28))
+            tokens.append((vendor, 'date', f'Tarih: {date.strftime(date_format)}', date))
+    return tokens
+
+
+def legacy_amount(text):
+    """Eski _extract_amount + safe_float davranışı"""
+    match = LEGACY_AMOUNT_PATTERN.search(text)
+    try:
+        return Decimal(str(float(match.group(1).replace(',', '.')))) if match else None
+    except ValueError:
+        return None
+
+
+def legacy_date(text):
+    """Eski strptime zinciri (önce gg-aa-yyyy, sonra gg/aa/yyyy, sonra yyyy-aa-gg)"""
+    value = text.split(': ', 1)[-1]
+    for date_format in ('%d-%m-%Y', '%d/%m/%Y', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+    return None
+
+
+def run(name, tokens, parse_amount, parse_date):
+    correct = 0
+    start = time.perf_counter()
+    for vendor, kind, text, expected in tokens:
+        value = parse_amount(text, vendor) if kind == 'amount' else parse_date(text, vendor)
+        if value == expected:
+            correct += 1
+    elapsed = time.perf_counter() - start
+    return {
+        'method': name,
+        'tokens': len(tokens),
+        'tokens_per_s': round(len(tokens) / elapsed),
+        'us_per_token': round(elapsed / len(tokens) * 1e6, 2),
+        'correct_pct': round(100.0 * correct / len(tokens), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Amount/date normalization throughput')
+    parser.add_argument('--tokens', type=int, default=1_000_000)
+    parser.add_argument('--vendors', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help='Write results as JSON')
+    args = parser.parse_args()
+
+    tokens = synthetic_tokens(args.tokens, args.vendors, random.Random(args.seed))
+    rows = [run('legacy', tokens, lambda text, vendor: legacy_amount(text), lambda text, vendor: legacy_date(text))]
+
+    # Satıcısız: her parça biçim sınıflandırmasından geçer
+    cold = Normalizer()
+    rows.append(run('normalizer_no_vendor', tokens, lambda text, vendor: cold.parse_amount(text),
+                    lambda text, vendor: cold.parse_date(text)))
+
+    # Satıcı biçimi hatırlanır; ısınma sonrası tek kalıp denemesi
+    memo = Normalizer()
+    row = run('normalizer_vendor_memo', tokens, memo.parse_amount, memo.parse_date)
+    row.update(memo.stats())
+    rows.append(row)
+
+    print_table(rows, ['method', 'tokens', 'tokens_per_s', 'us_per_token', 'correct_pct'])
+    print(f"memo: {memo.stats()}")
+
+    if args.output:
+        save_json(args.output, {'results': rows})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Dil setine göre Tesseract gecikmesi.
+
+Kullanım:
+    python -m benchmarks.ocr_languages data/corpus --output bench/ocr_languages.json
+"""
+import argparse
+import cv2
+import pytesseract
+from app.core.language import LanguageDetector, tesseract_lang
+from benchmarks.common import iter_images, summarize, time_calls, save_json, print_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-language OCR latency on a corpus')
+    parser.add_argument('folder', help='Folder of invoice images')
+    parser.add_argument('--languages', default='tr,en', help='Allowed language codes (OCR_LANGUAGES)')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--output', help='Write results as JSON')
+    parser.add_argument('--tesseract-cmd', help='Path to the tesseract binary')
+    args = parser.parse_args()
+
+    if args.tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = args.tesseract_cmd
+
+    allowed = args.languages.split(',')
+    images = [cv2.imread(path, cv2.IMREAD_GRAYSCALE) for path in iter_images(args.folder)]
+    images = [image for image in images if image is not None]
+    if not images:
+        parser.error(f'No images found in {args.folder}')
+
+    # Her dil tek başına ve izin verilen tüm set birlikte
+    variants = [[lang] for lang in allowed] + ([allowed] if len(allowed) > 1 else [])
+    rows = []
+    for languages in variants:
+        lang = tesseract_lang(languages)
+        samples = time_calls(lambda image: pytesseract.image_to_string(image, lang=lang), images, args.repeat)
+        rows.append({'languages': lang, **summarize(samples)})
+
+    # Otomatik tespit: yoklama + seçilen dil setiyle OCR
+    detector = LanguageDetector({'OCR_LANGUAGES': allowed})
+    chosen = []
+
+    def detect_and_ocr(image):
+        languages = detector.detect(image)['languages']
+        chosen.append(tesseract_lang(languages))
+        pytesseract.image_to_string(image, lang=tesseract_lang(languages))
+
+    samples = time_calls(detect_and_ocr, images, args.repeat)
+    rows.append({'languages': 'auto', **summarize(samples)})
+
+    print_table(rows, ['languages', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'max_ms'])
+    print('\nAuto-detected sets:', {lang: chosen.count(lang) for lang in sorted(set(chosen))})
+
+    if args.output:
+        save_json(args.output, {'results': rows, 'auto_detected': chosen})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Sunucu modlarının eşzamanlı yüklemeler altında karşılaştırması.
+
+Her mod için gunicorn --preload ile başlatılır, /ready beklenir ve kapalı
+döngü yük (benchmarks.load_test.run_load) her --concurrency değeri için
+çalıştırılır. Modlar:
+  legacy-2x   eski worker sayısı (çekirdek x 2), thread'siz sync worker
+              (eski UvicornWorker WSGI Flask uygulamasını hiç sunamaz)
+  sync-1x     çekirdek başına bir sync worker
+  gthread     app.utils.server_sizing.plan_server ile çekirdek ve bellek
+              bütçesinden hesaplanan worker x thread (run.py'nin kullandığı)
+
+Verim, gecikme, hata oranı ve worker'ların toplam PSS değeri raporlanır.
+
+Kullanım:
+    python -m benchmarks.server_modes --concurrency 4 16 --duration 60
+    python -m benchmarks.server_modes --memory-budget-mb 4000 --modes gthread sync-1x
+"""
+import argparse
+from typing import Any, Dict
+from app.utils.process_stats import child_pids, memory_mb, usable_cores
+from app.utils.server_sizing import plan_server
+from benchmarks.common import print_table, save_json
+from benchmarks.load_test import Client, WorkerMonitor, load_payloads, run_load, start_gunicorn
+from benchmarks.warmup import wait_ready
+from config import config as app_configs
+
+MODES = ('legacy-2x', 'sync-1x', 'gthread')
+
+
+def mode_settings(mode: str, settings: Dict[str, Any], cores: int, memory_budget_mb: float) -> Dict[str, Any]:
+    """(worker sınıfı, worker, thread) ve plan ayrıntısı"""
+    if mode == 'legacy-2x':
+        return {'worker_class': 'sync', 'workers': cores * 2, 'threads': 1}
+    if mode == 'sync-1x':
+        return {'worker_class': 'sync', 'workers': cores, 'threads': 1}
+    plan = plan_server(settings, cores, memory_budget_mb)
+    return dict(plan, worker_class='gthread')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare gunicorn serving modes under concurrent uploads')
+    parser.add_argument('--app', default='app:create_app("production")', help='WSGI app or factory')
+    parser.add_argument('--config', default='production', help='Config used for the gthread plan')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[4, 16], help='Closed-loop client threads')
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds per concurrency level')
+    parser.add_argument('--cores', type=int, help='Override detected cores')
+    parser.add_argument('--memory-budget-mb', type=float, help='Override detected memory budget')
+    parser.add_argument('--payloads', type=int, default=8)
+    parser.add_argument('--line-items', type=int, default=15)
+    parser.add_argument('--timeout', type=float, default=180.0)
+    parser.add_argument('--port', type=int, default=5057)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help='Write results as JSON')
+    args = parser.parse_args()
+
+    config_class = app_configs[args.config]
+    settings = {key: getattr(config_class, key) for key in dir(config_class) if key.isupper()}
+    cores = args.cores or usable_cores()
+    payloads = load_payloads(None, args.payloads, args.line_items, args.seed)
+    rows = []
+
+    for mode in args.modes:
+        server_settings = mode_settings(mode, settings, cores, args.memory_budget_mb)
+        print(f"\n{mode}: {server_settings}")
+        server = start_gunicorn(args.app, args.port, server_settings['workers'], server_settings['threads'],
+                                int(args.timeout), server_settings['worker_class'], preload=True)
+        try:
+            if wait_ready(args.port, args.timeout) is None:
+                print(f"{mode} did not become ready")
+                continue
+            client = Client(f'http://127.0.0.1:{args.port}', '/upload', args.timeout)
+            for body, content_type in payloads[:2]:
+                client.post(body, content_type)
+            for concurrency in args.concurrency:
+                monitor = WorkerMonitor(server.pid)
+                monitor.start()
+                result = run_load(client, payloads, concurrency, args.duration, None, None, args.seed)
+                worker_stats = monitor.stop()
+                pss = sum(memory_mb(pid)['pss_mb'] for pid in child_pids(server.pid) + [server.pid])
+                result.update({
+                    'server_mode': mode,
+                    'workers': server_settings['workers'],
+                    'threads': server_settings['threads'],
+                    'total_pss_mb': round(pss, 1),
+                    'worker_cpu_pct': round(sum(row['cpu_pct'] for row in worker_stats), 1),
+                })
+                rows.append(result)
+                print_table([result], ['concurrency', 'requests', 'throughput_rps', 'p50_ms', 'p95_ms', 'error_pct',
+                                       'total_pss_mb'])
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+
+    print(f"\ncores={cores}")
+    print_table(rows, ['server_mode', 'workers', 'threads', 'concurrency', 'throughput_rps', 'p50_ms', 'p95_ms',
+                       'p99_ms', 'error_pct', 'worker_cpu_pct', 'total_pss_mb'])
+    if args.output:
+        save_json(args.output, {'params': vars(args), 'cores': cores, 'results': rows})
+
+
+if __name__ == '__main__':
+    main()
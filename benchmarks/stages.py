@@ -0,0 +1,234 @@
+"""Aşama bazında mikro ve uçtan uca (makro) ölçüm paketi.
+
+Sentetik faturalar (benchmarks.synthetic_invoices) üretilip diske yazılır; her
+fatura için yükleme, kalite kontrolü, yön/dil yoklaması, her ön işleme adımı,
+OCR katmanları, belge modeli, her çıkarıcı, NER ve veritabanı yazımı ayrı ayrı
+ölçülür. Tesseract yoksa OCR aşamaları atlanır ve belge, üreticinin çizdiği
+kelime kutularından kurulur.
+
+Sonuçlar commit karşılaştırması için JSON'a yazılır; --baseline verilirse p50
+süresi eşikten fazla kötüleşen aşamalar raporlanır ve çıkış kodu 1 olur.
+
+Kullanım:
+    python -m benchmarks.stages --invoices 10 --line-items 20 --output bench/stages.json
+    python -m benchmarks.stages --baseline bench/stages.json --threshold 0.2
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+from flask import Flask
+from app import db
+from app.core.document import OCRDocument
+from app.core.document_processor import DocumentProcessor
+from app.models.invoice import Invoice, InvoiceLineItem
+from benchmarks.common import compare_to_baseline, print_table, save_json, summarize
+from benchmarks.synthetic_invoices import InvoiceSpec, LOCALES, generate, write_corpus
+from config import config as configs
+
+
+class StageTimer:
+    """Aşama adı -> milisaniye örnekleri"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.skipped: Dict[str, str] = {}
+
+    def run(self, stage: str, func: Callable, *args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.add(stage, (time.perf_counter() - start) * 1000)
+        return result
+
+    def add(self, stage: str, elapsed_ms: float):
+        self.samples.setdefault(stage, []).append(elapsed_ms)
+
+    def skip(self, stage: str, reason: str, discard: bool = False):
+        """Aşamayı atlandı say; discard=True ise son (başarısız) örneği de çıkar"""
+        if discard and self.samples.get(stage):
+            self.samples[stage].pop()
+            if not self.samples[stage]:
+                del self.samples[stage]
+        self.skipped.setdefault(stage, reason)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {stage: summarize(samples) for stage, samples in self.samples.items()}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def app_config(name: str, tesseract: str) -> Dict[str, Any]:
+    """Uygulama ayarları; ölçümü bozan önbellekler kapalı"""
+    settings = {key: getattr(configs[name], key) for key in dir(configs[name]) if key.isupper()}
+    settings.update({
+        'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+        'TESSERACT_CMD': tesseract,
+        'ORIENTATION_USE_OSD': bool(tesseract),
+        'ORIENTATION_CACHE_SIZE': 0,
+        'LANGUAGE_CACHE_SIZE': 0,
+        'NER_MEMO_ENABLED': False,
+    })
+    return settings
+
+
+def find_tesseract(configured: str) -> str:
+    if configured and os.path.exists(configured):
+        return configured
+    return shutil.which('tesseract') or ''
+
+
+def run_invoice(timer: StageTimer, processor: DocumentProcessor, path: str, invoice, truth: Dict[str, Any],
+                tesseract: str, macro: bool) -> Dict[str, bool]:
+    """Tek faturanın tüm aşamaları; doğruluk kontrollerini döndür"""
+    ocr = processor.ocr_processor
+
+    image = timer.run('load', processor._load_image, path)
+    timer.run('quality_gate', processor.quality_gate.assess, path)
+    timer.run('orientation', processor.orientation_detector.detect, image)
+    timer.run('language', processor.language_detector.detect, image)
+
+    steps = {}
+    timer.run('preprocess.total', ocr._preprocess_image, image, False, steps)
+    for step, elapsed_ms in steps.items():
+        timer.add(f'preprocess.{step}', elapsed_ms)
+
+    if tesseract:
+        fast = timer.run('ocr.fast_tier', ocr.process_fast, image, 'en')
+        timer.run('ocr.full_tier', ocr.process_document, image)
+        document = fast.get('document') if fast.get('success') else None
+    else:
+        timer.skip('ocr.fast_tier', 'tesseract not found')
+        timer.skip('ocr.full_tier', 'tesseract not found')
+        document = None
+
+    # Tesseract yoksa üreticinin kelime kutuları OCR çıktısı yerine geçer
+    synthetic = timer.run('document.build', OCRDocument.from_tesseract, invoice.words, invoice.image.shape[0])
+    document = document or synthetic
+
+    invoice_data = timer.run('extract.fields', ocr._extract_invoice_data, document, image=image)
+    timer.run('extract.vendor_profile', ocr.vendor_registry.identify, document, image)
+    products = timer.run('extract.line_items', processor.product_extractor.extract_table, document,
+                         invoice_data.get('vendor'))
+
+    ner = timer.run('ner', processor.ner_processor.process_text, document)
+    if not ner or not ner.get('success'):
+        timer.skip('ner', (ner or {}).get('error', 'failed'), discard=True)
+
+    def write():
+        record = Invoice(vendor=invoice_data.get('vendor') or truth['vendor'],
+                         amount=invoice_data.get('total_amount') or 0, raw_text=document.text)
+        db.session.add(record)
+        db.session.flush()
+        InvoiceLineItem.bulk_insert(record.id, products['items'])
+        db.session.commit()
+    timer.run('db_write', write)
+
+    if macro:
+        if tesseract:
+            timer.run('macro.process_document', processor.process_document, path)
+        else:
+            timer.skip('macro.process_document', 'tesseract not found')
+
+    return {
+        'total_amount': abs((invoice_data.get('total_amount') or 0) - truth['total_amount']) < 0.01,
+        'line_items': len(products['items']) == len(truth['line_items']),
+        'subtotal_check': bool((products.get('validation') or {}).get('matches')),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-stage benchmark suite on synthetic invoices')
+    parser.add_argument('--invoices', type=int, default=5)
+    parser.add_argument('--line-items', type=int, default=15)
+    parser.add_argument('--dpi', type=int, default=200)
+    parser.add_argument('--noise', type=float, default=0.02)
+    parser.add_argument('--skew', type=float, default=0.5)
+    parser.add_argument('--blur', type=float, default=0.0)
+    parser.add_argument('--locale', choices=sorted(LOCALES), default='tr')
+    parser.add_argument('--repeat', type=int, default=1, help='Passes over the generated corpus')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--config', default='development')
+    parser.add_argument('--no-macro', action='store_true', help='Skip end-to-end DocumentProcessor runs')
+    parser.add_argument('--corpus', help='Keep generated images in this folder (default: temp dir)')
+    parser.add_argument('--output', help='Write results as JSON')
+    parser.add_argument('--baseline', help='Earlier --output file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed p50 slowdown ratio per stage')
+    parser.add_argument('--min-delta-ms', type=float, default=0.5, help='Ignore slowdowns smaller than this')
+    args = parser.parse_args()
+
+    spec = InvoiceSpec(line_items=args.line_items, dpi=args.dpi, noise=args.noise, skew=args.skew,
+                       blur=args.blur, locale=args.locale)
+    invoices = generate(args.invoices, spec, args.seed)
+    folder = args.corpus or tempfile.mkdtemp(prefix='invoice-bench-')
+    written = write_corpus(folder, invoices)
+
+    tesseract = find_tesseract(configs[args.config].TESSERACT_CMD)
+    settings = app_config(args.config, tesseract)
+    app = Flask(__name__)
+    app.config.update(settings)
+    db.init_app(app)
+
+    timer = StageTimer()
+    checks: Dict[str, List[bool]] = {}
+    with app.app_context():
+        db.create_all()
+        processor = DocumentProcessor(app.config)
+        # Model/önbellek ısınması ölçüme girmez
+        run_invoice(StageTimer(), processor, written[0][0], invoices[0], written[0][1], tesseract, False)
+
+        for _ in range(args.repeat):
+            for invoice, (path, truth) in zip(invoices, written):
+                result = run_invoice(timer, processor, path, invoice, truth, tesseract, not args.no_macro)
+                for name, ok in result.items():
+                    checks.setdefault(name, []).append(ok)
+        db.drop_all()
+
+    if not args.corpus:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    stages = timer.summary()
+    print_table([{'stage': stage, **summary} for stage, summary in stages.items()],
+                ['stage', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'max_ms'])
+    for stage, reason in timer.skipped.items():
+        print(f"skipped {stage}: {reason}")
+    accuracy = {name: round(100.0 * sum(values) / len(values), 1) for name, values in checks.items()}
+    print(f"accuracy %: {accuracy}")
+
+    report = {
+        'commit': git_commit(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'ocr_source': 'tesseract' if tesseract else 'synthetic_words',
+        'params': vars(args),
+        'stages': stages,
+        'skipped': timer.skipped,
+        'accuracy': accuracy,
+    }
+    if args.output:
+        save_json(args.output, report)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows = compare_to_baseline(stages, baseline.get('stages', {}), args.threshold, args.min_delta_ms)
+        print(f"\nvs {args.baseline} (commit {baseline.get('commit')}), threshold {args.threshold:.0%}:")
+        print_table(rows, ['stage', 'baseline', 'current', 'change_pct', 'regressed'])
+        regressed = [row['stage'] for row in rows if row['regressed']]
+        if regressed:
+            print(f"REGRESSION: {', '.join(regressed)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Kalem tablosu çıkarımının Tesseract sayfa bölütleme kiplerine duyarlılığı.
+
+Sentetik faturaların kelime kutuları iki biçimde üretilir: 'lines' (psm 6, tüm
+sayfa tek blok) ve 'columns' (psm 3, her sütun ayrı blok - bir tablo satırı
+birden çok (block, par, line) grubuna bölünür). Her faturada TableExtractor
+çalıştırılır ve kalemler doğru değerlerle karşılaştırılır; herhangi bir
+düzende bir fatura tutmazsa komut 1 ile çıkar.
+
+Kullanım:
+    python -m benchmarks.table_layouts --count 20 --line-items 15
+"""
+import argparse
+import sys
+from typing import Any, Dict, List
+from app.core.document import OCRDocument
+from app.core.product_extractor import TableExtractor
+from benchmarks.common import print_table, save_json
+from benchmarks.synthetic_invoices import LOCALES, InvoiceSpec, generate
+
+LAYOUTS = ('lines', 'columns')
+
+
+def mismatches(table, truth: Dict[str, Any]) -> List[str]:
+    """Çıkarılan kalemlerin doğru değerlerden farkları"""
+    if not table:
+        return ['table header not found']
+    items = table['items']
+    expected = truth['line_items']
+    if len(items) != len(expected):
+        return [f"{len(items)} items, expected {len(expected)}"]
+    errors = []
+    for index, (item, row) in enumerate(zip(items, expected)):
+        if item.description != row['description']:
+            errors.append(f"row {index}: description {item.description!r} != {row['description']!r}")
+        if item.quantity != row['quantity']:
+            errors.append(f"row {index}: quantity {item.quantity} != {row['quantity']}")
+        for field in ('unit_price', 'total'):
+            value = getattr(item, field)
+            if value is None or abs(float(value) - row[field]) >= 0.01:
+                errors.append(f"row {index}: {field} {value} != {row[field]}")
+    if not table['validation']['matches']:
+        errors.append(f"subtotal check failed: {table['validation']}")
+    return errors
+
+
+def run_layout(layout: str, args) -> Dict[str, Any]:
+    spec = InvoiceSpec(line_items=args.line_items, locale=args.locale, layout=layout)
+    extractor = TableExtractor({})
+    failed, errors, elapsed = 0, [], []
+    for invoice in generate(args.count, spec, args.seed):
+        document = OCRDocument.from_tesseract(invoice.words, invoice.image.shape[0])
+        table = extractor.extract(document)
+        problems = mismatches(table, invoice.truth)
+        if table:
+            elapsed.append(table['elapsed_ms'])
+        if problems:
+            failed += 1
+            errors.extend(problems[:3])
+    return {
+        'layout': layout,
+        'invoices': args.count,
+        'failed': failed,
+        'mean_ms': round(sum(elapsed) / len(elapsed), 2) if elapsed else None,
+        'errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check line-item table extraction for psm 6 and psm 3 word boxes')
+    parser.add_argument('--count', type=int, default=10)
+    parser.add_argument('--line-items', type=int, default=12)
+    parser.add_argument('--locale', choices=sorted(LOCALES), default='tr')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help='Write results as JSON')
+    args = parser.parse_args()
+
+    rows = [run_layout(layout, args) for layout in LAYOUTS]
+    print_table(rows, ['layout', 'invoices', 'failed', 'mean_ms'])
+    if args.output:
+        save_json(args.output, {'params': vars(args), 'results': rows})
+
+    failures = [row for row in rows if row['failed']]
+    if failures:
+        for row in failures:
+            print(f"\n{row['layout']}:\n  " + '\n  '.join(row['errors'][:10]))
+        sys.exit(1)
+    print('\nOK')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Satıcı tanıma maliyeti: indeksli kayıt ve profiller üzerinde doğrusal tarama.
+
+Sentetik profil ve belgelerle her yöntemin (vergi no, ad, antet izi) gecikmesini
+ölçer; profil sayısı arttıkça indeksli yolun sabit kaldığını gösterir.
+
+Kullanım:
+    python -m benchmarks.vendor_identification --profiles 100,1000,10000 --documents 2000
+"""
+import argparse
+import random
+import string
+from app.core.vendor_profiles import VendorProfile, VendorRegistry, name_tokens
+from benchmarks.common import summarize, time_calls, save_json, print_table
+
+WORDS = ['anadolu', 'marmara', 'ege', 'yildiz', 'kuzey', 'gida', 'tekstil', 'insaat', 'lojistik',
+         'enerji', 'kimya', 'otomotiv', 'elektrik', 'medikal', 'yazilim', 'tarim', 'metal', 'kagit']
+
+
+def random_name(rng):
+    return ' '.join(rng.sample(WORDS, 2) + [''.join(rng.choices(string.ascii_lowercase, k=6))]).upper() + ' LTD. ŞTİ.'
+
+
+def build_profiles(count, rng):
+    profiles = []
+    for i in range(count):
+        profiles.append(VendorProfile(
+            id=f'v{i}',
+            name=random_name(rng),
+            tax_ids=[f'{rng.randrange(10 ** 9, 10 ** 10)}'],
+            fingerprints=[rng.getrandbits(64)]
+        ))
+    return profiles
+
+
+def document_for(profile, method, rng):
+    """Sadece seçilen yöntemle tanınabilecek belge metni ve antet izi"""
+    filler = '\n'.join(f'{rng.choice(WORDS)} {rng.randint(1, 99)} x {rng.randint(10, 999)},00' for _ in range(25))
+    if method == VendorRegistry.METHOD_TAX_ID:
+        return f'FATURA\nVKN: {profile.tax_ids[0]}\n{filler}', None
+    if method == VendorRegistry.METHOD_NAME:
+        return f'{profile.name}\nFATURA\n{filler}', None
+    # Antet izinde 0-4 bit gürültü
+    noise = sum(1 << bit for bit in rng.sample(range(64), rng.randint(0, 4)))
+    return f'FATURA\n{filler}', profile.fingerprints[0] ^ noise
+
+
+def linear_scan(profiles, text):
+    """Karşılaştırma: her profili sırayla dene"""
+    tokens = set(name_tokens(text))
+    for profile in profiles:
+        if any(tax_id in text for tax_id in profile.tax_ids):
+            return profile
+        if set(name_tokens(profile.name)) <= tokens:
+            return profile
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Vendor identification latency vs profile count')
+    parser.add_argument('--profiles', default='100,1000,10000', help='Comma separated registry sizes')
+    parser.add_argument('--documents', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help='Write results as JSON')
+    args = parser.parse_args()
+
+    rows = []
+    for count in [int(value) for value in args.profiles.split(',')]:
+        rng = random.Random(args.seed)
+        profiles = build_profiles(count, rng)
+        registry = VendorRegistry()
+        for profile in profiles:
+            registry.add(profile)
+        # Ad indeksi ilk sorguda kurulur - ölçüme katma
+        registry.identify('')
+
+        for method in (VendorRegistry.METHOD_TAX_ID, VendorRegistry.METHOD_NAME, VendorRegistry.METHOD_FINGERPRINT):
+            targets = [rng.choice(profiles) for _ in range(args.documents)]
+            cases = [(target, *document_for(target, method, rng)) for target in targets]
+            found = []
+
+            def identify(case):
+                target, text, fingerprint = case
+                found.append(registry.identify(text, fingerprint=fingerprint)['profile'] is target)
+
+            samples = time_calls(identify, cases)
+            rows.append({'profiles': count, 'method': method,
+                         'accuracy': round(sum(found) / len(found), 4), **summarize(samples)})
+
+        # Doğrusal tarama sadece metin yöntemleri için
+        cases = [document_for(rng.choice(profiles), VendorRegistry.METHOD_NAME, rng)[0]
+                 for _ in range(min(args.documents, 200))]
+        samples = time_calls(lambda text: linear_scan(profiles, text), cases)
+        rows.append({'profiles': count, 'method': 'linear_scan', **summarize(samples)})
+
+    print_table(rows, ['profiles', 'method', 'accuracy', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'max_ms'])
+
+    if args.output:
+        save_json(args.output, {'results': rows})
+
+
+if __name__ == '__main__':
+    main()
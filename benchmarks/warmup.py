@@ -0,0 +1,138 @@
+"""Başlangıç ısınmasının etkisi: ilk faturaya kadar geçen süre ve worker başına özel bellek.
+
+Her varyant için gunicorn (gthread) yeni baştan başlatılır; /ready 200 dönene
+kadar beklenir, ardından ilk fatura gönderilir. Başlatmadan ilk başarılı
+yanıta kadar geçen süre (time-to-first-invoice) ve ilk isteğin gecikmesi
+ölçülür. Sonra her worker'a düşecek kadar istek gönderilip worker'ların
+RSS/PSS/USS değerleri okunur: USS worker'ın kendine ait, paylaşılmayan
+belleğidir; preload + gc.freeze ile modeller master'dan paylaşıldığında düşer.
+
+Kullanım:
+    python -m benchmarks.warmup --workers 4
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+from app.utils.process_stats import child_pids, memory_mb
+from benchmarks.common import print_table, save_json
+from benchmarks.load_test import REPO_ROOT, Client, load_payloads
+
+# varyant -> (--preload, WARMUP_ENABLED); preload'suz worker'lar db.create_all'da yarışmasın
+# diye tabloları oluşturan preload varyantları önce çalışır
+VARIANTS = {
+    'preload+warmup': (True, True),
+    'preload': (True, False),
+    'lazy': (False, False),
+}
+
+
+def start_server(factory: str, port: int, workers: int, threads: int, preload: bool,
+                 warmup: bool) -> subprocess.Popen:
+    command = [sys.executable, '-m', 'gunicorn', factory, '--bind', f'127.0.0.1:{port}',
+               '--workers', str(workers), '--threads', str(threads), '--worker-class', 'gthread',
+               '--timeout', '300', '--log-level', 'warning']
+    if preload:
+        command.append('--preload')
+    env = dict(os.environ, WARMUP_ENABLED='1' if warmup else '0')
+    return subprocess.Popen(command, cwd=REPO_ROOT, env=env)
+
+
+def wait_ready(port: int, timeout: float) -> Optional[Dict[str, Any]]:
+    """/ready 200 dönene kadar bekle; yanıt gövdesini döndür"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            connection.request('GET', '/ready')
+            response = connection.getresponse()
+            body = response.read()
+            connection.close()
+            if response.status == 200:
+                return json.loads(body)
+        except (http.client.HTTPException, OSError, ValueError):
+            pass
+        time.sleep(0.1)
+    return None
+
+
+def run_variant(name: str, args, payloads) -> Dict[str, Any]:
+    preload, warmup = VARIANTS[name]
+    start = time.perf_counter()
+    server = start_server(args.app, args.port, args.workers, args.threads, preload, warmup)
+    try:
+        state = wait_ready(args.port, args.timeout)
+        if state is None:
+            return {'variant': name, 'error': 'not ready'}
+        ready_s = time.perf_counter() - start
+
+        client = Client(f'http://127.0.0.1:{args.port}', '/upload', args.timeout)
+        body, content_type = payloads[0]
+        request_start = time.perf_counter()
+        success, status, error = client.post(body, content_type)
+        first_ms = (time.perf_counter() - request_start) * 1000
+        first_invoice_s = time.perf_counter() - start
+
+        # Eşzamanlı istemcilerle her worker'a fatura düşsün (tembel yüklemede modeller ancak şimdi yüklenir)
+        concurrency = args.workers * args.threads * 2
+        with ThreadPoolExecutor(concurrency) as pool:
+            list(pool.map(lambda index: client.post(*payloads[index % len(payloads)]), range(concurrency * 2)))
+        workers = [dict(memory_mb(pid), pid=pid) for pid in child_pids(server.pid)]
+        master = memory_mb(server.pid)
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+    count = max(len(workers), 1)
+    return {
+        'variant': name,
+        'time_to_ready_s': round(ready_s, 2),
+        'time_to_first_invoice_s': round(first_invoice_s, 2),
+        'first_request_ms': round(first_ms, 1),
+        'first_success': success,
+        'first_error': None if success else f'{status} {error}',
+        'warmup_status': state.get('status'),
+        'warmup_ms': state.get('elapsed_ms'),
+        'master_rss_mb': master['rss_mb'],
+        'worker_uss_mb': round(sum(worker['uss_mb'] for worker in workers) / count, 1),
+        'worker_pss_mb': round(sum(worker['pss_mb'] for worker in workers) / count, 1),
+        'worker_rss_mb': round(sum(worker['rss_mb'] for worker in workers) / count, 1),
+        'total_pss_mb': round(sum(worker['pss_mb'] for worker in workers) + master['pss_mb'], 1),
+        'workers': workers,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time-to-first-invoice and per-worker memory with/without warm-up')
+    parser.add_argument('--app', default='app:create_app("production")', help='WSGI app or factory')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--port', type=int, default=5056)
+    parser.add_argument('--variants', nargs='+', choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument('--line-items', type=int, default=15)
+    parser.add_argument('--timeout', type=float, default=300.0)
+    parser.add_argument('--output', help='Write results as JSON')
+    args = parser.parse_args()
+
+    payloads = load_payloads(None, 4, args.line_items, seed=7)
+    rows = [run_variant(name, args, payloads) for name in args.variants]
+
+    print_table(rows, ['variant', 'time_to_ready_s', 'time_to_first_invoice_s', 'first_request_ms',
+                       'warmup_status', 'worker_uss_mb', 'worker_pss_mb', 'worker_rss_mb', 'total_pss_mb'])
+    for row in rows:
+        if row.get('first_error'):
+            print(f"{row['variant']}: first request failed: {row['first_error']}")
+        if row.get('workers'):
+            print(f"\n{row['variant']} workers:")
+            print_table(row['workers'], ['pid', 'uss_mb', 'pss_mb', 'rss_mb', 'shared_mb'])
+    if args.output:
+        save_json(args.output, {'params': vars(args), 'results': rows})
+
+
+if __name__ == '__main__':
+    main()
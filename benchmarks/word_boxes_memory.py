@@ -0,0 +1,105 @@
+"""Sayfa başına kelime kutusu belleği: pytesseract Output.DICT ve WordBoxes.
+
+Görüntü klasörü verilirse gerçek image_to_data çıktısı, verilmezse --words
+kadar kelimelik sentetik sayfa kullanılır.
+
+Kullanım:
+    python -m benchmarks.word_boxes_memory data/corpus --output bench/word_boxes.json
+    python -m benchmarks.word_boxes_memory --words 600
+"""
+import argparse
+import random
+import sys
+import time
+from app.core.word_boxes import WordBoxes
+from benchmarks.common import iter_images, save_json, print_table
+
+SAMPLE_WORDS = ['FATURA', 'Tarih:', '12.05.2023', 'TOPLAM', 'KDV', '1.234,56', 'Adet', 'Birim', 'TL']
+
+
+def deep_size(value, seen=None) -> int:
+    """Nesnenin ve içerdiği nesnelerin toplam boyutu (paylaşılanlar bir kez)"""
+    seen = seen if seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(deep_size(item, seen) for item in value)
+    return size
+
+
+def synthetic_page(words: int, height: int = 1400):
+    """image_to_data biçiminde sentetik sayfa (satır başına ~8 kelime)"""
+    data = {key: [] for key in ('level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+                                'left', 'top', 'width', 'height', 'conf', 'text')}
+    for i in range(words):
+        line = i // 8
+        values = {'level': 5, 'page_num': 1, 'block_num': 1 + line // 10, 'par_num': 1,
+                  'line_num': 1 + line % 10, 'word_num': 1 + i % 8, 'left': 40 + (i % 8) * 110,
+                  'top': 30 + line * 22 % height, 'width': random.randint(30, 100),
+                  'height': 18, 'conf': round(random.uniform(40, 96), 6),
+                  'text': random.choice(SAMPLE_WORDS)}
+        for key, value in values.items():
+            data[key].append(value)
+    return data, height
+
+
+def measure(name, data, page_height):
+    start = time.perf_counter()
+    boxes = WordBoxes.from_tesseract(data, page_height)
+    build_ms = (time.perf_counter() - start) * 1000
+    payload = boxes.to_bytes()
+
+    start = time.perf_counter()
+    WordBoxes.from_bytes(payload)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    dict_bytes = deep_size(data)
+    compact_bytes = boxes.boxes.nbytes + sys.getsizeof(boxes.text)
+    return {
+        'page': name,
+        'words': len(boxes),
+        'dict_kb': round(dict_bytes / 1024, 1),
+        'compact_kb': round(compact_bytes / 1024, 1),
+        'ratio': round(dict_bytes / compact_bytes, 1) if compact_bytes else 0,
+        'bytes_per_word': round(compact_bytes / len(boxes), 1) if len(boxes) else 0,
+        'serialized_kb': round(len(payload) / 1024, 1),
+        'build_ms': round(build_ms, 2),
+        'load_ms': round(load_ms, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Word box memory per page: dict vs structured array')
+    parser.add_argument('folder', nargs='?', help='Folder of invoice images (needs tesseract)')
+    parser.add_argument('--words', type=int, default=500, help='Synthetic page size when no folder is given')
+    parser.add_argument('--output', help='Write results as JSON')
+    args = parser.parse_args()
+
+    rows = []
+    if args.folder:
+        import cv2
+        import pytesseract
+        for path in iter_images(args.folder):
+            image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+            if image is None:
+                continue
+            data = pytesseract.image_to_data(image, config='--oem 3 --psm 6',
+                                             output_type=pytesseract.Output.DICT)
+            rows.append(measure(path, data, image.shape[0]))
+    else:
+        data, height = synthetic_page(args.words)
+        rows.append(measure(f'synthetic-{args.words}', data, height))
+
+    print_table(rows, ['page', 'words', 'dict_kb', 'compact_kb', 'ratio', 'bytes_per_word',
+                       'serialized_kb', 'build_ms', 'load_ms'])
+
+    if args.output:
+        save_json(args.output, {'results': rows})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""OCR gerektirmeyen komutlar için hafif giriş noktası
+
+main.py TensorFlow ayarlarını yapar ve uygulamayı import sırasında kurar.
+Bu dosya ise sadece Flask ve SQLAlchemy'yi yükler: modeller ısıtılmaz,
+cv2 / pytesseract / spaCy hiç içe aktarılmaz.
+
+Kullanım:
+    flask --app cli db upgrade
+    python cli.py export-invoices --output invoices.csv
+    python cli.py export-line-items --vendor "ACME A.S." --format json
+    python cli.py stats
+"""
+import csv
+import json
+import os
+import sys
+from datetime import datetime
+import click
+from flask.cli import FlaskGroup
+from app import create_app, db
+from app.models.invoice import Invoice, InvoiceLineItem
+
+app = create_app(os.environ.get('APP_CONFIG', 'development'), warm=False)
+
+INVOICE_FIELDS = ('id', 'filename', 'date', 'vendor', 'amount', 'category', 'invoice_number', 'tax_id',
+                  'tax_amount', 'confidence', 'created_at')
+LINE_ITEM_FIELDS = ('invoice_id', 'vendor', 'date', 'line_no', 'product_code', 'description', 'quantity', 'unit',
+                    'unit_price', 'total')
+
+
+def _write_rows(rows, fields, output, fmt):
+    """Satırları CSV ya da JSON Lines olarak yaz; hepsi belleğe alınmaz"""
+    stream = open(output, 'w', encoding='utf-8', newline='') if output else sys.stdout
+    try:
+        if fmt == 'csv':
+            writer = csv.DictWriter(stream, fieldnames=fields)
+            writer.writeheader()
+        count = 0
+        for row in rows:
+            if fmt == 'csv':
+                writer.writerow(row)
+            else:
+                stream.write(json.dumps(row, ensure_ascii=False, default=str) + '\n')
+            count += 1
+        return count
+    finally:
+        if output:
+            stream.close()
+
+
+def _since(value):
+    return datetime.strptime(value, '%Y-%m-%d') if value else None
+
+
+@app.cli.command('export-invoices')
+@click.option('--output', help='Output file (default: stdout)')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'json']), default='csv')
+@click.option('--since', help='Only invoices dated on or after YYYY-MM-DD')
+def export_invoices(output, fmt, since):
+    """Export invoices without their raw OCR text."""
+    query = Invoice.query.order_by(Invoice.id)
+    if since:
+        query = query.filter(Invoice.date >= _since(since))
+    rows = ({field: getattr(invoice, field) for field in INVOICE_FIELDS} for invoice in query.yield_per(1000))
+    count = _write_rows(rows, INVOICE_FIELDS, output, fmt)
+    click.echo(f"Exported {count} invoices", err=True)
+
+
+@app.cli.command('export-line-items')
+@click.option('--output', help='Output file (default: stdout)')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'json']), default='csv')
+@click.option('--vendor', help='Only this vendor')
+@click.option('--product-code', help='Only this product code')
+@click.option('--since', help='Only invoices dated on or after YYYY-MM-DD')
+def export_line_items(output, fmt, vendor, product_code, since):
+    """Export invoice line items joined with vendor and date."""
+    rows = (
+        dict({field: getattr(item, field) for field in LINE_ITEM_FIELDS[3:]},
+             invoice_id=item.invoice_id, vendor=item_vendor, date=item_date)
+        for item, item_vendor, item_date in InvoiceLineItem.stream(vendor, product_code, _since(since))
+    )
+    count = _write_rows(rows, LINE_ITEM_FIELDS, output, fmt)
+    click.echo(f"Exported {count} line items", err=True)
+
+
+@app.cli.command('stats')
+@click.option('--top', type=int, default=10, help='Number of vendors to list')
+def stats(top):
+    """Invoice and line item counts, top vendors by invoice count."""
+    click.echo(f"invoices:   {Invoice.query.count()}")
+    click.echo(f"line items: {InvoiceLineItem.query.count()}")
+    vendors = db.session.query(Invoice.vendor, db.func.count(Invoice.id), db.func.sum(Invoice.amount)) \
+        .filter(Invoice.vendor.isnot(None), Invoice.vendor != '') \
+        .group_by(Invoice.vendor).order_by(db.func.count(Invoice.id).desc()).limit(top).all()
+    for vendor, count, amount in vendors:
+        click.echo(f"  {count:6d}  {amount or 0:12.2f}  {vendor}")
+
+
+cli = FlaskGroup(create_app=lambda: app)
+
+if __name__ == '__main__':
+    cli()
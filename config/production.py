@@ -1,3 +1,5 @@
+import os
+
 class ProductionConfig:
     DEBUG = False
     SECRET_KEY = 'your-production-secret-key'  # Güvenli bir key kullanın
@@ -9,10 +11,107 @@ class ProductionConfig:
     SQLALCHEMY_DATABASE_URI = 'sqlite:///invoices.db'  # Production'da farklı bir DB kullanabilirsiniz
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Kalite kontrol ayarları
+    QUALITY_GATE_ENABLED = True
+    QUALITY_THUMBNAIL_SIZE = 640
+    QUALITY_MIN_BLUR_VARIANCE = 15.0
+    QUALITY_MIN_DPI = 60.0
+    QUALITY_ENHANCE_DPI = 150.0
+    
+    # Sayfa yönü ayarları
+    ORIENTATION_PROBE_SIZE = 1000
+    ORIENTATION_USE_OSD = True
+    ORIENTATION_CACHE_SIZE = 1000
+    
     # OCR ayarları
     OCR_MAX_DIMENSION = 1800
     OCR_LANGUAGES = ['tr', 'en']
     
+    # Kademeli OCR ayarları
+    OCR_FAST_MAX_DIMENSION = 1200
+    OCR_FAST_LANGUAGE = 'en'
+    OCR_CASCADE_MIN_CONFIDENCE = 60
+
+    # Ön işleme / Tesseract ayarları (scripts/tune_parameters.py önerisiyle güncellenir)
+    OCR_CLAHE_CLIP_LIMIT = 2.0
+    OCR_THRESHOLD_BLOCK_SIZE = 11  # Tek sayı olmalı
+    OCR_THRESHOLD_C = 2
+    OCR_FAST_PSM = 6
+    OCR_FULL_PSM = 3  # Tesseract varsayılanı
+    OCR_REGION_SPLIT = (0.3, 0.7)  # Başlık/gövde/alt bilgi sınırları (sayfa yüksekliği oranı)
+    
+    # Dil tespiti ayarları (OCR_LANGUAGES izin verilen settir)
+    LANGUAGE_PROBE_WIDTH = 1000
+    LANGUAGE_MIN_MARGIN = 2.0
+    LANGUAGE_CACHE_SIZE = 1000
+    
+    # Satıcı profilleri (config/vendor_profiles/*.json)
+    VENDOR_PROFILE_DIR = os.path.join('config', 'vendor_profiles')
+    VENDOR_NAME_SCAN_LINES = 8  # Ad eşleştirmesinde bakılan ilk satır sayısı
+    VENDOR_NAME_MIN_MATCH = 0.75  # Adın metinde geçmesi gereken kelime oranı
+    VENDOR_FINGERPRINT_MAX_DISTANCE = 6  # Antet hash'i için en fazla bit farkı
+    
+    # Satıcı adı çözümleme (OCR ile bozulmuş adlar -> kanonik ad)
+    VENDOR_RESOLVER_ENABLED = True
+    VENDOR_RESOLVER_MAX_DISTANCE = 2
+    VENDOR_RESOLVER_PREFIX_LENGTH = 7  # Silme indeksine giren önek uzunluğu
+    VENDOR_RESOLVER_CHARS_PER_EDIT = 5  # Kısa adlarda izin verilen düzenleme: uzunluk / 5
+
+    # Kalem tablosu çıkarımı
+    TABLE_MIN_COLUMN_GAP = 1.5  # Sütun ayıran en küçük boşluk (kelime yüksekliği katı)
+    TABLE_ROW_GAP = 0.5  # Yeni tablo satırı başlatan dikey merkez farkı (kelime yüksekliği katı)
+    TABLE_SUBTOTAL_TOLERANCE = 0.05  # Satır toplamı ile ara toplam arasındaki izinli fark
+
+    # Tutar/tarih normalleştirme
+    NORMALIZER_DEFAULT_DATE_FORMAT = 'dmy'  # Belirsiz '03/04/2023' için: 'dmy' veya 'mdy'
+    NORMALIZER_CACHE_SIZE = 1000  # Biçimi hatırlanan en fazla satıcı
+
+    # Aşama süreleri ve önbellek sayaçları (/metrics, Prometheus metin biçimi)
+    METRICS_ENABLED = True
+
+    # İstek profili (X-Profile: 1 + X-Admin-Token başlığı ya da rastgele örnekleme)
+    PROFILING_ENABLED = True  # Belirteç ayarlı değilse sadece örnekleme tetikler
+    PROFILING_SAMPLE_RATE = 0.0  # Rastgele profillenen istek oranı (0-1)
+    PROFILING_MODE = 'cprofile'  # 'cprofile' veya 'sampling' (yığın örnekleme, daha düşük ek yük)
+    PROFILING_SAMPLE_INTERVAL = 0.005  # Örnekleme aralığı (saniye)
+    PROFILING_DIR = os.path.join('cache', 'profiles')
+    PROFILING_MAX_PROFILES = 50
+    PROFILING_ADMIN_TOKEN = os.environ.get('PROFILING_ADMIN_TOKEN')
+
+    # Log: kuyruk + ayrı thread'de JSON yazımı
+    LOG_JSON = True
+    LOG_LEVEL = 'INFO'
+    LOG_FILE = None  # None: stderr
+    LOG_MAX_FIELD_CHARS = 2000  # Daha uzun mesaj/metin alanları kısaltılıp özetlenir
+    LOG_DEBUG_SAMPLE_RATE = 0.01  # Büyük DEBUG dökümlerinin yazılan oranı
+
+    # Başlangıç ısınması: modeller fork öncesi yüklenir, /ready ancak sonra hazır der
+    WARMUP_ENABLED = os.environ.get('WARMUP_ENABLED', '1') == '1'
+    WARMUP_NER_LANGUAGES = None  # None: sadece NER_DEFAULT_LANGUAGE (NER_MAX_MODELS'i aşmayın)
+    WARMUP_GC_FREEZE = True  # Isınma sonrası gc.freeze(): worker'lar sayfaları copy-on-write paylaşır
+
+    # Sunucu boyutlandırma (run.py, gunicorn gthread): None değerler çekirdek ve bellekten hesaplanır
+    SERVER_WORKERS = None
+    SERVER_THREADS = None
+    SERVER_MEMORY_BUDGET_MB = None  # None: cgroup sınırı ya da MemAvailable
+    SERVER_SHARED_MEMORY_MB = 800  # Master'da ısınan modeller, worker'larla paylaşılır
+    SERVER_WORKER_MEMORY_MB = 350  # Isınma sonrası worker başına özel bellek (USS)
+    SERVER_THREAD_MEMORY_MB = 80  # Eşzamanlı istek başına görüntü/OCR tamponları
+    SERVER_CONCURRENCY_PER_CORE = 2  # Çekirdek başına eşzamanlı istek hedefi
+    SERVER_MAX_THREADS = 8
+    SERVER_MAX_REQUESTS = 1000  # Bellek büyümesine karşı worker yenileme; ısınmış master'dan fork edilir
+    
+    # NER ayarları - modeller dile göre tembel yüklenir
+    NER_MODELS = {'en': 'en_core_web_lg', 'tr': 'tr_core_news_lg'}
+    NER_DEFAULT_LANGUAGE = 'en'
+    NER_MAX_MODELS = len(NER_MODELS)  # Worker başına model sayısı; asıl sınırı NER_MAX_MODEL_MEMORY_MB koyar
+    NER_MAX_MODEL_MEMORY_MB = None
+    NER_PIPELINE_DIR = os.path.join('models', 'ner')  # scripts/build_ner_pipeline.py çıktısı
+    NER_MEMO_ENABLED = True
+    NER_MEMO_SIZE = 1000
+    NER_MEMO_SPILL_DIR = None  # Bellekten taşan kayıtlar için disk dizini
+    NER_MEMO_SPILL_MAX_FILES = 10000  # Disk kayıt sınırı; aşılınca en eskiler silinir
+    
     # OCR ayarları
     OCR_ENGINE = 'tesseract'
     TESSERACT_CMD = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
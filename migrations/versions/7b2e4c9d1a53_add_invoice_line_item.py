@@ -0,0 +1,43 @@
+"""Add invoice line items
+
+Revision ID: 7b2e4c9d1a53
+Revises: 305f25d0978c
+Create Date: 2026-10-19 10:12:44.218306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b2e4c9d1a53'
+down_revision = '305f25d0978c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('invoice_line_item',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('invoice_id', sa.Integer(), nullable=False),
+    sa.Column('line_no', sa.Integer(), nullable=False),
+    sa.Column('product_code', sa.String(length=100), nullable=True),
+    sa.Column('description', sa.String(length=500), nullable=True),
+    sa.Column('quantity', sa.Float(), nullable=True),
+    sa.Column('unit', sa.String(length=20), nullable=True),
+    sa.Column('unit_price', sa.Numeric(precision=12, scale=2), nullable=True),
+    sa.Column('total', sa.Numeric(precision=12, scale=2), nullable=True),
+    sa.ForeignKeyConstraint(['invoice_id'], ['invoice.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('invoice_line_item', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_invoice_line_item_invoice_id'), ['invoice_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_invoice_line_item_product_code'), ['product_code'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('invoice_line_item', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_invoice_line_item_product_code'))
+        batch_op.drop_index(batch_op.f('ix_invoice_line_item_invoice_id'))
+
+    op.drop_table('invoice_line_item')
@@ -1,12 +1,21 @@
+import os
 from main import create_app
-import multiprocessing
+from app import warm_up
+from app.utils.server_sizing import plan_server
 
 # Uygulama instance'ını oluştur
 app = create_app()
 
 if __name__ == '__main__':
-    # CPU çekirdek sayısının 2 katı kadar worker
-    workers = multiprocessing.cpu_count() * 2
+    # Modeller fork öncesi master'da yüklenir (preload_app), worker'lar paylaşır
+    warm_up(app)
+
+    # Worker sayısı çekirdek ve bellek bütçesinden; her worker gthread ile çoklu istek alır
+    plan = plan_server(app.config)
+    app.logger.info("Server plan: %s", plan)
+
+    # Eşzamanlı isteklerin Tesseract süreçleri çekirdekleri OpenMP thread'leriyle paylaşmasın
+    os.environ.setdefault('OMP_THREAD_LIMIT', '1')
     
     # Gunicorn ile çalıştır
     import gunicorn.app.base
@@ -28,11 +37,15 @@ if __name__ == '__main__':
 
     options = {
         'bind': '127.0.0.1:5000',
-        'workers': workers,
-        'worker_class': 'uvicorn.workers.UvicornWorker',
+        'workers': plan['workers'],
+        # Flask bir WSGI uygulaması; gthread worker'ı (ASGI UvicornWorker değil)
+        'worker_class': 'gthread',
+        'threads': plan['threads'],
         'timeout': 120,
         'keepalive': 5,
-        'preload_app': True
+        'preload_app': True,
+        'max_requests': app.config.get('SERVER_MAX_REQUESTS', 1000),
+        'max_requests_jitter': app.config.get('SERVER_MAX_REQUESTS', 1000) // 10
     }
 
     StandaloneApplication(app, options).run() 
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""Çalışma anında yüklenecek hafif NER pipeline'larını diske derle.
+
+Her dil için sadece `ner` (ve dinlediği tok2vec) ile önceden derlenmiş
+entity ruler kalır; vektörler doğruluk izin veriyorsa atılır. --vectors drop
+uyum düşükse (değerlendirme metni yoksa yerleşik duman testi metinleriyle)
+pipeline'ı yazmadan hata verir.
+
+Kullanım:
+    python -m scripts.build_ner_pipeline --output models/ner --eval-dir data/ocr_texts
+"""
+import argparse
+import json
+import os
+import time
+import spacy
+from app.core.ner.patterns import PATTERNS, PATTERNS_VERSION, EXCLUDED_COMPONENTS
+from config import config as app_config
+
+# Doğruluk kontrolünde vektörsüz pipeline'dan beklenen en düşük entity uyumu
+MIN_AGREEMENT = 0.98
+
+# --eval-dir verilmeden --vectors drop istenirse kullanılan duman testi metinleri
+SMOKE_TEXTS = [
+    'ACME Trading Ltd\nInvoice No: INV-20931\nDate: 12 March 2024\nTotal: 1,250.00 USD',
+    'Northwind Traders Ltd, 42 King Street, London. Payment due on 30 April 2024.',
+    'YILDIZ GIDA SAN. LTD. ŞTİ.\nAtatürk Cad. NO 12/3 Kadıköy İstanbul\nFatura Tarihi: 01.02.2024\nTOPLAM 3.540,00 TL',
+    'Microsoft Corporation billed Contoso Inc. $4,300 for services delivered in Seattle in January.',
+]
+
+
+def needed_components(nlp):
+    """NER'in ihtiyaç duyduğu bileşenler: ner ve ner'in dinlediği tok2vec/transformer"""
+    keep = {'ner'}
+    for name in ('tok2vec', 'transformer'):
+        if name in nlp.pipe_names:
+            listeners = getattr(nlp.get_pipe(name), 'listening_components', [])
+            if 'ner' in listeners:
+                keep.add(name)
+    return keep
+
+
+def build_slim(model_name, drop_vectors=False):
+    """Paket modelinden sadece NER + entity ruler içeren pipeline oluştur"""
+    full = spacy.load(model_name)
+    keep = needed_components(full)
+    exclude = sorted(set(full.pipe_names) - keep)
+    del full
+
+    nlp = spacy.load(model_name, exclude=exclude)
+    ruler = nlp.add_pipe('entity_ruler', before='ner')
+    ruler.add_patterns(PATTERNS)
+    nlp.meta['invoice_patterns_version'] = PATTERNS_VERSION
+
+    if drop_vectors:
+        nlp.vocab.reset_vectors(width=0)
+    return nlp
+
+
+def entity_set(nlp, texts):
+    """Metinlerdeki (başlangıç, bitiş, etiket) kümesi"""
+    return [
+        {(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents}
+        for doc in nlp.pipe(texts)
+    ]
+
+
+def agreement(reference, candidate):
+    """İki entity listesi arasındaki ortalama Jaccard uyumu"""
+    scores = []
+    for ref, cand in zip(reference, candidate):
+        union = ref | cand
+        scores.append(len(ref & cand) / len(union) if union else 1.0)
+    return sum(scores) / len(scores) if scores else 1.0
+
+
+def load_texts(folder):
+    if not folder:
+        return []
+    texts = []
+    for name in sorted(os.listdir(folder)):
+        if name.endswith('.txt'):
+            with open(os.path.join(folder, name), encoding='utf-8') as f:
+                texts.append(f.read())
+    return texts
+
+
+def build(language, model_name, output_dir, vectors, texts):
+    """Tek dil için pipeline'ı derle ve diske yaz"""
+    start = time.perf_counter()
+    nlp = build_slim(model_name)
+    report = {'language': language, 'model': model_name, 'components': nlp.pipe_names}
+
+    if vectors == 'drop' or (vectors == 'auto' and texts):
+        # Değerlendirme metni yoksa en azından duman testi: vektörsüz pipeline denetlenmeden yazılmaz
+        check_texts = texts or SMOKE_TEXTS
+        report['eval_texts'] = len(texts) if texts else f'{len(SMOKE_TEXTS)} smoke'
+        slim, score = None, None
+        try:
+            slim = build_slim(model_name, drop_vectors=True)
+            score = agreement(entity_set(nlp, check_texts), entity_set(slim, check_texts))
+        except Exception as e:
+            # Statik vektör kullanan NER modelleri vektörsüz çalışamaz
+            report['vector_drop_error'] = str(e)
+        report['vector_free_agreement'] = score
+        if score is not None and score >= MIN_AGREEMENT:
+            nlp = slim
+            report['vectors_dropped'] = True
+        elif vectors == 'drop':
+            # Çalışma anı bu dizini paket modeline tercih eder; bozuk pipeline yazılmaz
+            raise SystemExit(
+                f"{language}: vector-free pipeline agrees {score} with {model_name} "
+                f"(minimum {MIN_AGREEMENT}); not writing it. Use --vectors keep or auto.")
+    report.setdefault('vectors_dropped', False)
+
+    path = os.path.join(output_dir, language)
+    nlp.to_disk(path)
+    report['path'] = path
+    report['build_seconds'] = round(time.perf_counter() - start, 1)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build slim serialized NER pipelines')
+    parser.add_argument('--config', default='default', help='Config name for NER_MODELS')
+    parser.add_argument('--output', help='Output directory (defaults to NER_PIPELINE_DIR)')
+    parser.add_argument('--languages', help='Comma separated subset of NER_MODELS keys')
+    parser.add_argument('--vectors', choices=['keep', 'drop', 'auto'], default='auto',
+                        help='auto drops vectors only if entity agreement on --eval-dir stays high; '
+                             'drop fails the build if agreement (on --eval-dir or built-in smoke texts) is low')
+    parser.add_argument('--eval-dir', help='Folder of OCR .txt files for the accuracy check')
+    args = parser.parse_args()
+
+    cfg = app_config[args.config]
+    models = getattr(cfg, 'NER_MODELS', {'en': 'en_core_web_lg'})
+    output_dir = args.output or getattr(cfg, 'NER_PIPELINE_DIR', os.path.join('models', 'ner'))
+    languages = args.languages.split(',') if args.languages else list(models)
+    texts = load_texts(args.eval_dir)
+
+    reports = [build(lang, models[lang], output_dir, args.vectors, texts) for lang in languages]
+    print(json.dumps({'excluded_at_runtime': EXCLUDED_COMPONENTS, 'pipelines': reports},
+                     indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""Uygulamanın import süresini `python -X importtime` ile ölç; gerilemede hata ver.
+
+Her hedef ayrı ve temiz bir süreçte --repeat kez içe aktarılır, en üst düzey
+modüllerin kümülatif süreleri toplanır (yorumlayıcı açılışı hariç). Komut şu
+durumlarda 1 ile çıkar:
+  * hedeflerden biri OCR/NER kütüphanelerini (cv2, pytesseract, spaCy...) yüklüyorsa,
+  * medyan süre --max-ms bütçesini aşıyorsa,
+  * --baseline verildiyse ve süre --threshold oranından fazla artmışsa.
+
+Kullanım:
+    python -m scripts.check_import_time --output bench/import_time.json
+    python -m scripts.check_import_time --baseline bench/import_time.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+from benchmarks.common import compare_to_baseline, print_table, save_json, summarize
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# hedef -> içe aktarma ifadesi
+TARGETS = {
+    'app': 'import app',
+    'routes': 'import app.web.routes',
+    'cli': 'import cli',
+}
+
+# Sadece bir işlem hattı aşaması çalışınca yüklenmesi gereken paketler
+HEAVY_MODULES = ('cv2', 'pytesseract', 'spacy', 'thinc', 'tensorflow', 'torch', 'PIL', 'numpy')
+
+
+def parse_importtime(stderr: str, startup: Set[str] = frozenset()) -> Tuple[float, Dict[str, float], List[str]]:
+    """(toplam ms, modül -> kümülatif ms (ilk iki düzey), yüklenen tüm modüller)
+
+    startup: yorumlayıcı açılışında (site, encodings...) yüklenen modüller, sayılmaz.
+    """
+    total_us = 0
+    breakdown = {}
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # başlık satırı
+        name = parts[2].rstrip()
+        module = name.strip()
+        # İç içe importlar iki boşlukla girintilenir; en üst düzey tek boşlukla başlar
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0 and module in startup:
+            continue
+        modules.append(module)
+        if depth == 0:
+            total_us += int(parts[1])
+        if depth <= 1:
+            breakdown[module] = int(parts[1]) / 1000
+    return total_us / 1000, breakdown, modules
+
+
+def run_importtime(statement: str) -> str:
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=REPO_ROOT,
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        tail = completed.stderr.strip().splitlines()[-1:] or ['']
+        raise SystemExit(f"'{statement}' failed: {tail[0]}")
+    return completed.stderr
+
+
+def measure(statement: str, repeat: int, startup: Set[str]) -> Tuple[List[float], Dict[str, float], List[str]]:
+    samples = []
+    breakdown = defaultdict(float)
+    modules = []
+    for _ in range(repeat):
+        total_ms, run_breakdown, modules = parse_importtime(run_importtime(statement), startup)
+        samples.append(total_ms)
+        for module, elapsed_ms in run_breakdown.items():
+            breakdown[module] += elapsed_ms / repeat
+    return samples, dict(breakdown), modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check import time of the app and CLI entry points')
+    parser.add_argument('--targets', nargs='+', choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreter runs per target')
+    parser.add_argument('--max-ms', type=float, default=1500.0, help='Absolute budget for the median per target')
+    parser.add_argument('--baseline', help='Earlier --output file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed relative regression vs baseline')
+    parser.add_argument('--min-delta-ms', type=float, default=30.0, help='Ignore smaller absolute regressions')
+    parser.add_argument('--top', type=int, default=8, help='Heaviest imports to show per target')
+    parser.add_argument('--output', help='Write results as JSON')
+    args = parser.parse_args()
+
+    _, _, startup = parse_importtime(run_importtime('pass'))
+    results = {}
+    failures = []
+    for target in args.targets:
+        samples, breakdown, modules = measure(TARGETS[target], args.repeat, set(startup))
+        summary = summarize(samples)
+        heavy = sorted({module for module in modules if module.split('.')[0] in HEAVY_MODULES})
+        results[target] = dict(summary, heavy_modules=heavy, breakdown=breakdown)
+
+        print(f"\n{target} ({TARGETS[target]}): p50 {summary['p50_ms']:.0f} ms, min {summary['min_ms']:.0f} ms")
+        print_table([{'module': module, 'cumulative_ms': round(elapsed_ms, 1)} for module, elapsed_ms in
+                     sorted(breakdown.items(), key=lambda item: -item[1])[:args.top]],
+                    ['module', 'cumulative_ms'])
+        if heavy:
+            roots = sorted({module.split('.')[0] for module in heavy})
+            failures.append(f"{target} imports heavy modules: {', '.join(roots)}")
+        if summary['p50_ms'] > args.max_ms:
+            failures.append(f"{target} takes {summary['p50_ms']:.0f} ms (budget {args.max_ms:.0f} ms)")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows = compare_to_baseline(results, baseline.get('targets', {}), args.threshold, args.min_delta_ms)
+        print(f"\nvs {args.baseline}, threshold {args.threshold:.0%}:")
+        print_table(rows, ['stage', 'baseline', 'current', 'change_pct', 'regressed'])
+        failures.extend(f"{row['stage']} regressed {row['change_pct']}% vs baseline"
+                        for row in rows if row['regressed'])
+
+    if args.output:
+        save_json(args.output, {'python': sys.version.split()[0], 'targets': results})
+
+    if failures:
+        print('\nFAILED:\n  ' + '\n  '.join(failures))
+        sys.exit(1)
+    print('\nOK')
+
+
+if __name__ == '__main__':
+    main()
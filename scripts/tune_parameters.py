@@ -0,0 +1,308 @@
+"""Etiketli fatura klasöründe ön işleme ve Tesseract parametrelerini ara.
+
+Her görüntünün yanında aynı adlı bir .json etiket dosyası bulunur
+(benchmarks.synthetic_invoices biçimi: vendor, invoice_number, date
+'YYYY-MM-DD', total_amount, tax_amount). Parametre uzayından seçilen her
+ayar için her belge çekirdekler arasında paralel işlenir; yükleme dahil
+duvar saati süresi ve _extract_invoice_data'nın alan doğruluğu ölçülür.
+
+Çıktı: doğruluk / süre Pareto cephesi ve en iyi doğruluğun --tolerance
+kadar altında kalan en hızlı ayar (config sınıfına yapıştırılacak satırlar).
+Sonuçlar (ayar, belge özeti, Tesseract sürümü) anahtarıyla --cache
+dosyasına yazılır; tekrar çalıştırmada sadece yeni kombinasyonlar işlenir.
+Önbellekten gelen süreler ilk ölçüldükleri makine yükünü yansıtır.
+
+Kullanım:
+    python -m scripts.tune_parameters data/labeled --trials 40 --workers 8 --output bench/tuning.json
+    python -m scripts.tune_parameters data/labeled --tier fast --trials 0
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import logging
+import os
+import random
+import shutil
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+import cv2
+import pytesseract
+from app.core.normalizer import Normalizer
+from app.core.ocr_processor import OCRProcessor, REGION_SPLIT
+from app.core.vendor_resolver import normalize_vendor
+from benchmarks.common import iter_images, percentile, print_table, save_json
+from config import config as configs
+
+# Katman başına aranan parametre değerleri
+PARAM_SPACES = {
+    'full': {
+        'OCR_CLAHE_CLIP_LIMIT': [1.0, 2.0, 3.0, 4.0],
+        'OCR_THRESHOLD_BLOCK_SIZE': [11, 15, 21, 31],
+        'OCR_THRESHOLD_C': [2, 5, 10],
+        'OCR_MAX_DIMENSION': [1200, 1500, 1800, 2400],
+        'OCR_REGION_SPLIT': [(0.2, 0.8), (0.25, 0.75), (0.3, 0.7), (0.35, 0.65)],
+        'OCR_FULL_PSM': [3, 4, 6, 11],
+    },
+    'fast': {
+        'OCR_FAST_MAX_DIMENSION': [800, 1000, 1200, 1600],
+        'OCR_REGION_SPLIT': [(0.2, 0.8), (0.25, 0.75), (0.3, 0.7), (0.35, 0.65)],
+        'OCR_FAST_PSM': [3, 4, 6, 11],
+    },
+}
+FIELDS = ('vendor', 'invoice_number', 'date', 'total_amount', 'tax_amount')
+
+# Worker süreci başına ayar -> OCRProcessor
+_processors: Dict[str, OCRProcessor] = {}
+
+
+def file_hash(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def params_key(params: Dict[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True)
+
+
+def candidate_params(tier: str, defaults: Dict[str, Any], trials: int, seed: int) -> List[Dict[str, Any]]:
+    """Mevcut ayar her zaman ilk aday; trials > 0 ise ızgaradan karıştırılmış önek
+
+    Karıştırma tohumla sabit olduğundan trials artırıldığında önceki adaylar korunur
+    ve önbellekten gelir.
+    """
+    space = PARAM_SPACES[tier]
+    names = sorted(space)
+    grid = [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+    random.Random(seed).shuffle(grid)
+    baseline = {name: defaults[name] for name in names}
+    candidates = [baseline] + [params for params in grid if params != baseline]
+    return candidates if trials <= 0 else candidates[:trials + 1]
+
+
+def load_page(path: str, max_dimension: int):
+    """DocumentProcessor._load_image ile aynı yükleme ve küçültme"""
+    image = cv2.imread(path)
+    if image is None:
+        return None
+    height, width = image.shape[:2]
+    if height > max_dimension or width > max_dimension:
+        scale = max_dimension / max(height, width)
+        image = cv2.resize(image, (int(width * scale), int(height * scale)))
+    return image
+
+
+def score_fields(data: Dict[str, Any], truth: Dict[str, Any], normalizer: Normalizer) -> Dict[str, bool]:
+    """Etikette bulunan alanlar için doğru / yanlış"""
+    scores = {}
+    for field in FIELDS:
+        expected = truth.get(field)
+        if expected in (None, ''):
+            continue
+        value = data.get(field)
+        if field == 'vendor':
+            scores[field] = normalize_vendor(value) == normalize_vendor(expected)
+        elif field == 'invoice_number':
+            scores[field] = ''.join(str(value or '').split()).lower() == ''.join(str(expected).split()).lower()
+        elif field == 'date':
+            parsed = normalizer.parse_date(str(value or ''))
+            scores[field] = parsed is not None and parsed.strftime('%Y-%m-%d') == expected
+        else:
+            scores[field] = abs(normalizer.parse_float(value) - float(expected)) < 0.01
+    return scores
+
+
+def _init_worker():
+    # Süreçler çekirdek başına bir; Tesseract ve OpenCV kendi thread'lerini açmasın
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+    cv2.setNumThreads(1)
+    logging.disable(logging.ERROR)
+
+
+def evaluate(settings: Dict[str, Any], params: Dict[str, Any], tier: str, path: str,
+             truth: Dict[str, Any]) -> Dict[str, Any]:
+    """Tek ayar + tek belge: alan doğruluğu ve duvar saati süresi"""
+    key = params_key(params)
+    processor = _processors.get(key)
+    if processor is None:
+        processor = _processors[key] = OCRProcessor({**settings, **params})
+    # Satıcı biçim önbelleği belgeler arasında taşınmasın - sonuç işlem sırasından bağımsız olur
+    processor.normalizer = Normalizer(settings)
+
+    max_dimension = params.get('OCR_MAX_DIMENSION', settings.get('OCR_MAX_DIMENSION', 1800))
+    start = time.perf_counter()
+    image = load_page(path, max_dimension)
+    if image is None:
+        return {'correct': {}, 'elapsed_ms': 0.0, 'error': 'unreadable image'}
+    if tier == 'fast':
+        result = processor.process_fast(image)
+    else:
+        result = processor.process_document(image)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    data = result.get('invoice_data') or {}
+    return {
+        'correct': score_fields(data, truth, Normalizer(settings)),
+        'elapsed_ms': round(elapsed_ms, 2),
+        'error': result.get('error')
+    }
+
+
+def load_corpus(folder: str) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """(yol, içerik özeti, etiket) üçlüleri - etiketi olmayan görüntüler atlanır"""
+    corpus = []
+    for path in iter_images(folder):
+        label_path = os.path.splitext(path)[0] + '.json'
+        if not os.path.isfile(label_path):
+            continue
+        with open(label_path, encoding='utf-8') as f:
+            corpus.append((path, file_hash(path), json.load(f)))
+    return corpus
+
+
+def load_cache(path: str) -> Dict[str, Dict[str, Any]]:
+    cache = {}
+    if os.path.isfile(path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Yarıda kesilen çalıştırmanın son satırı
+                    continue
+                cache[entry['key']] = entry['result']
+    return cache
+
+
+def summarize_params(params: Dict[str, Any], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    field_scores = {field: [] for field in FIELDS}
+    for result in results:
+        for field, ok in result['correct'].items():
+            field_scores[field].append(ok)
+    scores = [ok for values in field_scores.values() for ok in values]
+    times = [result['elapsed_ms'] for result in results]
+    return {
+        'params': params,
+        'accuracy': round(sum(scores) / len(scores), 4) if scores else 0.0,
+        'fields': {field: round(sum(values) / len(values), 4) for field, values in field_scores.items() if values},
+        'mean_ms': round(statistics.fmean(times), 1) if times else 0.0,
+        'p95_ms': round(percentile(times, 95), 1),
+        'errors': sum(1 for result in results if result.get('error')),
+    }
+
+
+def pareto_front(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Daha hızlı ve en az aynı doğrulukta başka ayarı olmayanlar (hızlıdan yavaşa)"""
+    front, best_accuracy = [], -1.0
+    for row in sorted(rows, key=lambda row: (row['mean_ms'], -row['accuracy'])):
+        if row['accuracy'] > best_accuracy:
+            front.append(row)
+            best_accuracy = row['accuracy']
+    return front
+
+
+def recommend(front: List[Dict[str, Any]], tolerance: float) -> Optional[Dict[str, Any]]:
+    """En iyi doğruluğun tolerance kadar altına inmeyen en hızlı ayar"""
+    if not front:
+        return None
+    target = max(row['accuracy'] for row in front) - tolerance
+    return next(row for row in front if row['accuracy'] >= target)
+
+
+def config_lines(params: Dict[str, Any]) -> List[str]:
+    return [f'    {name} = {value!r}' for name, value in sorted(params.items())]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search preprocessing/Tesseract parameters on a labeled corpus')
+    parser.add_argument('folder', help='Images with same-name .json labels')
+    parser.add_argument('--tier', choices=sorted(PARAM_SPACES), default='full')
+    parser.add_argument('--trials', type=int, default=30, help='Sampled configurations besides the current one '
+                                                               '(0 = full grid)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--tolerance', type=float, default=0.01, help='Accuracy the recommendation may give up')
+    parser.add_argument('--config', default='production')
+    parser.add_argument('--cache', default=os.path.join('cache', 'tuning', 'results.jsonl'))
+    parser.add_argument('--output', help='Write all results as JSON')
+    parser.add_argument('--profile-out', help='Write the recommended config lines to this file')
+    args = parser.parse_args()
+
+    settings = {key: getattr(configs[args.config], key) for key in dir(configs[args.config]) if key.isupper()}
+    tesseract = settings.get('TESSERACT_CMD')
+    if not (tesseract and os.path.exists(tesseract)):
+        tesseract = shutil.which('tesseract')
+    if not tesseract:
+        sys.exit('Tesseract not found; set TESSERACT_CMD or add it to PATH')
+    settings['TESSERACT_CMD'] = tesseract
+    pytesseract.pytesseract.tesseract_cmd = tesseract
+    tesseract_version = str(pytesseract.get_tesseract_version())
+
+    corpus = load_corpus(args.folder)
+    if not corpus:
+        sys.exit(f'No labeled images in {args.folder}')
+
+    defaults = {**settings, 'OCR_REGION_SPLIT': tuple(settings.get('OCR_REGION_SPLIT', REGION_SPLIT))}
+    candidates = candidate_params(args.tier, defaults, args.trials, args.seed)
+    # Ayarlanmayan ama sonucu etkileyen ayarlar da anahtara girer
+    context = {'tier': args.tier, 'tesseract': tesseract_version,
+               'languages': settings.get('OCR_LANGUAGES'), 'fast_language': settings.get('OCR_FAST_LANGUAGE')}
+
+    def cache_key(params, digest):
+        raw = json.dumps({'params': params, 'context': context, 'document': digest}, sort_keys=True)
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    cache = load_cache(args.cache)
+    pending = [(params, path, digest, truth) for params in candidates for path, digest, truth in corpus
+               if cache_key(params, digest) not in cache]
+    print(f"{len(candidates)} configurations x {len(corpus)} invoices; "
+          f"{len(candidates) * len(corpus) - len(pending)} cached, {len(pending)} to run on {args.workers} workers")
+
+    if pending:
+        os.makedirs(os.path.dirname(args.cache) or '.', exist_ok=True)
+        started = time.perf_counter()
+        with open(args.cache, 'a', encoding='utf-8') as cache_file, \
+                ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool:
+            futures = {pool.submit(evaluate, settings, params, args.tier, path, truth): cache_key(params, digest)
+                       for params, path, digest, truth in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                key = futures[future]
+                cache[key] = future.result()
+                # Her sonuç hemen yazılır - kesilen çalıştırma kaldığı yerden devam eder
+                cache_file.write(json.dumps({'key': key, 'result': cache[key]}) + '\n')
+                cache_file.flush()
+                if done % 50 == 0 or done == len(futures):
+                    print(f"  {done}/{len(futures)} ({time.perf_counter() - started:.0f} s)")
+
+    rows = [summarize_params(params, [cache[cache_key(params, digest)] for _, digest, _ in corpus])
+            for params in candidates]
+    front = pareto_front(rows)
+    best = recommend(front, args.tolerance)
+    baseline = rows[0]
+
+    names = sorted(PARAM_SPACES[args.tier])
+    table = [{**{name.replace('OCR_', '').lower(): row['params'][name] for name in names},
+              'accuracy': row['accuracy'], 'mean_ms': row['mean_ms'], 'p95_ms': row['p95_ms'],
+              'errors': row['errors']} for row in front]
+    print('\nPareto front (fastest first):')
+    print_table(table, list(table[0].keys()))
+    print(f"\ncurrent: accuracy {baseline['accuracy']}, mean {baseline['mean_ms']} ms")
+    print(f"recommended: accuracy {best['accuracy']}, mean {best['mean_ms']} ms, fields {best['fields']}")
+    lines = [f"    # scripts/tune_parameters.py ({args.tier} tier, {len(corpus)} invoices, "
+             f"accuracy {best['accuracy']}, mean {best['mean_ms']} ms)"] + config_lines(best['params'])
+    print('\n'.join(lines))
+
+    if args.profile_out:
+        with open(args.profile_out, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+    if args.output:
+        save_json(args.output, {'tier': args.tier, 'context': context, 'invoices': len(corpus),
+                                'baseline': baseline, 'recommended': best, 'pareto_front': front,
+                                'results': rows})
+
+
+if __name__ == '__main__':
+    main()
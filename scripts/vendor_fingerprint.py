@@ -0,0 +1,36 @@
+"""Satıcı profillerine eklenecek antet izlerini (dHash) ve vergi no adaylarını yazdır.
+
+Kullanım:
+    python -m scripts.vendor_fingerprint samples/acme_1.png samples/acme_2.png
+"""
+import argparse
+import json
+import cv2
+from app.core.vendor_profiles import letterhead_hash, hamming
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Print letterhead fingerprints for vendor profiles')
+    parser.add_argument('images', nargs='+', help='Sample invoice images of one vendor')
+    parser.add_argument('--band', type=float, default=0.2, help='Top fraction of the page used as letterhead')
+    args = parser.parse_args()
+
+    fingerprints = {}
+    for path in args.images:
+        image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            parser.error(f'Cannot read {path}')
+        fingerprints[path] = letterhead_hash(image, args.band)
+
+    values = list(fingerprints.values())
+    # Aynı satıcının örnekleri arasındaki en büyük fark eşik seçimine yardımcı olur
+    spread = max((hamming(a, b) for a in values for b in values), default=0)
+    print(json.dumps({
+        'fingerprints': sorted({f'{value:016x}' for value in values}),
+        'max_pairwise_distance': spread,
+        'per_image': {path: f'{value:016x}' for path, value in fingerprints.items()}
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()